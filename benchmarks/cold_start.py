@@ -0,0 +1,141 @@
+"""_summary_
+Cold-start benchmark: import time of the server module and time to the first tool response over stdio
+
+    python benchmarks/cold_start.py             # measure, compare with cold_start_budget.json
+    python benchmarks/cold_start.py --record    # measure and write the current numbers as the budget
+
+Every run is a fresh interpreter started in a scratch directory whose config.yaml turns
+startup authorization off, so no SSO login or ESI call is made. Exits 1 when a median
+goes over its budget (plus --slack) or a lazily loaded module shows up at import.
+"""
+#import
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+BUDGET_FILE = Path(__file__).resolve().parent / "cold_start_budget.json"
+#must not be imported by `import mcp_server_evefleet.server`
+LAZY_MODULES = ["aiohttp", "requests", "jose", "yaml", "mcp_server_evefleet.functions", "mcp_server_evefleet.IO.API_IO"]
+
+IMPORT_PROBE = """
+import sys, time, json
+t = time.perf_counter()
+import mcp_server_evefleet.server
+elapsed = (time.perf_counter() - t) * 1000
+print(json.dumps({"import_ms": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+def scratch_dir():
+    """CWD for the measured process: packaged config with startup authorization off"""
+    import yaml
+    work = Path(tempfile.mkdtemp(prefix="evefleet-coldstart-"))
+    with (SRC / "mcp_server_evefleet" / "config.yaml").open('r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    config.update({"STARTUP_AUTHORIZE": False,
+                   "UNIVERSE_STORE_PATH": str(work / "universe.sqlite3"),
+                   "TOKEN_VAULT_PATH": str(work / "tokens.json")})
+    with (work / "config.yaml").open('w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f)
+    return work
+
+def child_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(SRC), env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+    return env
+
+def measure_import(work):
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=work, env=child_env(),
+                         capture_output=True, text=True, timeout=120)
+    if out.returncode != 0:
+        raise RuntimeError(f"server import failed:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def _rpc(proc, message):
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+def _reply(proc, request_id):
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"server exited:\n{proc.stderr.read()}")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+def measure_first_response(work, tool="ping"):
+    """Spawn the stdio server like an MCP host does, time initialize and the first tools/call"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "mcp_server_evefleet.server"], cwd=work, env=child_env(),
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        _rpc(proc, {"jsonrpc": "2.0", "id": 1, "method": "initialize",
+                    "params": {"protocolVersion": "2025-06-18", "capabilities": {},
+                               "clientInfo": {"name": "cold-start-bench", "version": "1"}}})
+        _reply(proc, 1)
+        initialize_ms = (time.perf_counter() - start) * 1000
+        _rpc(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _rpc(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": tool, "arguments": {}}})
+        reply = _reply(proc, 2)
+        if "error" in reply:
+            raise RuntimeError(f"{tool} failed: {reply['error']}")
+        return {"initialize_ms": initialize_ms, "first_tool_ms": (time.perf_counter() - start) * 1000}
+    finally:
+        proc.kill()
+        proc.wait()
+
+def run(runs):
+    work = scratch_dir()
+    try:
+        imports = [measure_import(work) for _ in range(runs)]
+        responses = [measure_first_response(work) for _ in range(runs)]
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    result = {
+        "import_ms": statistics.median(r["import_ms"] for r in imports),
+        "initialize_ms": statistics.median(r["initialize_ms"] for r in responses),
+        "first_tool_ms": statistics.median(r["first_tool_ms"] for r in responses),
+    }
+    loaded = sorted({m for r in imports for m in r["loaded"]})
+    return {k: round(v, 1) for k, v in result.items()}, loaded
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start benchmark for the EVE Fleet MCP server')
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes per measurement, the median is kept')
+    parser.add_argument('--slack', type=float, default=0.25, help='allowed fraction over budget (machine noise)')
+    parser.add_argument('--record', action='store_true', help='write the measured medians as the new budget')
+    args = parser.parse_args()
+
+    result, loaded = run(args.runs)
+    print(json.dumps({"python": sys.version.split()[0], **result, "eager_heavy_modules": loaded}, indent=1))
+    if args.record:
+        with BUDGET_FILE.open('w', encoding='utf-8') as f:
+            json.dump({"python": sys.version.split()[0], **result}, f, indent=1)
+            f.write("\n")
+        print(f"budget written to {BUDGET_FILE}")
+        return 0
+
+    with BUDGET_FILE.open('r', encoding='utf-8') as f:
+        budget = json.load(f)
+    failed = [f"{key}: {result[key]}ms > budget {budget[key]}ms (+{args.slack:.0%})"
+              for key in ("import_ms", "initialize_ms", "first_tool_ms")
+              if budget.get(key) is not None and result[key] > budget[key] * (1 + args.slack)]
+    if all(budget.get(key) is None for key in ("import_ms", "initialize_ms", "first_tool_ms")):
+        print("no budget recorded yet, run with --record on the reference machine")
+    if loaded:
+        failed.append(f"imported eagerly by the server module: {', '.join(loaded)}")
+    for line in failed:
+        print(f"[OVER BUDGET] {line}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
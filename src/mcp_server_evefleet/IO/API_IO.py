@@ -4,12 +4,13 @@ from pathlib import Path
 import base64
 import hashlib
 import secrets
-import requests
 import asyncio
-import aiohttp
 import webbrowser
 import threading
 import time
+import itertools
+from collections import defaultdict
+from contextlib import aclosing
 from urllib.parse import urlparse, parse_qs
 from http.server import HTTPServer, BaseHTTPRequestHandler
 
@@ -17,10 +18,29 @@ from mcp_server_evefleet.sso.shared_flow import print_auth_url
 from mcp_server_evefleet.sso.shared_flow import send_token_request
 from mcp_server_evefleet.sso.shared_flow import handle_sso_token_response_token
 from mcp_server_evefleet.config_load import CONFIG
+from mcp_server_evefleet.IO.esi_client import get_esi_client, on_esi_loop, on_esi_loop_gen
+from mcp_server_evefleet.IO.universe_store import get_universe_store
+from mcp_server_evefleet.universe_graph import get_stargate_graph
 from platformdirs import user_config_dir
 
 SSO_clientid = CONFIG['SSO_clientid']
+#ESI bulk endpoint limits
+NAME2ID_CHUNK = 500
+ID2NAME_CHUNK = 1000
+#max in-flight reads for the stream_* generators
+READ_CONCURRENCY = CONFIG.get('ESI_READ_CONCURRENCY', 20)
+#stream_* input consumed this many items per store lookup, fetched rows written back this many at a time
+STREAM_LOOKUP_CHUNK = 200
+STREAM_STORE_FLUSH = 100
 SSO_callback = CONFIG['SSO_callback']
+#universe endpoints served through the persistent store
+UNIVERSE_PATHS = {
+    'system': 'universe/systems/{}/?datasource=tranquility&language=en',
+    'stargate': 'universe/stargates/{}/?datasource=tranquility',
+    'station': 'universe/stations/{}/?datasource=tranquility',
+    'type': 'universe/types/{}/?datasource=tranquility&language=en',
+    'group': 'universe/groups/{}/?datasource=tranquility&language=en',
+}
 
 # Global variable to store the authorization code
 auth_code_result = None
@@ -129,6 +149,85 @@ def get_auth_url_with_callback(client_id, code_challenge, callback_url="http://l
     
     return full_auth_url
 
+#interactive SSO login (PKCE), nothing persisted
+def sso_login(use_browser: bool = True):
+    """
+    Run the EVE SSO authorization-code flow for a new character login.
+    
+    Args:
+        use_browser (bool): Use browser-based authentication (default: True)
+    
+    Returns:
+        tuple: (refresh_token, access_token, character_id, character_name)
+    """
+    random = base64.urlsafe_b64encode(secrets.token_bytes(32))
+    m = hashlib.sha256()
+    m.update(random)
+    d = m.digest()
+    code_challenge = base64.urlsafe_b64encode(d).decode().replace("=", "")
+    client_id = SSO_clientid
+    code_verifier = random
+    
+    if use_browser and SSO_callback.startswith("http://localhost"):
+        # Browser-based authentication with localhost callback server
+        try:
+            
+            # Start callback server
+            server, server_thread = start_callback_server()
+            
+            # Generate auth URL with local callback
+            auth_url = get_auth_url_with_callback(client_id, code_challenge, SSO_callback)
+            
+            
+            # Open browser
+            webbrowser.open(auth_url)
+            
+            # Wait for callback
+            auth_code = wait_for_callback(server)
+            
+            
+        except Exception as e:
+            use_browser = False
+    elif use_browser and SSO_callback.startswith("eveauth://"):
+        # Custom scheme authentication (recommended by CCP)
+        try:
+            
+            # Generate auth URL with custom scheme
+            auth_url = get_auth_url_with_callback(client_id, code_challenge, SSO_callback)
+            
+            
+            # Open browser
+            webbrowser.open(auth_url)
+            
+            # For custom schemes, we need manual input as fallback
+            auth_code = input("Enter the authorization code here (or press Enter if it was handled automatically): ").strip()
+            
+            # If no code was entered, we might need to implement custom scheme handling
+            if not auth_code:
+                use_browser = False
+            
+        except Exception as e:
+            use_browser = False
+    elif use_browser:
+        # For other callback types, use manual authentication
+        use_browser = False
+    
+    if not use_browser:
+        # Manual authentication (original method)
+        print_auth_url(client_id, code_challenge=code_challenge, redirect_uri=SSO_callback)
+        auth_code = input("Copy the \"code\" query parameter and enter it here: ")
+    
+    # Exchange code for tokens
+    form_values = {
+        "grant_type": "authorization_code",
+        "client_id": client_id,
+        "code": auth_code,
+        "code_verifier": code_verifier
+    }
+    res = send_token_request(form_values)
+    refresh_token, access_token, character_id, character_name = handle_sso_token_response_token(res)
+    return refresh_token, access_token, int(character_id), character_name
+
 def get_refresh_token(file_name: str | None = None, reset: bool = False, use_browser: bool = True):
     """
     Get refresh token for EVE SSO authentication
@@ -156,88 +255,39 @@ def get_refresh_token(file_name: str | None = None, reset: bool = False, use_bro
         token_path = cwd_token
 
     if not token_path.is_file() or reset:
-        random = base64.urlsafe_b64encode(secrets.token_bytes(32))
-        m = hashlib.sha256()
-        m.update(random)
-        d = m.digest()
-        code_challenge = base64.urlsafe_b64encode(d).decode().replace("=", "")
-        client_id = SSO_clientid
-        code_verifier = random
-        
-        if use_browser and SSO_callback.startswith("http://localhost"):
-            # Browser-based authentication with localhost callback server
-            try:
-                
-                # Start callback server
-                server, server_thread = start_callback_server()
-                
-                # Generate auth URL with local callback
-                auth_url = get_auth_url_with_callback(client_id, code_challenge, SSO_callback)
-                
-                
-                # Open browser
-                webbrowser.open(auth_url)
-                
-                # Wait for callback
-                auth_code = wait_for_callback(server)
-                
-                
-            except Exception as e:
-                use_browser = False
-        elif use_browser and SSO_callback.startswith("eveauth://"):
-            # Custom scheme authentication (recommended by CCP)
-            try:
-                
-                # Generate auth URL with custom scheme
-                auth_url = get_auth_url_with_callback(client_id, code_challenge, SSO_callback)
-                
-                
-                # Open browser
-                webbrowser.open(auth_url)
-                
-                # For custom schemes, we need manual input as fallback
-                auth_code = input("Enter the authorization code here (or press Enter if it was handled automatically): ").strip()
-                
-                # If no code was entered, we might need to implement custom scheme handling
-                if not auth_code:
-                    use_browser = False
-                
-            except Exception as e:
-                use_browser = False
-        elif use_browser:
-            # For other callback types, use manual authentication
-            use_browser = False
-        
-        if not use_browser:
-            # Manual authentication (original method)
-            print_auth_url(client_id, code_challenge=code_challenge, redirect_uri=SSO_callback)
-            auth_code = input("Copy the \"code\" query parameter and enter it here: ")
-        
-        # Exchange code for tokens
-        form_values = {
-            "grant_type": "authorization_code",
-            "client_id": client_id,
-            "code": auth_code,
-            "code_verifier": code_verifier
-        }
-        res = send_token_request(form_values)
-        refresh_token, access_token, character_id, character_name = handle_sso_token_response_token(res)
+        refresh_token, access_token, character_id, character_name = sso_login(use_browser)
     else:
         # Use existing refresh token
         with token_path.open('r', encoding='utf-8') as f:
             refresh_token = f.read()
-        form_values = {
-            "grant_type": "refresh_token",
-            "refresh_token": refresh_token,
-            "client_id": SSO_clientid
-        }
         try:
-            res = send_token_request(form_values)
-            refresh_token, access_token, character_id, character_name = handle_sso_token_response_token(res)
+            refresh_token, access_token, character_id, character_name = refresh_access_token(refresh_token)
         except Exception as e:
             return get_refresh_token(str(token_path), reset=True, use_browser=use_browser)
 
     # Persist token to a proper path
+    save_refresh_token(refresh_token, file_name)
+    character_id = int(character_id)
+    return refresh_token, access_token, character_id, character_name
+
+#refresh token -> new tokens (SSO rotates the refresh token, persist the returned one)
+def refresh_access_token(refresh_token):
+    """
+    Exchange a refresh token for a new access token.
+    
+    Returns:
+        tuple: (refresh_token, access_token, character_id, character_name)
+    """
+    form_values = {
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token,
+        "client_id": SSO_clientid
+    }
+    res = send_token_request(form_values)
+    refresh_token, access_token, character_id, character_name = handle_sso_token_response_token(res)
+    return refresh_token, access_token, int(character_id), character_name
+
+def save_refresh_token(refresh_token, file_name: str | None = None):
     try:
         # If user provided a custom path (with a directory), honor it; otherwise use default app path
         if file_name and Path(file_name).parent not in (Path('.'), Path('')) and Path(file_name).parent != Path('.').resolve():
@@ -249,64 +299,65 @@ def get_refresh_token(file_name: str | None = None, reset: bool = False, use_bro
             f.write(refresh_token)
     except Exception as e:
         pass
-    character_id = int(character_id)
-    return refresh_token, access_token, character_id, character_name
 
 #get char info
 def get_char_info(character_id):
-    sso_path = ("https://esi.evetech.net/latest/characters/{}/?datasource=tranquility".format(character_id))
-    res = requests.get(sso_path)
-    res.raise_for_status()
-    data = res.json()
+    esi = get_esi_client()
+    sso_path = esi.url("characters/{}/?datasource=tranquility".format(character_id))
+    data = esi.get_json(sso_path)
     return data
 
 #get char location
 def get_sso_location(access_token, character_id):
-    sso_path = ("https://esi.evetech.net/latest/characters/{}/location/?datasource=tranquility".format(character_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
-
-    res = requests.get(sso_path, headers=headers)
-    #print("\nMade request to {} with headers: "
-    #        "{}".format(sso_path, res.request.headers))
-    res.raise_for_status()
-
-    data = res.json()
+    esi = get_esi_client()
+    sso_path = esi.url("characters/{}/location/?datasource=tranquility".format(character_id))
+    data = esi.get_json(sso_path, access_token)
     return data['solar_system_id']
 
+#universe read-through: persistent store first, ESI only on a miss
+def _route_key(origin_id, destination_id, flag, avoid=None):
+    key = f'{int(origin_id)}:{int(destination_id)}:{flag}'
+    return key + ':' + ','.join(str(a) for a in sorted(set(int(a) for a in avoid))) if avoid else key
+
+def _route_query(flag, avoid=None):
+    query = f'datasource=tranquility&flag={flag}'
+    return query + '&avoid=' + ','.join(str(int(a)) for a in avoid) if avoid else query
+
+def get_universe_info(kind, item_id):
+    store = get_universe_store()
+    data = store.get(kind, int(item_id))
+    if data is None:
+        esi = get_esi_client()
+        data = esi.get_json(esi.url(UNIVERSE_PATHS[kind].format(item_id)))
+        store.put(kind, int(item_id), data)
+    return data
+
 #get station info
 def get_station_info(station_id):
-    sso_path = ("https://esi.evetech.net/latest/universe/stations/{}/?datasource=tranquility".format(station_id))
-    res = requests.get(sso_path)
-    res.raise_for_status()
-    data = res.json()
-    return data
+    return get_universe_info('station', station_id)
 
-#get route
-def get_route(origin_id, destination_id, flag='shortest'):
+#get route: packaged stargate graph first, store/ESI when the route leaves the packaged data
+def get_route(origin_id, destination_id, flag='shortest', avoid=None):
     assert flag in ['shortest','secure','insecure']
-    sso_path = ("https://esi.evetech.net/latest/route/{}/{}?datasource=tranquility&flag={}".format(origin_id, destination_id,flag))
-    res = requests.get(sso_path)
-    res.raise_for_status()
-    data = res.json()
+    data = get_stargate_graph().route(origin_id, destination_id, flag, avoid or ())
+    if data is not None:
+        return data
+    store = get_universe_store()
+    data = store.get('route', _route_key(origin_id, destination_id, flag, avoid))
+    if data is None:
+        esi = get_esi_client()
+        sso_path = esi.url("route/{}/{}?{}".format(origin_id, destination_id, _route_query(flag, avoid)))
+        data = esi.get_json(sso_path)
+        store.put('route', _route_key(origin_id, destination_id, flag, avoid), data)
     return data
 
 #get stargate info
 def get_stargate_info(stargate_id):
-    sso_path = (f'https://esi.evetech.net/latest/universe/stargates/{stargate_id}/?datasource=tranquility')
-    res = requests.get(sso_path)
-    res.raise_for_status()
-    data = res.json()
-    return data
+    return get_universe_info('stargate', stargate_id)
 
 #get system info
 def get_system_info(system_id):
-    sso_path = (f'https://esi.evetech.net/latest/universe/systems/{system_id}/?datasource=tranquility&language=en')
-    res = requests.get(sso_path)
-    res.raise_for_status()
-    data = res.json()
-    return data
+    return get_universe_info('system', system_id)
 
 #post bulk name->id
 def post_name2id(names_list):
@@ -324,8 +375,9 @@ def post_name2id(names_list):
     ]
     }
     '''
-    sso_path = ("https://esi.evetech.net/latest/universe/ids/?datasource=tranquility&language=en")
-    res = requests.post(sso_path, json=names_list)
+    esi = get_esi_client()
+    sso_path = esi.url("universe/ids/?datasource=tranquility&language=en")
+    res = esi.post(sso_path, json=names_list)
     res.raise_for_status()
     data = res.json()
     return data
@@ -346,8 +398,9 @@ def post_id2name(ids_list):
     }
     ]
     '''
-    sso_path = ("https://esi.evetech.net/latest/universe/names/?datasource=tranquility")
-    res = requests.post(sso_path, json=ids_list)
+    esi = get_esi_client()
+    sso_path = esi.url("universe/names/?datasource=tranquility")
+    res = esi.post(sso_path, json=ids_list)
     res.raise_for_status()
     data = res.json()
     return data
@@ -357,12 +410,12 @@ def post_setwaypoint(access_token, destination_id, add_to_beginning=True, clear_
     #https://esi.evetech.net/latest/ui/autopilot/waypoint/?add_to_beginning=false&clear_other_waypoints=true&datasource=tranquility&destination_id=30000861
     add_to_beginning = str(add_to_beginning).lower()
     clear_other_waypoints = str(clear_other_waypoints).lower()
-    sso_path = (f"https://esi.evetech.net/latest/ui/autopilot/waypoint/?add_to_beginning={add_to_beginning}&clear_other_waypoints={clear_other_waypoints}&datasource=tranquility&destination_id={destination_id}")
+    esi = get_esi_client()
+    sso_path = esi.url(f"ui/autopilot/waypoint/?add_to_beginning={add_to_beginning}&clear_other_waypoints={clear_other_waypoints}&datasource=tranquility&destination_id={destination_id}")
     headers = {
-        "Authorization": "Bearer {}".format(access_token),
         "Cache-Control": "no-cache"
     }
-    res = requests.post(sso_path, headers=headers, json={})
+    res = esi.post(sso_path, access_token, headers=headers, json={})
     res.raise_for_status()
     return
 
@@ -371,85 +424,228 @@ def post_setwaypoint(access_token, destination_id, add_to_beginning=True, clear_
 # =============================================================================
 
 # Async API functions for parallel processing
+async def async_get_universe_info(session, kind, item_id):
+    """Async version of get_universe_info"""
+    store = get_universe_store()
+    data = store.get(kind, int(item_id))
+    if data is None:
+        url = get_esi_client().url(UNIVERSE_PATHS[kind].format(item_id))
+        data = await get_esi_client().aget_json(url, session=session)
+        store.put(kind, int(item_id), data)
+    return data
+
 async def async_get_system_info(session, system_id):
     """Async version of get_system_info"""
-    url = f'https://esi.evetech.net/latest/universe/systems/{system_id}/?datasource=tranquility&language=en'
-    async with session.get(url) as response:
-        response.raise_for_status()
-        return await response.json()
+    return await async_get_universe_info(session, 'system', system_id)
 
 async def async_get_stargate_info(session, stargate_id):
     """Async version of get_stargate_info"""
-    url = f'https://esi.evetech.net/latest/universe/stargates/{stargate_id}/?datasource=tranquility'
-    async with session.get(url) as response:
-        response.raise_for_status()
-        return await response.json()
+    return await async_get_universe_info(session, 'stargate', stargate_id)
 
 async def async_get_station_info(session, station_id):
     """Async version of get_station_info"""
-    url = f'https://esi.evetech.net/latest/universe/stations/{station_id}/?datasource=tranquility'
-    async with session.get(url) as response:
-        response.raise_for_status()
-        return await response.json()
+    return await async_get_universe_info(session, 'station', station_id)
 
 async def async_get_char_info(session, character_id):
     """Async version of get_char_info"""
-    url = f'https://esi.evetech.net/latest/characters/{character_id}/?datasource=tranquility'
-    async with session.get(url) as response:
-        response.raise_for_status()
-        return await response.json()
+    url = get_esi_client().url(f'characters/{character_id}/?datasource=tranquility')
+    return await get_esi_client().aget_json(url, session=session)
 
 async def async_get_sso_location(session, access_token, character_id):
     """Async version of get_sso_location"""
-    url = f'https://esi.evetech.net/latest/characters/{character_id}/location/?datasource=tranquility'
-    headers = {
-        "Authorization": f"Bearer {access_token}"
-    }
-    async with session.get(url, headers=headers) as response:
-        response.raise_for_status()
-        data = await response.json()
-        return data['solar_system_id']
+    url = get_esi_client().url(f'characters/{character_id}/location/?datasource=tranquility')
+    data = await get_esi_client().aget_json(url, access_token, session=session)
+    return data['solar_system_id']
 
-async def async_get_route(session, origin_id, destination_id, flag='shortest'):
+async def async_get_route(session, origin_id, destination_id, flag='shortest', avoid=None):
     """Async version of get_route"""
     assert flag in ['shortest','secure','insecure']
-    url = f'https://esi.evetech.net/latest/route/{origin_id}/{destination_id}?datasource=tranquility&flag={flag}'
-    async with session.get(url) as response:
-        response.raise_for_status()
-        return await response.json()
+    data = get_stargate_graph().route(origin_id, destination_id, flag, avoid or ())
+    if data is not None:
+        return data
+    store = get_universe_store()
+    data = store.get('route', _route_key(origin_id, destination_id, flag, avoid))
+    if data is None:
+        url = get_esi_client().url(f'route/{origin_id}/{destination_id}?{_route_query(flag, avoid)}')
+        data = await get_esi_client().aget_json(url, session=session)
+        store.put('route', _route_key(origin_id, destination_id, flag, avoid), data)
+    return data
+
+async def async_post_name2id(session, names_list):
+    """Async version of post_name2id"""
+    url = get_esi_client().url('universe/ids/?datasource=tranquility&language=en')
+    return await get_esi_client().arequest_json('POST', url, session=session, json=names_list) or {}
+
+async def async_post_id2name(session, ids_list):
+    """Async version of post_id2name"""
+    url = get_esi_client().url('universe/names/?datasource=tranquility')
+    return await get_esi_client().arequest_json('POST', url, session=session, json=ids_list) or []
 
 # =============================================================================
 # BATCH API FUNCTIONS FOR PARALLEL PROCESSING
 # =============================================================================
 
+async def async_batch_universe_info(session, kind, item_ids):
+    """
+    Store-first batch lookup: one store read for all ids, parallel ESI fetches for
+    the misses only, one store write for what came back.
+    
+    Returns:
+        list: data or the Exception per id, in input order
+    """
+    store = get_universe_store()
+    item_ids = [int(i) for i in item_ids]
+    found = store.get_many(kind, item_ids)
+    missing = [i for i in dict.fromkeys(item_ids) if i not in found]
+    esi = get_esi_client()
+    results = await asyncio.gather(
+        *[esi.aget_json(esi.url(UNIVERSE_PATHS[kind].format(i)), session=session) for i in missing],
+        return_exceptions=True)
+    fetched = {i: r for i, r in zip(missing, results) if not isinstance(r, BaseException)}
+    store.put_many(kind, fetched)
+    found.update(fetched)
+    errors = dict(zip(missing, results))
+    return [found[i] if i in found else errors[i] for i in item_ids]
+
+@on_esi_loop
 async def batch_get_system_info(system_ids):
     """Fetch multiple system info in parallel"""
-    async with aiohttp.ClientSession() as session:
-        tasks = [async_get_system_info(session, system_id) for system_id in system_ids]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+    async with get_esi_client().shared_session() as session:
+        return await async_batch_universe_info(session, 'system', system_ids)
 
+@on_esi_loop
 async def batch_get_stargate_info(stargate_ids):
     """Fetch multiple stargate info in parallel"""
-    async with aiohttp.ClientSession() as session:
-        tasks = [async_get_stargate_info(session, stargate_id) for stargate_id in stargate_ids]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+    async with get_esi_client().shared_session() as session:
+        return await async_batch_universe_info(session, 'stargate', stargate_ids)
 
+@on_esi_loop
 async def batch_get_station_info(station_ids):
     """Fetch multiple station info in parallel"""
-    async with aiohttp.ClientSession() as session:
-        tasks = [async_get_station_info(session, station_id) for station_id in station_ids]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+    async with get_esi_client().shared_session() as session:
+        return await async_batch_universe_info(session, 'station', station_ids)
 
+@on_esi_loop
+async def batch_get_ship_types(type_ids):
+    """
+    Resolve type ids to ship table rows: type lookups in parallel, then one lookup per new group.
+    Both go through the persistent universe store, so known types cost no ESI call.
+    
+    Returns:
+        dict: type_id -> (type_id, group_id, type_name, group_name) for the ids that resolved
+    """
+    type_ids = list(dict.fromkeys(int(i) for i in type_ids))
+    async with get_esi_client().shared_session() as session:
+        types = await async_batch_universe_info(session, 'type', type_ids)
+        types = {i: t for i, t in zip(type_ids, types) if not isinstance(t, BaseException)}
+        group_ids = list(dict.fromkeys(int(t['group_id']) for t in types.values()))
+        groups = await async_batch_universe_info(session, 'group', group_ids)
+        groups = {i: g for i, g in zip(group_ids, groups) if not isinstance(g, BaseException)}
+    return {i: (i, int(t['group_id']), t['name'], groups[int(t['group_id'])]['name'])
+            for i, t in types.items() if int(t['group_id']) in groups}
+
+@on_esi_loop
 async def batch_get_char_info(character_ids):
     """Fetch multiple character info in parallel"""
-    async with aiohttp.ClientSession() as session:
+    async with get_esi_client().shared_session() as session:
         tasks = [async_get_char_info(session, char_id) for char_id in character_ids]
         return await asyncio.gather(*tasks, return_exceptions=True)
 
+#unique names (case-insensitive, first spelling kept) / unique int ids, input order kept
+def _dedup_names(names_list):
+    seen = {}
+    for name in names_list:
+        name = str(name).strip()
+        if name and name.lower() not in seen:
+            seen[name.lower()] = name
+    return list(seen.values())
+
+def _dedup_ids(ids_list):
+    return list(dict.fromkeys(int(i) for i in ids_list))
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+#lazy _chunks for any iterable
+def _ichunks(items, size):
+    items = iter(items)
+    while chunk := list(itertools.islice(items, size)):
+        yield chunk
+
+@on_esi_loop
+async def batch_post_name2id(names_list):
+    """
+    Resolve any number of names in parallel /universe/ids/ calls of NAME2ID_CHUNK names.
+    
+    Args:
+        names_list: Names, duplicates (case-insensitive) are sent once
+    
+    Returns:
+        dict: category -> [{'id', 'name'}], every category ESI returned
+              (characters, systems, inventory_types, ...)
+    """
+    names = _dedup_names(names_list)
+    if not names:
+        return {}
+    async with get_esi_client().shared_session() as session:
+        results = await asyncio.gather(*[async_post_name2id(session, chunk) for chunk in _chunks(names, NAME2ID_CHUNK)])
+    merged = {}
+    for data in results:
+        for category, entries in data.items():
+            merged.setdefault(category, []).extend(entries)
+    return merged
+
+async def _post_id2name_split(session, ids_list):
+    # /universe/names/ rejects the whole chunk with 404 if one id is unknown, bisect to drop it
+    import aiohttp
+    try:
+        return await async_post_id2name(session, ids_list)
+    except aiohttp.ClientResponseError as e:
+        if e.status != 404:
+            raise
+        if len(ids_list) == 1:
+            return []
+        half = len(ids_list) // 2
+        left, right = await asyncio.gather(_post_id2name_split(session, ids_list[:half]),
+                                           _post_id2name_split(session, ids_list[half:]))
+        return left + right
+
+@on_esi_loop
+async def batch_post_id2name(ids_list):
+    """
+    Resolve any number of ids in parallel /universe/names/ calls of ID2NAME_CHUNK ids.
+    
+    Args:
+        ids_list: IDs of any category, duplicates are sent once, unknown ids are skipped
+    
+    Returns:
+        list: [{'category', 'id', 'name'}] merged over all chunks
+    """
+    ids = _dedup_ids(ids_list)
+    if not ids:
+        return []
+    async with get_esi_client().shared_session() as session:
+        results = await asyncio.gather(*[_post_id2name_split(session, chunk) for chunk in _chunks(ids, ID2NAME_CHUNK)])
+    return [e for data in results for e in data]
+
+#sync bulk resolvers
+def bulk_name2id(names_list):
+    """Chunked, parallel, de-duplicated post_name2id, same output shape with all categories merged"""
+    return get_esi_client().run(batch_post_name2id(list(names_list)))
+
+def bulk_id2name(ids_list):
+    """Chunked, parallel, de-duplicated post_id2name, same output shape"""
+    return get_esi_client().run(batch_post_id2name(list(ids_list)))
+
+def bulk_ship_types(type_ids):
+    """Type ids -> ship table rows, see batch_get_ship_types"""
+    return get_esi_client().run(batch_get_ship_types(list(type_ids)))
+
 # =============================================================================
 # CONVENIENCE FUNCTIONS FOR COMMON BATCH OPERATIONS
 # =============================================================================
 
+@on_esi_loop
 async def batch_get_route_data(system_ids, stargate_ids=None):
     """
     Fetch both system and stargate data in parallel for route calculations.
@@ -461,30 +657,28 @@ async def batch_get_route_data(system_ids, stargate_ids=None):
     Returns:
         tuple: (systems_data, stargates_data) where each is a dict mapping ID to data
     """
-    async with aiohttp.ClientSession() as session:
-        # Fetch systems
-        system_tasks = [async_get_system_info(session, system_id) for system_id in system_ids]
-        system_results = await asyncio.gather(*system_tasks, return_exceptions=True)
+    async with get_esi_client().shared_session() as session:
+        # Fetch systems and stargates together
+        stargate_ids = stargate_ids or []
+        system_results, stargate_results = await asyncio.gather(
+            async_batch_universe_info(session, 'system', system_ids),
+            async_batch_universe_info(session, 'stargate', stargate_ids),
+        )
         
-        # Create system data dict
+        # Create data dicts
         systems_data = {}
         for system_id, result in zip(system_ids, system_results):
             if not isinstance(result, Exception):
                 systems_data[system_id] = result
-        
-        # Fetch stargates if provided
         stargates_data = {}
-        if stargate_ids:
-            stargate_tasks = [async_get_stargate_info(session, sg_id) for sg_id in stargate_ids]
-            stargate_results = await asyncio.gather(*stargate_tasks, return_exceptions=True)
-            
-            for stargate_id, result in zip(stargate_ids, stargate_results):
-                if not isinstance(result, Exception):
-                    stargates_data[stargate_id] = result
+        for stargate_id, result in zip(stargate_ids, stargate_results):
+            if not isinstance(result, Exception):
+                stargates_data[stargate_id] = result
         
         return systems_data, stargates_data
 
-async def batch_get_route_with_systems(origin_id, destination_id, flag='shortest'):
+@on_esi_loop
+async def batch_get_route_with_systems(origin_id, destination_id, flag='shortest', avoid=None):
     """
     Get route and fetch all required system data in one operation.
     
@@ -492,20 +686,18 @@ async def batch_get_route_with_systems(origin_id, destination_id, flag='shortest
         origin_id: Origin system ID
         destination_id: Destination system ID
         flag: Route flag ('shortest', 'secure', 'insecure')
+        avoid: System ids to route around
     
     Returns:
         tuple: (route_systems, systems_data) where route_systems is the route list
                and systems_data is a dict mapping system_id to system data
     """
-    async with aiohttp.ClientSession() as session:
+    async with get_esi_client().shared_session() as session:
         # Get route first
-        route_systems = await async_get_route(session, origin_id, destination_id, flag)
+        route_systems = await async_get_route(session, origin_id, destination_id, flag, avoid)
         
         # Fetch all system data in parallel
-        system_results = await asyncio.gather(
-            *[async_get_system_info(session, system_id) for system_id in route_systems],
-            return_exceptions=True
-        )
+        system_results = await async_batch_universe_info(session, 'system', route_systems)
         
         # Create systems data dict
         systems_data = {}
@@ -513,4 +705,113 @@ async def batch_get_route_with_systems(origin_id, destination_id, flag='shortest
             if not isinstance(result, Exception):
                 systems_data[system_id] = result
         
-        return route_systems, systems_data
\ No newline at end of file
+        return route_systems, systems_data
+
+# =============================================================================
+# STREAMING API FUNCTIONS (AS-COMPLETED)
+# =============================================================================
+
+async def _fetch_entity(session, kind, item_id):
+    esi = get_esi_client()
+    if kind == 'character':
+        return await esi.aget_json(esi.url(f'characters/{item_id}/?datasource=tranquility'), session=session)
+    return await esi.aget_json(esi.url(UNIVERSE_PATHS[kind].format(item_id)), session=session)
+
+def _flush_store(writes, force=False):
+    store = get_universe_store()
+    for kind, items in writes.items():
+        if items and (force or len(items) >= STREAM_STORE_FLUSH):
+            store.put_many(kind, items)
+            items.clear()
+
+@on_esi_loop_gen
+async def stream_get_entities(keys, concurrency=None, session=None):
+    """
+    Yield ((kind, id), result) as each lookup finishes, over one shared session.
+    
+    Input is consumed lazily and at most `concurrency` requests are in flight; a new
+    one only starts when the consumer pulls, so memory stays flat for any input size.
+    Universe kinds are answered from the persistent store when possible (yielded
+    first) and fetched rows are written back in batches.
+    
+    Args:
+        keys: Iterable of (kind, id), kind in 'system', 'stargate', 'station', 'character'
+        concurrency: Max in-flight requests (default ESI_READ_CONCURRENCY)
+        session: aiohttp session, defaults to the shared one
+    
+    Yields:
+        tuple: ((kind, id), data or the Exception it failed with)
+    """
+    concurrency = max(int(concurrency or READ_CONCURRENCY), 1)
+    session = session or await get_esi_client().async_session()
+    store = get_universe_store()
+    inflight = {}
+    writes = defaultdict(dict)
+    def completed(done):
+        for task in done:
+            key = inflight.pop(task)
+            try:
+                result = task.result()
+            except Exception as e:
+                result = e
+            else:
+                if key[0] in UNIVERSE_PATHS:
+                    writes[key[0]][key[1]] = result
+            yield key, result
+    try:
+        for chunk in _ichunks(keys, STREAM_LOOKUP_CHUNK):
+            chunk = [(kind, int(item_id)) for kind, item_id in chunk]
+            hits = {}
+            for kind in {k for k, _ in chunk if k in UNIVERSE_PATHS}:
+                found = store.get_many(kind, [i for k, i in chunk if k == kind])
+                hits.update({(kind, item_id): data for item_id, data in found.items()})
+            for key in chunk:
+                if key in hits:
+                    yield key, hits[key]
+                    continue
+                while len(inflight) >= concurrency:
+                    done, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+                    for item in completed(done):
+                        yield item
+                    _flush_store(writes)
+                inflight[asyncio.ensure_future(_fetch_entity(session, *key))] = key
+        while inflight:
+            done, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+            for item in completed(done):
+                yield item
+            _flush_store(writes)
+    finally:
+        for task in inflight:
+            task.cancel()
+        _flush_store(writes, force=True)
+
+async def stream_get_system_info(system_ids, concurrency=None):
+    """As-completed batch_get_system_info, yields (system_id, data or Exception)"""
+    async with aclosing(stream_get_entities((('system', i) for i in system_ids), concurrency)) as stream:
+        async for (_, item_id), result in stream:
+            yield item_id, result
+
+async def stream_get_stargate_info(stargate_ids, concurrency=None):
+    """As-completed batch_get_stargate_info, yields (stargate_id, data or Exception)"""
+    async with aclosing(stream_get_entities((('stargate', i) for i in stargate_ids), concurrency)) as stream:
+        async for (_, item_id), result in stream:
+            yield item_id, result
+
+async def stream_get_station_info(station_ids, concurrency=None):
+    """As-completed batch_get_station_info, yields (station_id, data or Exception)"""
+    async with aclosing(stream_get_entities((('station', i) for i in station_ids), concurrency)) as stream:
+        async for (_, item_id), result in stream:
+            yield item_id, result
+
+async def stream_get_char_info(character_ids, concurrency=None):
+    """As-completed batch_get_char_info, yields (character_id, data or Exception)"""
+    async with aclosing(stream_get_entities((('character', i) for i in character_ids), concurrency)) as stream:
+        async for (_, item_id), result in stream:
+            yield item_id, result
+
+async def stream_get_route_data(system_ids, stargate_ids=None, concurrency=None):
+    """As-completed batch_get_route_data, systems and stargates interleaved, yields ((kind, id), data or Exception)"""
+    keys = itertools.chain((('system', i) for i in system_ids), (('stargate', i) for i in stargate_ids or []))
+    async with aclosing(stream_get_entities(keys, concurrency)) as stream:
+        async for key, result in stream:
+            yield key, result
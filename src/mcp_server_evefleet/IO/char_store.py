@@ -0,0 +1,187 @@
+"""_summary_
+Append-only journal for the character name<->id cache, replaces rewriting setting/chardict.yaml
+"""
+#import
+import os
+import json
+import atexit
+import logging
+import threading
+from pathlib import Path
+from importlib import resources
+from platformdirs import user_config_dir
+from mcp_server_evefleet.config_load import CONFIG
+
+logger = logging.getLogger(__name__)
+
+#kept next to refresh_token.txt
+APP_NAME = "mcp_server_evefleet"
+APP_AUTHOR = "mcp_server_evefleet"
+#compact once the journal holds this many times more lines than live entries
+COMPACT_RATIO = 2
+COMPACT_MIN_LINES = 1000
+
+def default_store_path() -> Path:
+    return Path(user_config_dir(APP_NAME, APP_AUTHOR)) / "chardict.jsonl"
+
+def load_legacy_chardict(init_file_name='setting/chardict.yaml') -> dict:
+    """name->id of the old YAML cache (CWD file, else the packaged one), only read to seed a new journal"""
+    import yaml
+    from mcp_server_evefleet.config_load import SafeLoader
+    init_file = Path(init_file_name)
+    try:
+        if init_file.exists():
+            with open(init_file, 'r', encoding='utf-8') as f:
+                return yaml.load(f, Loader=SafeLoader) or {}
+        with resources.files('mcp_server_evefleet').joinpath(init_file_name).open('r', encoding='utf-8') as f:
+            return yaml.load(f, Loader=SafeLoader) or {}
+    except FileNotFoundError:
+        return {}
+
+class CharStore():
+    """Character name->id map persisted as a JSON-lines journal, one `[name, id]` per line.
+
+    `name2id` is only written under the store lock (put_many), iterate a
+    snapshot() from other threads. Writes only queue entries; a background thread appends everything queued
+    within `flush_interval` in one write + fsync, off the request path. Loading
+    reads the journal line by line (later lines win), a torn last line from a
+    crash is dropped. When the journal grows past COMPACT_RATIO times the live
+    entries it is rewritten to a temp file and swapped in with os.replace, so a
+    crash mid-compaction leaves the old journal intact.
+
+    Args:
+        path (str|Path): Journal file
+        flush_interval (float): Seconds new entries are batched before they are written
+        seed (callable): Returns {name: id} for a journal that does not exist yet
+    """
+    def __init__(self, path=None, flush_interval=1.0, seed=None) -> None:
+        self.path = Path(path) if path else default_store_path()
+        self.flush_interval = float(flush_interval)
+        self.name2id = {}
+        self._lines = 0
+        self._pending = []
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"loaded": 0, "appended": 0, "flushes": 0, "compactions": 0}
+        self.load(seed)
+        atexit.register(self.close)
+
+    #persistence
+    def load(self, seed=None):
+        if not self.path.exists():
+            if seed is not None:
+                self.name2id.update({str(k).lower(): int(v) for k, v in (seed() or {}).items()})
+                self.compact()
+            return
+        torn = False
+        with self.path.open('r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    name, char_id = json.loads(line)
+                    self.name2id[name] = int(char_id)
+                    self._lines += 1
+                except (ValueError, TypeError):
+                    torn = True
+        self._stats["loaded"] = len(self.name2id)
+        if torn:
+            logger.warning(f"Dropped unreadable lines from {self.path}, compacting")
+            self.compact()
+
+    def put_many(self, items):
+        """Queue {name: id} for the next flush, the in-memory map is updated right away"""
+        if not items:
+            return
+        with self._lock:
+            for name, char_id in items.items():
+                self.name2id[str(name).lower()] = int(char_id)
+                self._pending.append((str(name).lower(), int(char_id)))
+        self.start()
+        self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open('a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(entry) + '\n' for entry in self._pending))
+                f.flush()
+                os.fsync(f.fileno())
+            self._lines += len(self._pending)
+            self._stats["appended"] += len(self._pending)
+            self._stats["flushes"] += 1
+            self._pending = []
+            if self._lines > COMPACT_MIN_LINES and self._lines > COMPACT_RATIO * len(self.name2id):
+                self.compact()
+
+    def compact(self):
+        """Rewrite the journal with one line per live entry, atomically"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            with tmp.open('w', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(entry) + '\n' for entry in self.name2id.items()))
+                f.flush()
+                os.fsync(f.fileno())
+            tmp.replace(self.path)
+            self._lines = len(self.name2id)
+            self._pending = []
+            self._stats["compactions"] += 1
+
+    #background flusher
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='char-store-flush', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            #collect everything that arrives within the window into one write
+            self._stop.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                #any error keeps the thread alive, the queued entries go out with the next flush
+                logger.warning(f"Character cache flush to {self.path} failed, retrying: {e!r}")
+                self._wake.set()
+                self._stop.wait(self.flush_interval)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        try:
+            self.flush()
+        except OSError as e:
+            logger.warning(f"Character cache flush to {self.path} failed: {e}")
+
+    #copy of the name map, safe to iterate while other threads learn names
+    def snapshot(self):
+        with self._lock:
+            return dict(self.name2id)
+
+    def stats(self):
+        with self._lock:
+            return {"path": str(self.path), "entries": len(self.name2id), "journal_lines": self._lines,
+                    "pending": len(self._pending), **self._stats}
+
+#shared store
+_store = None
+_store_lock = threading.Lock()
+
+def get_char_store(legacy_file='setting/chardict.yaml') -> CharStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CharStore(
+                    path=CONFIG.get('CHAR_STORE_PATH') or None,
+                    flush_interval=CONFIG.get('CHAR_STORE_FLUSH_INTERVAL', 1.0),
+                    seed=lambda: load_legacy_chardict(legacy_file),
+                )
+    return _store
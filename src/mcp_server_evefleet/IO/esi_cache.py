@@ -0,0 +1,124 @@
+"""_summary_
+ETag/Expires aware response cache for ESI GET endpoints
+"""
+#import
+import re
+import copy
+import time
+import threading
+from collections import OrderedDict, defaultdict
+from email.utils import parsedate_tz, mktime_tz
+from urllib.parse import urlsplit
+
+_ID_RE = re.compile(r'/\d+(?=/|$)')
+
+#endpoint name for stats, e.g. /latest/fleets/123/members/ -> fleets/{id}/members
+def endpoint_name(url, base_path=''):
+    path = urlsplit(url).path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    return _ID_RE.sub('/{id}', path).strip('/')
+
+#seconds until Expires, measured against the server Date header to ignore clock skew
+def expires_in(headers):
+    expires = headers.get('Expires')
+    if not expires:
+        return 0.0
+    expires_tuple = parsedate_tz(expires)
+    if expires_tuple is None:
+        return 0.0
+    date_tuple = parsedate_tz(headers.get('Date') or '')
+    now = mktime_tz(date_tuple) if date_tuple else time.time()
+    return max(mktime_tz(expires_tuple) - now, 0.0)
+
+class CacheEntry():
+    __slots__ = ('data', 'etag', 'expires_at')
+    def __init__(self, data, etag, expires_at) -> None:
+        self.data = data
+        self.etag = etag
+        self.expires_at = expires_at
+    def fresh(self):
+        return time.monotonic() < self.expires_at
+
+class ResponseCache():
+    """LRU cache of parsed ESI GET responses.
+
+    Entries are keyed by (url, access_token) so authed endpoints never leak between
+    characters. A fresh entry (inside `Expires`) is served without a request, a stale
+    one with an ETag is revalidated with `If-None-Match` and a 304 reuses the parsed
+    object. Callers always get a deep copy, since fleet_manager mutates wings/members.
+
+    Args:
+        max_entries (int): LRU bound
+        base_path (str): Path prefix stripped for endpoint stats names
+    """
+    def __init__(self, max_entries=2048, base_path='') -> None:
+        self.max_entries = int(max_entries)
+        self.base_path = base_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"hit": 0, "revalidated": 0, "miss": 0})
+
+    #lookup, returns (entry or None)
+    def get(self, url, access_token=None):
+        key = (url, access_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    #fresh hit, returns copy of data or None
+    def lookup_fresh(self, url, access_token=None):
+        entry = self.get(url, access_token)
+        if entry is not None and entry.fresh():
+            self.record(url, 'hit')
+            return True, copy.deepcopy(entry.data)
+        return False, None
+
+    #conditional headers for a stale entry
+    def conditional_headers(self, url, access_token=None):
+        entry = self.get(url, access_token)
+        if entry is not None and entry.etag:
+            return {"If-None-Match": entry.etag}
+        return {}
+
+    #store 200 response
+    def store(self, url, access_token, data, headers):
+        etag = headers.get('ETag')
+        ttl = expires_in(headers)
+        if not etag and ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(url, access_token)] = CacheEntry(copy.deepcopy(data), etag, time.monotonic() + ttl)
+            self._entries.move_to_end((url, access_token))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    #304 response, refresh expiry and return copy of cached data
+    def revalidate(self, url, access_token, headers):
+        entry = self.get(url, access_token)
+        if entry is None:
+            return None
+        entry.expires_at = time.monotonic() + expires_in(headers)
+        entry.etag = headers.get('ETag', entry.etag)
+        self.record(url, 'revalidated')
+        return copy.deepcopy(entry.data)
+
+    #drop entries whose url starts with prefix (after a write)
+    def invalidate(self, prefix):
+        with self._lock:
+            for key in [k for k in self._entries if k[0].startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def record(self, url, kind):
+        with self._lock:
+            self._stats[endpoint_name(url, self.base_path)][kind] += 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "endpoints": {k: dict(v) for k, v in self._stats.items()}}
@@ -0,0 +1,465 @@
+"""_summary_
+Shared ESI client: pooled keep-alive sessions for sync (requests) and async (aiohttp) calls
+"""
+#import
+import time
+import atexit
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from functools import wraps
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mcp_server_evefleet.config_load import CONFIG
+from mcp_server_evefleet.IO.esi_cache import ResponseCache, endpoint_name
+from mcp_server_evefleet.IO.esi_governor import ErrorLimitGovernor
+from mcp_server_evefleet.IO.esi_singleflight import SingleFlight
+from mcp_server_evefleet.IO.esi_retry import RetryPolicies, CircuitBreaker, ESIUnavailableError
+
+logger = logging.getLogger(__name__)
+
+ESI_BASE = CONFIG.get('ESI_BASE_URL', 'https://esi.evetech.net/latest').rstrip('/')
+#transport errors: safe = request never sent, ambiguous = ESI may have processed it
+SYNC_SAFE_ERRORS = (requests.exceptions.ConnectTimeout,)
+SYNC_AMBIGUOUS_ERRORS = (requests.ConnectionError, requests.Timeout)
+#aiohttp is imported on the first async call, it is the slowest import of the package
+_async_errors = None
+
+def async_errors():
+    """(safe, ambiguous) aiohttp transport errors"""
+    global _async_errors
+    if _async_errors is None:
+        import aiohttp
+        _async_errors = ((aiohttp.ClientConnectorError,), (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+    return _async_errors
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "mcp-server-evefleet (https://github.com/tedfytw1209/mcp-server-EVEfleet)",
+}
+
+class ESIClient():
+    """One client per process, owns the connection pools for every ESI call.
+
+    Sync helpers go through a `requests.Session` mounted with a sized `HTTPAdapter`.
+    Async helpers go through one `aiohttp.ClientSession` that lives on a private
+    background event loop, so sync code (fleet_manager, MCP tools) can drive
+    coroutines with `run` and batch coroutines can share the same connector.
+
+    Args:
+        base_url (str): ESI base url, e.g. "https://esi.evetech.net/latest"
+        pool_size (int): Max keep-alive connections per host (sync and async)
+        timeout (float): Request timeout in seconds
+        headers (dict): Extra default headers sent on every request
+        cache_size (int): Max cached GET responses, 0 disables the cache
+        governor (ErrorLimitGovernor): Shared error-limit throttle, default one per client
+        retry_policies (RetryPolicies): Per-endpoint retry/backoff table
+        breaker (CircuitBreaker): Fail-fast switch while ESI is down
+    """
+    def __init__(self, base_url=ESI_BASE, pool_size=20, timeout=10.0, headers=None, cache_size=2048,
+                 governor=None, retry_policies=None, breaker=None) -> None:
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = int(pool_size)
+        self.timeout = float(timeout)
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.cache = ResponseCache(cache_size, urlsplit(self.base_url).path) if cache_size else None
+        self.governor = governor if governor is not None else ErrorLimitGovernor()
+        self.flights = SingleFlight()
+        self.retry_policies = retry_policies if retry_policies is not None else RetryPolicies()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._retry_stats = {"retries": 0, "gave_up": 0}
+        #sync session
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        #async side, created lazily
+        self._loop = None
+        self._loop_thread = None
+        self._async_session = None
+        self._lock = threading.Lock()
+        self._async_stats = {"connections_opened": 0, "connections_reused": 0}
+
+    #url helper
+    def url(self, path):
+        return "{}/{}".format(self.base_url, path.lstrip('/'))
+
+    #drop cached GETs under the written resource, e.g. PUT fleets/1/members/2 -> fleets/1/
+    def invalidate_for_write(self, url):
+        if self.cache is None or not url.startswith(self.base_url):
+            return
+        parts = urlsplit(url).path[len(urlsplit(self.base_url).path):].strip('/').split('/')
+        self.cache.invalidate(self.url('/'.join(parts[:2])) + '/')
+
+    def retry_policy(self, method, url):
+        return self.retry_policies.policy_for(method, endpoint_name(url, urlsplit(self.base_url).path))
+
+    def _log_retry(self, method, url, attempt, reason, delay):
+        self._retry_stats["retries"] += 1
+        logger.info(f"Retrying {method} {endpoint_name(url, urlsplit(self.base_url).path)} ({reason}), attempt {attempt + 2} in {delay:.2f}s")
+
+    #access_token is a str or a TokenProvider, resolved per attempt so refreshed tokens are picked up
+    @staticmethod
+    def resolve_token(access_token):
+        return access_token.token() if hasattr(access_token, 'token') else access_token
+
+    @staticmethod
+    async def aresolve_token(access_token):
+        return await access_token.atoken() if hasattr(access_token, 'atoken') else access_token
+
+    #auth header
+    @staticmethod
+    def auth_headers(access_token=None, headers=None):
+        out = dict(headers or {})
+        if access_token:
+            out["Authorization"] = "Bearer {}".format(access_token)
+        return out
+
+    # =========================================================================
+    # SYNC
+    # =========================================================================
+    def request(self, method, url, access_token=None, headers=None, **kwargs):
+        """Send a request on the pooled session, returns requests.Response.
+
+        Every attempt passes the circuit breaker and the error-limit governor, transient
+        failures are retried following the endpoint's RetryPolicy. A 401 with a token
+        provider refreshes the token and resends once."""
+        kwargs.setdefault('timeout', self.timeout)
+        if method != 'GET':
+            self.invalidate_for_write(url)
+        policy = self.retry_policy(method, url)
+        attempt = 0
+        auth_retried = False
+        while True:
+            probe = self.breaker.before_request()
+            try:
+                self.governor.wait()
+                token = self.resolve_token(access_token)
+                try:
+                    res = self.session.request(method, url, headers=self.auth_headers(token, headers), **kwargs)
+                except SYNC_AMBIGUOUS_ERRORS as e:
+                    self.breaker.record_failure()
+                    if not policy.retry_exception(e, attempt, SYNC_SAFE_ERRORS, SYNC_AMBIGUOUS_ERRORS):
+                        if attempt > 0:
+                            self._retry_stats["gave_up"] += 1
+                        raise
+                    delay, reason = policy.delay(attempt), type(e).__name__
+                else:
+                    self.governor.update(res.headers, res.status_code)
+                    self.breaker.record_status(res.status_code)
+                    if res.status_code == 401 and not auth_retried and hasattr(access_token, 'refresh_after_401'):
+                        auth_retried = True
+                        access_token.refresh_after_401(token)
+                        continue
+                    if not policy.retry_status(res.status_code, attempt):
+                        if attempt > 0 and res.status_code >= 400:
+                            self._retry_stats["gave_up"] += 1
+                        return res
+                    delay, reason = policy.delay(attempt, res.headers.get('Retry-After')), res.status_code
+            finally:
+                #no-op once the attempt recorded a success/failure, frees a probe that was cancelled or hit an unexpected error
+                self.breaker.release_probe(probe)
+            self._log_retry(method, url, attempt, reason, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url, access_token=None, **kwargs):
+        return self.request('GET', url, access_token, **kwargs)
+
+    def post(self, url, access_token=None, **kwargs):
+        return self.request('POST', url, access_token, **kwargs)
+
+    def put(self, url, access_token=None, **kwargs):
+        return self.request('PUT', url, access_token, **kwargs)
+
+    def delete(self, url, access_token=None, **kwargs):
+        return self.request('DELETE', url, access_token, **kwargs)
+
+    def get_json(self, url, access_token=None, cache=True, **kwargs):
+        """GET and parse json, served from the ETag/Expires cache when possible.
+        Identical GETs already in flight (same url and token) share one request."""
+        use_cache = self.cache is not None and cache
+        if use_cache:
+            hit, data = self.cache.lookup_fresh(url, access_token)
+            if hit:
+                return data
+        return self.flights.do(('GET', url, access_token), lambda: self._fetch_json(url, access_token, use_cache, **kwargs))
+
+    def _fetch_json(self, url, access_token, use_cache, **kwargs):
+        if not use_cache:
+            res = self.get(url, access_token, **kwargs)
+            res.raise_for_status()
+            return res.json()
+        headers = {**kwargs.pop('headers', {}), **self.cache.conditional_headers(url, access_token)}
+        res = self.get(url, access_token, headers=headers, **kwargs)
+        if res.status_code == 304:
+            data = self.cache.revalidate(url, access_token, res.headers)
+            if data is not None:
+                return data
+            res = self.get(url, access_token, **kwargs)
+        res.raise_for_status()
+        data = res.json()
+        self.cache.record(url, 'miss')
+        self.cache.store(url, access_token, data, res.headers)
+        return data
+
+    # =========================================================================
+    # ASYNC
+    # =========================================================================
+    @property
+    def loop(self):
+        """Private event loop that owns the shared aiohttp session"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name='esi-client-loop', daemon=True)
+                self._loop_thread.start()
+        return self._loop
+
+    async def async_session(self):
+        """Shared aiohttp session, only valid on the client loop"""
+        if asyncio.get_running_loop() is not self._loop:
+            raise RuntimeError("ESI aiohttp session is only usable on the ESI client loop, wrap the coroutine with on_esi_loop")
+        if self._async_session is None or self._async_session.closed:
+            import aiohttp
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_conn_create)
+            trace.on_connection_reuseconn.append(self._on_conn_reuse)
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size)
+            self._async_session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[trace],
+            )
+        return self._async_session
+
+    @asynccontextmanager
+    async def shared_session(self):
+        """`async with` drop-in for aiohttp.ClientSession() that keeps the pool open"""
+        yield await self.async_session()
+
+    async def submit(self, coro):
+        """Await a coroutine on the client loop from any loop"""
+        loop = self.loop
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def run(self, coro):
+        """Run a coroutine on the client loop from sync code and wait for the result"""
+        loop = self.loop
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("ESIClient.run called from the ESI client loop, await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def arequest(self, method, url, access_token=None, headers=None, session=None, **kwargs):
+        """Async request, returns (status, headers, parsed json or None)"""
+        session = session or await self.async_session()
+        if method != 'GET':
+            self.invalidate_for_write(url)
+        policy = self.retry_policy(method, url)
+        attempt = 0
+        auth_retried = False
+        while True:
+            probe = self.breaker.before_request()
+            try:
+                await self.governor.await_turn()
+                token = await self.aresolve_token(access_token)
+                try:
+                    async with session.request(method, url, headers=self.auth_headers(token, headers), **kwargs) as response:
+                        self.governor.update(response.headers, response.status)
+                        self.breaker.record_status(response.status)
+                        if response.status == 401 and not auth_retried and hasattr(access_token, 'arefresh_after_401'):
+                            auth_retried = True
+                            await access_token.arefresh_after_401(token)
+                            continue
+                        if policy.retry_status(response.status, attempt):
+                            delay, reason = policy.delay(attempt, response.headers.get('Retry-After')), response.status
+                        else:
+                            if attempt > 0 and response.status >= 400:
+                                self._retry_stats["gave_up"] += 1
+                            if response.status == 304:
+                                return response.status, response.headers, None
+                            response.raise_for_status()
+                            if response.status == 204 or response.content_length == 0:
+                                return response.status, response.headers, None
+                            return response.status, response.headers, await response.json(content_type=None)
+                except async_errors()[1] as e:
+                    self.breaker.record_failure()
+                    if not policy.retry_exception(e, attempt, *async_errors()):
+                        if attempt > 0:
+                            self._retry_stats["gave_up"] += 1
+                        raise
+                    delay, reason = policy.delay(attempt), type(e).__name__
+            finally:
+                #no-op once the attempt recorded a success/failure, frees a probe that was cancelled or hit an unexpected error
+                self.breaker.release_probe(probe)
+            self._log_retry(method, url, attempt, reason, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def arequest_json(self, method, url, access_token=None, **kwargs):
+        """Async request on the shared session, returns parsed json (None if no body)"""
+        _, _, data = await self.arequest(method, url, access_token, **kwargs)
+        return data
+
+    async def aget_json(self, url, access_token=None, cache=True, **kwargs):
+        """Async GET through the same ETag/Expires cache and single-flight as get_json"""
+        use_cache = self.cache is not None and cache
+        if use_cache:
+            hit, data = self.cache.lookup_fresh(url, access_token)
+            if hit:
+                return data
+        return await self.flights.ado(('GET', url, access_token), lambda: self._afetch_json(url, access_token, use_cache, **kwargs))
+
+    async def _afetch_json(self, url, access_token, use_cache, **kwargs):
+        if not use_cache:
+            return await self.arequest_json('GET', url, access_token, **kwargs)
+        headers = {**kwargs.pop('headers', {}), **self.cache.conditional_headers(url, access_token)}
+        status, res_headers, data = await self.arequest('GET', url, access_token, headers=headers, **kwargs)
+        if status == 304:
+            cached = self.cache.revalidate(url, access_token, res_headers)
+            if cached is not None:
+                return cached
+            status, res_headers, data = await self.arequest('GET', url, access_token, **kwargs)
+        self.cache.record(url, 'miss')
+        self.cache.store(url, access_token, data, res_headers)
+        return data
+
+    async def _on_conn_create(self, session, ctx, params):
+        self._async_stats["connections_opened"] += 1
+
+    async def _on_conn_reuse(self, session, ctx, params):
+        self._async_stats["connections_reused"] += 1
+
+    # =========================================================================
+    # STATS / LIFECYCLE
+    # =========================================================================
+    def stats(self):
+        """Connection reuse counters for sync and async pools"""
+        opened, requests_sent = 0, 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+                requests_sent += pool.num_requests
+        return {
+            "pool_size": self.pool_size,
+            "sync": {
+                "requests": requests_sent,
+                "connections_opened": opened,
+                "connections_reused": max(requests_sent - opened, 0),
+            },
+            "async": dict(self._async_stats),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "governor": self.governor.stats(),
+            "single_flight": self.flights.stats(),
+            "retry": dict(self._retry_stats),
+            "breaker": self.breaker.stats(),
+        }
+
+    def close(self):
+        self.session.close()
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            if self._async_session is not None and not self._async_session.closed:
+                asyncio.run_coroutine_threadsafe(self._async_session.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._loop_thread.join(timeout=5)
+            loop.close()
+        self._async_session = None
+
+#singleton
+_client = None
+_client_lock = threading.Lock()
+
+def get_esi_client() -> ESIClient:
+    """Process-wide ESI client built from config.yaml (ESI_BASE_URL, ESI_POOL_SIZE, ESI_TIMEOUT, ESI_CACHE_SIZE, ESI_ERROR_LIMIT_*, ESI_RETRY_*, ESI_BREAKER_*)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ESIClient(
+                    base_url=ESI_BASE,
+                    pool_size=CONFIG.get('ESI_POOL_SIZE', 20),
+                    timeout=CONFIG.get('ESI_TIMEOUT', 10),
+                    cache_size=CONFIG.get('ESI_CACHE_SIZE', 2048),
+                    governor=ErrorLimitGovernor(
+                        slowdown_below=CONFIG.get('ESI_ERROR_LIMIT_SLOWDOWN', 50),
+                        floor=CONFIG.get('ESI_ERROR_LIMIT_FLOOR', 5),
+                    ),
+                    retry_policies=RetryPolicies(
+                        max_attempts=CONFIG.get('ESI_RETRY_MAX_ATTEMPTS', 4),
+                        base_delay=CONFIG.get('ESI_RETRY_BASE_DELAY', 0.5),
+                        max_delay=CONFIG.get('ESI_RETRY_MAX_DELAY', 8.0),
+                    ),
+                    breaker=CircuitBreaker(
+                        threshold=CONFIG.get('ESI_BREAKER_THRESHOLD', 10),
+                        cooldown=CONFIG.get('ESI_BREAKER_COOLDOWN', 30),
+                    ),
+                )
+    return _client
+
+def set_esi_client(client: ESIClient) -> ESIClient:
+    """Replace the process-wide client (e.g. different pool size or base url)"""
+    global _client
+    with _client_lock:
+        old, _client = _client, client
+    if old is not None and old is not client:
+        old.close()
+    return client
+
+#close pools on interpreter exit
+@atexit.register
+def _close_client():
+    if _client is not None:
+        _client.close()
+
+#gather with at most `concurrency` coroutines in flight, exceptions returned in place
+async def bounded_gather(coros, concurrency):
+    semaphore = asyncio.Semaphore(max(int(concurrency), 1))
+    async def _run(coro):
+        async with semaphore:
+            return await coro
+    return await asyncio.gather(*[_run(coro) for coro in coros], return_exceptions=True)
+
+#decorator: run coroutine body on the ESI client loop
+def on_esi_loop(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await get_esi_client().submit(func(*args, **kwargs))
+    return wrapper
+
+#decorator: run async generator body on the ESI client loop, items are pulled one at a time
+#so the producer never runs ahead of the consumer
+def on_esi_loop_gen(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        client = get_esi_client()
+        agen = func(*args, **kwargs)
+        if asyncio.get_running_loop() is client.loop:
+            async for item in agen:
+                yield item
+            return
+        async def _next():
+            return await agen.__anext__()
+        try:
+            while True:
+                try:
+                    item = await client.submit(_next())
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            await client.submit(agen.aclose())
+    return wrapper
@@ -0,0 +1,713 @@
+"""_summary_
+Offline ESI stand-in server with record/replay cassettes, for benchmarks and regression runs
+
+    python -m mcp_server_evefleet.IO.esi_emulator --port 8090 --members 250 --latency 0.05 --error-rate 0.02
+    python -m mcp_server_evefleet.IO.esi_emulator --record esi.cassette.json --upstream https://esi.evetech.net/latest
+    python -m mcp_server_evefleet.IO.esi_emulator --replay esi.cassette.json
+
+then set ESI_BASE_URL: "http://127.0.0.1:8090/latest" in config.yaml
+"""
+#import
+import re
+import os
+import csv
+import json
+import time
+import heapq
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_tz, mktime_tz
+from importlib import resources
+from urllib.parse import parse_qs
+import yaml
+import aiohttp
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+#seconds ESI caches each GET, used for Expires
+DEFAULT_EXPIRES = {
+    'characters/{id}': 3600,
+    'characters/{id}/location': 5,
+    'characters/{id}/fleet': 60,
+    'fleets/{id}': 5,
+    'fleets/{id}/members': 5,
+    'fleets/{id}/wings': 5,
+    'universe/systems': 86400,
+    'universe/systems/{id}': 86400,
+    'universe/stargates/{id}': 86400,
+    'universe/stations/{id}': 86400,
+    'universe/types/{id}': 86400,
+    'universe/groups/{id}': 86400,
+    'route/{id}/{id}': 86400,
+}
+#headers kept in cassettes (never Authorization)
+CASSETTE_HEADERS = ('Date', 'Expires', 'ETag', 'Content-Type', 'X-Pages', 'X-ESI-Error-Limit-Remain', 'X-ESI-Error-Limit-Reset')
+INJECTED_STATUSES = (502, 503, 504)
+NAME2ID_MAX = 500
+ID2NAME_MAX = 1000
+FC_ID = 90000000
+
+#utils func
+def _load_setting(name, loader):
+    with resources.files('mcp_server_evefleet').joinpath('setting', name).open('r', encoding='utf-8') as f:
+        return loader(f)
+
+def _etag(body):
+    return '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+
+def _canonical_body(body):
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body
+
+class ESIUniverse():
+    """Read-only universe/name data from the packaged setting files"""
+    def __init__(self) -> None:
+        static = _load_setting('static.yaml', yaml.safe_load) or {}
+        self.systems = {int(k): v for k, v in (static.get('system') or {}).items()}
+        self.stargates = {int(k): v for k, v in (static.get('stargate') or {}).items()}
+        self.stations = {int(k): v for k, v in (static.get('station') or {}).items()}
+        system_names = _load_setting('system.yaml', yaml.safe_load) or {}
+        self.system_names = {int(v): str(k) for k, v in system_names.items()}
+        for system_id, system in self.systems.items():
+            self.system_names[system_id] = system.get('name', self.system_names.get(system_id))
+        chardict = _load_setting('chardict.yaml', yaml.safe_load) or {}
+        self.characters = {int(v): str(k) for k, v in chardict.items()}
+        self.type_names = {}
+        self.type_groups = {}
+        self.group_names = {}
+        with resources.files('mcp_server_evefleet').joinpath('setting', 'shipid_list.csv').open('r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.type_names[int(row['typeID'])] = row['typeName']
+                self.type_groups[int(row['typeID'])] = int(row['groupID'])
+                self.group_names[int(row['groupID'])] = row['groupName']
+        #adjacency for route
+        self.gates = {}
+        for gate in self.stargates.values():
+            destination = (gate.get('destination') or {}).get('system_id')
+            if destination:
+                self.gates.setdefault(int(gate['system_id']), set()).add(int(destination))
+                self.gates.setdefault(int(destination), set()).add(int(gate['system_id']))
+
+    def system(self, system_id):
+        if system_id in self.systems:
+            return self.systems[system_id]
+        if system_id in self.system_names:
+            return {"system_id": system_id, "name": self.system_names[system_id], "security_status": 0.0,
+                    "constellation_id": 0, "stargates": [], "position": {"x": 0.0, "y": 0.0, "z": 0.0}}
+        return None
+
+    def security(self, system_id):
+        return float((self.systems.get(system_id) or {}).get('security_status', 0.0))
+
+    #dijkstra, flag weights mirror ESI: secure avoids <0.45, insecure prefers it
+    def route(self, origin, destination, flag='shortest', avoid=()):
+        if origin == destination:
+            return [origin]
+        avoid = set(avoid)
+        def cost(system_id):
+            high = self.security(system_id) >= 0.45
+            if flag == 'secure':
+                return 1 if high else 50000
+            if flag == 'insecure':
+                return 50000 if high else 1
+            return 1
+        best = {origin: 0}
+        prev = {}
+        heap = [(0, origin)]
+        while heap:
+            dist, node = heapq.heappop(heap)
+            if node == destination:
+                path = [node]
+                while node in prev:
+                    node = prev[node]
+                    path.append(node)
+                return path[::-1]
+            if dist > best.get(node, float('inf')):
+                continue
+            for neighbour in self.gates.get(node, ()):
+                if neighbour in avoid and neighbour != destination:
+                    continue
+                new_dist = dist + cost(neighbour)
+                if new_dist < best.get(neighbour, float('inf')):
+                    best[neighbour] = new_dist
+                    prev[neighbour] = node
+                    heapq.heappush(heap, (new_dist, neighbour))
+        return None
+
+class EmulatedFleet():
+    """Mutable fleet state: one FC plus `members` synthetic pilots in Wing 1 / Squad 1.
+
+    Invites are accepted immediately so writes show up in the next members GET.
+    """
+    def __init__(self, universe, fleet_id=1000000000001, fc_id=FC_ID, members=40, seed=0) -> None:
+        rng = random.Random(seed)
+        self.fleet_id = int(fleet_id)
+        self.fc_id = int(fc_id)
+        self.settings = {"is_free_move": False, "is_registered": False, "is_voice_enabled": False, "motd": ""}
+        self._next_id = 1
+        self.wings = []
+        wing_id = self.create_wing()
+        squad_id = self.create_squad(wing_id)
+        systems = sorted(universe.systems) or sorted(universe.system_names)[:50]
+        ships = sorted(universe.type_names)
+        home = systems[0]
+        #known pilots from chardict can be invited, synthetic ones start in fleet
+        self.characters = dict(universe.characters)
+        self.characters[self.fc_id] = "Emu Commander"
+        self.locations = {self.fc_id: home}
+        self.ships = {self.fc_id: rng.choice(ships)}
+        pilots = [self.fc_id + i for i in range(1, int(members) + 1)]
+        for i, char_id in enumerate(pilots, 1):
+            self.characters[char_id] = f"Emu Pilot {i:04d}"
+            #most of the fleet on grid with the FC, the rest scattered
+            self.locations[char_id] = home if rng.random() < 0.8 else rng.choice(systems)
+            self.ships[char_id] = rng.choice(ships)
+        self.rng = rng
+        self.systems = systems
+        self.ship_types = ships
+        self.members = {}
+        self.join(self.fc_id, 'fleet_commander')
+        for char_id in pilots:
+            self.join(char_id, 'squad_member', wing_id, squad_id)
+
+    def new_id(self):
+        self._next_id += 1
+        return self.fleet_id * 100 + self._next_id
+
+    def find_wing(self, wing_id):
+        return next((w for w in self.wings if w['id'] == wing_id), None)
+
+    def create_wing(self):
+        wing_id = self.new_id()
+        self.wings.append({"id": wing_id, "name": f"Wing {len(self.wings) + 1}", "squads": []})
+        return wing_id
+
+    def create_squad(self, wing_id):
+        wing = self.find_wing(wing_id)
+        if wing is None:
+            return None
+        squad_id = self.new_id()
+        wing['squads'].append({"id": squad_id, "name": f"Squad {len(wing['squads']) + 1}"})
+        return squad_id
+
+    def join(self, char_id, role='squad_member', wing_id=-1, squad_id=-1):
+        if char_id not in self.locations:
+            self.locations[char_id] = self.rng.choice(self.systems)
+            self.ships[char_id] = self.rng.choice(self.ship_types)
+        self.members[char_id] = {
+            "character_id": char_id,
+            "join_time": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "role": role,
+            "role_name": role.replace('_', ' ').title(),
+            "ship_type_id": self.ships[char_id],
+            "solar_system_id": self.locations[char_id],
+            "squad_id": squad_id if squad_id else -1,
+            "takes_fleet_warp": True,
+            "wing_id": wing_id if wing_id else -1,
+        }
+
+    #role/position rules of PUT fleets/{id}/members/{id}, returns error or None
+    def check_position(self, role, wing_id, squad_id):
+        if role == 'fleet_commander':
+            return None if not wing_id and not squad_id else "fleet_commander takes no wing_id/squad_id"
+        if role == 'wing_commander':
+            if not wing_id or squad_id:
+                return "wing_commander needs only wing_id"
+            return None if self.find_wing(wing_id) else "wing not found"
+        if role in ('squad_commander', 'squad_member'):
+            wing = self.find_wing(wing_id) if wing_id else None
+            if wing is None or not any(s['id'] == squad_id for s in wing['squads']):
+                return "squad not found"
+            return None
+        return f"invalid role {role}"
+
+class Cassette():
+    """Recorded ESI interactions, matched by (method, path, body).
+
+    Repeated requests replay their recordings in order, the last one repeats once
+    they run out, so polling loops stay deterministic.
+    """
+    def __init__(self, path) -> None:
+        self.path = path
+        self.interactions = []
+        self._cursor = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.interactions = json.load(f).get('interactions', [])
+
+    @staticmethod
+    def key(method, path, body):
+        return (method, path, json.dumps(body, sort_keys=True))
+
+    def record(self, method, path, body, status, headers, data):
+        with self._lock:
+            self.interactions.append({
+                "method": method, "path": path, "body": body, "status": status,
+                "headers": {k: headers[k] for k in CASSETTE_HEADERS if k in headers},
+                "response": data,
+            })
+
+    def match(self, method, path, body):
+        key = self.key(method, path, body)
+        with self._lock:
+            found = [i for i in self.interactions if self.key(i['method'], i['path'], i.get('body')) == key]
+            if not found:
+                return None
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            return found[min(index, len(found) - 1)]
+
+    def save(self):
+        with self._lock:
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "interactions": self.interactions}, f, indent=1)
+            os.replace(tmp, self.path)
+
+class ESIEmulator():
+    """aiohttp app serving the ESI routes this package calls.
+
+    Every response carries Date/Expires/ETag (If-None-Match answers 304) and
+    X-ESI-Error-Limit-Remain/-Reset; once the error budget is spent the emulator
+    answers 420 until the window resets, like ESI. `error_rate` injects
+    502/503/504, a 504 is returned after the write was applied (ESI timed out
+    but processed it), 502/503 before.
+
+    Args:
+        members (int): Synthetic pilots in the fleet besides the FC
+        latency (float): Base delay per request in seconds
+        jitter (float): Extra uniform random delay in seconds
+        error_rate (float): Fraction of requests answered with an injected 5xx
+        error_limit (int): Errors allowed per window before 420
+        error_window (int): Error window length in seconds
+        expires (int): Override every GET cache time, None for ESI's
+        base_path (str): Path prefix served, matches ESI_BASE_URL
+        record (str): Cassette path to record upstream traffic into
+        replay (str): Cassette path to serve from
+        upstream (str): ESI root proxied in record mode
+        seed (int): RNG seed for fleet layout and injected errors
+    """
+    def __init__(self, members=40, latency=0.0, jitter=0.0, error_rate=0.0, error_limit=100, error_window=60,
+                 expires=None, base_path='/latest', fleet_id=1000000000001, fc_id=FC_ID,
+                 record=None, replay=None, upstream='https://esi.evetech.net/latest', seed=0) -> None:
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.error_rate = float(error_rate)
+        self.error_limit = int(error_limit)
+        self.error_window = int(error_window)
+        self.expires = expires
+        self.base_path = '/' + base_path.strip('/') if base_path.strip('/') else ''
+        self.upstream = upstream.rstrip('/')
+        self.rng = random.Random(seed)
+        self.universe = ESIUniverse()
+        self.fleet = EmulatedFleet(self.universe, fleet_id, fc_id, members, seed)
+        self.mode = 'record' if record else 'replay' if replay else 'emulate'
+        self.cassette = Cassette(record or replay) if self.mode != 'emulate' else None
+        if self.mode == 'record':
+            self.cassette.interactions = []
+        self._errors = 0
+        self._window_start = time.monotonic()
+        self._upstream_session = None
+        self._runner = None
+        self._loop = None
+        self._thread = None
+        self.stats = {"requests": 0, "not_modified": 0, "injected": 0, "error_limited": 0}
+        self.routes = [
+            ('GET', r'characters/(\d+)', self.get_character, False),
+            ('GET', r'characters/(\d+)/location', self.get_location, True),
+            ('GET', r'characters/(\d+)/fleet', self.get_character_fleet, True),
+            ('GET', r'fleets/(\d+)', self.get_fleet, True),
+            ('PUT', r'fleets/(\d+)', self.put_fleet, True),
+            ('GET', r'fleets/(\d+)/members', self.get_members, True),
+            ('POST', r'fleets/(\d+)/members', self.post_invite, True),
+            ('PUT', r'fleets/(\d+)/members/(\d+)', self.put_move, True),
+            ('DELETE', r'fleets/(\d+)/members/(\d+)', self.delete_kick, True),
+            ('GET', r'fleets/(\d+)/wings', self.get_wings, True),
+            ('POST', r'fleets/(\d+)/wings', self.post_wing, True),
+            ('POST', r'fleets/(\d+)/wings/(\d+)/squads', self.post_squad, True),
+            ('GET', r'universe/systems', self.get_systems, False),
+            ('GET', r'universe/systems/(\d+)', self.get_system, False),
+            ('GET', r'universe/stargates/(\d+)', self.get_stargate, False),
+            ('GET', r'universe/stations/(\d+)', self.get_station, False),
+            ('GET', r'universe/types/(\d+)', self.get_type, False),
+            ('GET', r'universe/groups/(\d+)', self.get_group, False),
+            ('POST', r'universe/ids', self.post_ids, False),
+            ('POST', r'universe/names', self.post_names, False),
+            ('GET', r'route/(\d+)/(\d+)', self.get_route, False),
+            ('POST', r'ui/autopilot/waypoint', self.post_waypoint, True),
+        ]
+        self.routes = [(m, re.compile(p + '/?$'), fn, auth) for m, p, fn, auth in self.routes]
+
+    #app
+    def make_app(self):
+        app = web.Application()
+        app.router.add_route('*', self.base_path + '/{tail:.*}', self.handle)
+        app.on_cleanup.append(self._cleanup)
+        return app
+
+    async def _cleanup(self, app):
+        if self._upstream_session is not None:
+            await self._upstream_session.close()
+        if self.mode == 'record':
+            self.cassette.save()
+            logger.info(f"saved {len(self.cassette.interactions)} interactions to {self.cassette.path}")
+
+    def _error_window(self):
+        now = time.monotonic()
+        if now - self._window_start >= self.error_window:
+            self._window_start = now
+            self._errors = 0
+        return max(int(self.error_window - (now - self._window_start)), 1)
+
+    async def handle(self, request):
+        self.stats["requests"] += 1
+        self._error_window()
+        if self._errors >= self.error_limit:
+            self.stats["error_limited"] += 1
+            return self.respond(request, 420, {"error": "This software has exceeded the error limit for ESI."}, 0)
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+        path = request.match_info['tail'].strip('/')
+        body = _canonical_body(await request.text())
+        injected = self.rng.choice(INJECTED_STATUSES) if self.rng.random() < self.error_rate else None
+        if injected in (502, 503):
+            self.stats["injected"] += 1
+            return self.respond(request, injected, {"error": "Injected upstream failure"}, 0)
+        if self.mode == 'replay':
+            response = self.replay(request, body)
+        elif self.mode == 'record':
+            response = await self.proxy(request, body)
+        else:
+            response = self.dispatch(request, path, body)
+        if injected == 504:
+            self.stats["injected"] += 1
+            return self.respond(request, 504, {"error": "Timeout contacting tranquility"}, 0)
+        return response
+
+    def dispatch(self, request, path, body):
+        query = {k: v[-1] for k, v in parse_qs(request.query_string).items()}
+        path_matched = False
+        for method, pattern, fn, auth in self.routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            path_matched = True
+            if method != request.method:
+                continue
+            if auth and not request.headers.get('Authorization', '').startswith('Bearer '):
+                return self.respond(request, 401, {"error": "authorization not provided"}, 0)
+            status, data = fn(*[int(g) for g in match.groups()], query=query, body=body)
+            return self.respond(request, status, data, self.ttl(request.method, path))
+        if path_matched:
+            return self.respond(request, 405, {"error": "Method not allowed"}, 0)
+        return self.respond(request, 404, {"error": "Not found"}, 0)
+
+    def ttl(self, method, path):
+        if method != 'GET':
+            return 0
+        if self.expires is not None:
+            return int(self.expires)
+        return DEFAULT_EXPIRES.get(re.sub(r'(?<=/)\d+|^\d+', '{id}', path), 0)
+
+    #build response with ESI headers, count errors, answer If-None-Match
+    def respond(self, request, status, data, ttl, etag=None):
+        if status >= 400 and status != 420:
+            self._errors += 1
+        reset = self._error_window()
+        headers = {
+            'Date': formatdate(usegmt=True),
+            'X-ESI-Error-Limit-Remain': str(max(self.error_limit - self._errors, 0)),
+            'X-ESI-Error-Limit-Reset': str(reset),
+        }
+        if status == 204 or data is None:
+            return web.Response(status=status, headers=headers)
+        body = json.dumps(data)
+        if request.method == 'GET' and status == 200:
+            headers['Expires'] = formatdate(time.time() + ttl, usegmt=True)
+            headers['ETag'] = etag or _etag(body)
+            if request.headers.get('If-None-Match') == headers['ETag']:
+                self.stats["not_modified"] += 1
+                return web.Response(status=304, headers=headers)
+        return web.Response(status=status, text=body, content_type='application/json', headers=headers)
+
+    #record mode
+    async def proxy(self, request, body):
+        if self._upstream_session is None:
+            self._upstream_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        path_qs = request.path_qs[len(self.base_path):]
+        headers = {k: v for k, v in request.headers.items() if k in ('Authorization', 'Content-Type', 'User-Agent')}
+        async with self._upstream_session.request(request.method, self.upstream + path_qs, headers=headers,
+                                                  data=await request.read() or None) as res:
+            try:
+                data = await res.json(content_type=None) if res.status != 204 else None
+            except ValueError:
+                data = None
+            self.cassette.record(request.method, path_qs, body, res.status, res.headers, data)
+            return self.respond(request, res.status, data, self._recorded_ttl(res.headers), res.headers.get('ETag'))
+
+    #replay mode, Expires shifted to now keeping the recorded TTL
+    def replay(self, request, body):
+        path_qs = request.path_qs[len(self.base_path):]
+        found = self.cassette.match(request.method, path_qs, body)
+        if found is None:
+            return self.respond(request, 404, {"error": f"No recorded interaction for {request.method} {path_qs}"}, 0)
+        return self.respond(request, found['status'], found.get('response'),
+                            self._recorded_ttl(found.get('headers', {})), found.get('headers', {}).get('ETag'))
+
+    @staticmethod
+    def _recorded_ttl(headers):
+        expires, date = parsedate_tz(headers.get('Expires') or ''), parsedate_tz(headers.get('Date') or '')
+        if expires is None or date is None:
+            return 0
+        return max(mktime_tz(expires) - mktime_tz(date), 0)
+
+    #handlers, return (status, data)
+    def _fleet(self, fleet_id):
+        return self.fleet if fleet_id == self.fleet.fleet_id else None
+
+    def get_character(self, char_id, query, body):
+        name = self.fleet.characters.get(char_id)
+        if name is None:
+            return 404, {"error": "Character not found"}
+        return 200, {"name": name, "corporation_id": 98000001, "birthday": "2015-01-01T00:00:00Z",
+                     "gender": "male", "race_id": 1, "bloodline_id": 1, "security_status": 0.0}
+
+    def get_location(self, char_id, query, body):
+        if char_id not in self.fleet.characters:
+            return 404, {"error": "Character not found"}
+        return 200, {"solar_system_id": self.fleet.locations[char_id]}
+
+    def get_character_fleet(self, char_id, query, body):
+        member = self.fleet.members.get(char_id)
+        if member is None:
+            return 404, {"error": "Character is not in a fleet"}
+        return 200, {"fleet_id": self.fleet.fleet_id, "role": member['role'],
+                     "squad_id": member['squad_id'], "wing_id": member['wing_id']}
+
+    def get_fleet(self, fleet_id, query, body):
+        fleet = self._fleet(fleet_id)
+        if fleet is None:
+            return 404, {"error": "Fleet not found"}
+        return 200, dict(fleet.settings)
+
+    def put_fleet(self, fleet_id, query, body):
+        fleet = self._fleet(fleet_id)
+        if fleet is None:
+            return 404, {"error": "Fleet not found"}
+        if not isinstance(body, dict):
+            return 400, {"error": "Invalid body"}
+        if 'motd' in body:
+            fleet.settings['motd'] = str(body['motd'])
+        if 'is_free_move' in body:
+            fleet.settings['is_free_move'] = bool(body['is_free_move'])
+        return 204, None
+
+    def get_members(self, fleet_id, query, body):
+        fleet = self._fleet(fleet_id)
+        if fleet is None:
+            return 404, {"error": "Fleet not found"}
+        return 200, list(fleet.members.values())
+
+    def post_invite(self, fleet_id, query, body):
+        fleet = self._fleet(fleet_id)
+        if fleet is None:
+            return 404, {"error": "Fleet not found"}
+        if not isinstance(body, dict) or 'character_id' not in body:
+            return 400, {"error": "Invalid body"}
+        char_id = int(body['character_id'])
+        if char_id not in fleet.characters:
+            return 404, {"error": "Character not found"}
+        if char_id in fleet.members:
+            return 422, {"error": "Character is already in a fleet"}
+        role, wing_id, squad_id = body.get('role', 'squad_member'), body.get('wing_id'), body.get('squad_id')
+        if wing_id is None and squad_id is None and role == 'squad_member':
+            wing = next((w for w in fleet.wings if w['squads']), None)
+            if wing is not None:
+                wing_id, squad_id = wing['id'], wing['squads'][0]['id']
+        error = fleet.check_position(role, wing_id, squad_id)
+        if error:
+            return 422, {"error": error}
+        fleet.join(char_id, role, wing_id, squad_id)
+        return 204, None
+
+    def put_move(self, fleet_id, char_id, query, body):
+        fleet = self._fleet(fleet_id)
+        if fleet is None or char_id not in fleet.members:
+            return 404, {"error": "Fleet member not found"}
+        if not isinstance(body, dict):
+            return 400, {"error": "Invalid body"}
+        role, wing_id, squad_id = body.get('role', 'squad_member'), body.get('wing_id'), body.get('squad_id')
+        error = fleet.check_position(role, wing_id, squad_id)
+        if error:
+            return 422, {"error": error}
+        member = fleet.members[char_id]
+        member.update({"role": role, "role_name": role.replace('_', ' ').title(),
+                       "wing_id": wing_id or -1, "squad_id": squad_id or -1})
+        return 204, None
+
+    def delete_kick(self, fleet_id, char_id, query, body):
+        fleet = self._fleet(fleet_id)
+        if fleet is None or char_id not in fleet.members:
+            return 404, {"error": "Fleet member not found"}
+        del fleet.members[char_id]
+        return 204, None
+
+    def get_wings(self, fleet_id, query, body):
+        fleet = self._fleet(fleet_id)
+        if fleet is None:
+            return 404, {"error": "Fleet not found"}
+        return 200, fleet.wings
+
+    def post_wing(self, fleet_id, query, body):
+        fleet = self._fleet(fleet_id)
+        if fleet is None:
+            return 404, {"error": "Fleet not found"}
+        if len(fleet.wings) >= 25:
+            return 422, {"error": "Fleet wing limit reached"}
+        return 201, {"wing_id": fleet.create_wing()}
+
+    def post_squad(self, fleet_id, wing_id, query, body):
+        fleet = self._fleet(fleet_id)
+        wing = fleet.find_wing(wing_id) if fleet else None
+        if wing is None:
+            return 404, {"error": "Wing not found"}
+        if len(wing['squads']) >= 25:
+            return 422, {"error": "Wing squad limit reached"}
+        return 201, {"squad_id": fleet.create_squad(wing_id)}
+
+    def get_systems(self, query, body):
+        return 200, sorted(set(self.universe.systems) | set(self.universe.system_names))
+
+    def get_system(self, system_id, query, body):
+        system = self.universe.system(system_id)
+        return (200, system) if system else (404, {"error": "Solar system not found"})
+
+    def get_stargate(self, stargate_id, query, body):
+        stargate = self.universe.stargates.get(stargate_id)
+        return (200, stargate) if stargate else (404, {"error": "Stargate not found"})
+
+    def get_station(self, station_id, query, body):
+        station = self.universe.stations.get(station_id)
+        return (200, station) if station else (404, {"error": "Station not found"})
+
+    def get_type(self, type_id, query, body):
+        if type_id not in self.universe.type_names:
+            return 404, {"error": "Type not found"}
+        return 200, {"type_id": type_id, "name": self.universe.type_names[type_id],
+                     "group_id": self.universe.type_groups[type_id], "published": True}
+
+    def get_group(self, group_id, query, body):
+        if group_id not in self.universe.group_names:
+            return 404, {"error": "Group not found"}
+        return 200, {"group_id": group_id, "name": self.universe.group_names[group_id], "category_id": 6,
+                     "published": True, "types": [t for t, g in self.universe.type_groups.items() if g == group_id]}
+
+    def post_ids(self, query, body):
+        if not isinstance(body, list) or len(body) > NAME2ID_MAX:
+            return 400, {"error": f"Expected a list of at most {NAME2ID_MAX} names"}
+        tables = (('characters', self.fleet.characters), ('systems', self.universe.system_names),
+                  ('inventory_types', self.universe.type_names))
+        result = {}
+        wanted = {str(name).lower() for name in body}
+        for category, table in tables:
+            found = [{"id": i, "name": n} for i, n in table.items() if n.lower() in wanted]
+            if found:
+                result[category] = found
+        return 200, result
+
+    def post_names(self, query, body):
+        if not isinstance(body, list) or len(body) > ID2NAME_MAX:
+            return 400, {"error": f"Expected a list of at most {ID2NAME_MAX} ids"}
+        tables = (('character', self.fleet.characters), ('solar_system', self.universe.system_names),
+                  ('inventory_type', self.universe.type_names))
+        result = []
+        for item_id in dict.fromkeys(int(i) for i in body):
+            found = next(((c, t[item_id]) for c, t in tables if item_id in t), None)
+            if found is None:
+                return 404, {"error": "Ensure all IDs are valid before resolving."}
+            result.append({"category": found[0], "id": item_id, "name": found[1]})
+        return 200, result
+
+    def get_route(self, origin, destination, query, body):
+        for system_id in (origin, destination):
+            if self.universe.system(system_id) is None:
+                return 404, {"error": "Solar system not found"}
+        avoid = [int(i) for i in query.get('avoid', '').split(',') if i.strip().isdigit()]
+        route = self.universe.route(origin, destination, query.get('flag', 'shortest'), avoid)
+        return (200, route) if route else (404, {"error": "No route found"})
+
+    def post_waypoint(self, query, body):
+        if not str(query.get('destination_id', '')).isdigit():
+            return 400, {"error": "destination_id is required"}
+        return 204, None
+
+    #run in a background thread (benchmarks), returns ESI base url
+    def start_in_thread(self, host='127.0.0.1', port=0):
+        started = threading.Event()
+        box = {}
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._loop = loop
+            self._runner = web.AppRunner(self.make_app())
+            loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, host, port)
+            loop.run_until_complete(site.start())
+            box['port'] = site._server.sockets[0].getsockname()[1]
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self._runner.cleanup())
+            loop.close()
+        self._thread = threading.Thread(target=run, name='esi-emulator', daemon=True)
+        self._thread.start()
+        started.wait()
+        return f"http://{host}:{box['port']}{self.base_path}"
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline ESI stand-in for benchmarks and regression tests')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--base-path', default='/latest')
+    parser.add_argument('--members', type=int, default=40, help='synthetic pilots besides the FC')
+    parser.add_argument('--fleet-id', type=int, default=1000000000001)
+    parser.add_argument('--fc-id', type=int, default=FC_ID)
+    parser.add_argument('--latency', type=float, default=0.0, help='base delay per request (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random delay per request (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of injected 502/503/504')
+    parser.add_argument('--error-limit', type=int, default=100, help='errors per window before 420')
+    parser.add_argument('--error-window', type=int, default=60)
+    parser.add_argument('--expires', type=int, default=None, help='override GET cache time (s)')
+    parser.add_argument('--seed', type=int, default=0)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--record', metavar='CASSETTE', help='proxy to --upstream and record')
+    mode.add_argument('--replay', metavar='CASSETTE', help='serve recorded interactions')
+    parser.add_argument('--upstream', default='https://esi.evetech.net/latest')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    emulator = ESIEmulator(members=args.members, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           error_limit=args.error_limit, error_window=args.error_window, expires=args.expires,
+                           base_path=args.base_path, fleet_id=args.fleet_id, fc_id=args.fc_id,
+                           record=args.record, replay=args.replay, upstream=args.upstream, seed=args.seed)
+    print(f"ESI emulator ({emulator.mode}) on http://{args.host}:{args.port}{emulator.base_path}, "
+          f"fleet {emulator.fleet.fleet_id} FC {emulator.fleet.fc_id}")
+    web.run_app(emulator.make_app(), host=args.host, port=args.port, print=None)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""_summary_
+ESI error-limit and rate governor shared by every sync/async ESI call
+"""
+#import
+import time
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def _header_int(headers, name):
+    value = headers.get(name)
+    try:
+        return int(float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class ErrorLimitGovernor():
+    """Central throttle driven by ESI's error-limit headers.
+
+    Every response feeds `X-ESI-Error-Limit-Remain`/`-Reset` back through `update`.
+    Every request asks `delay` first: no delay while the budget is healthy, a
+    growing spacing between requests once it drops under `slowdown_below`, and a
+    full pause until the window resets once it reaches `floor` (or ESI answers
+    420/429). Spaced requests reserve consecutive slots on a shared clock, so
+    workers asking at the same moment go out one spacing apart instead of
+    together. Workers share one instance, so a burst of failing invites slows the
+    kicks running next to it instead of each caller guessing its own sleep.
+
+    Args:
+        slowdown_below (int): Remaining errors under which requests get spaced out
+        floor (int): Remaining errors kept in reserve, pause when reached
+    """
+    def __init__(self, slowdown_below=50, floor=5) -> None:
+        self.slowdown_below = int(slowdown_below)
+        self.floor = int(floor)
+        self.remain = None
+        self.reset_at = 0.0
+        self.pause_until = 0.0
+        #earliest start of the next spaced request
+        self.next_slot = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"throttled": 0, "paused": 0, "waited_s": 0.0, "error_limited": 0, "rate_limited": 0}
+
+    #feed response headers/status
+    def update(self, headers, status=200):
+        now = time.monotonic()
+        remain = _header_int(headers, 'X-ESI-Error-Limit-Remain')
+        reset = _header_int(headers, 'X-ESI-Error-Limit-Reset')
+        with self._lock:
+            if remain is not None and reset is not None:
+                self.remain = remain
+                self.reset_at = now + reset
+            if status == 420:
+                self._stats["error_limited"] += 1
+                self.remain = 0
+                if reset is None:
+                    reset = self.reset_at - now if self.reset_at > now else 60
+                    self.reset_at = now + reset
+                self.pause_until = max(self.pause_until, now + reset)
+                logger.warning(f"ESI error limit hit, pausing requests for {self.pause_until - now:.0f}s")
+            elif status == 429 or _header_int(headers, 'X-Ratelimit-Remaining') == 0:
+                retry_after = _header_int(headers, 'Retry-After')
+                if status == 429:
+                    self._stats["rate_limited"] += 1
+                if retry_after:
+                    self.pause_until = max(self.pause_until, now + retry_after)
+
+    #seconds to wait before the next request, a spaced request books its slot here
+    def delay(self):
+        now = time.monotonic()
+        with self._lock:
+            if now < self.pause_until:
+                return self.pause_until - now
+            if self.remain is None or now >= self.reset_at:
+                return 0.0
+            reset_in = self.reset_at - now
+            if self.remain <= self.floor:
+                return reset_in
+            if self.remain < self.slowdown_below:
+                drained = (self.slowdown_below - self.remain) / self.slowdown_below
+                spacing = reset_in / (self.remain - self.floor) * drained
+                start = max(now, self.next_slot)
+                self.next_slot = start + spacing
+                #slots past the reset wait for the fresh window instead
+                return min(start - now, reset_in)
+        return 0.0
+
+    def _record_wait(self, seconds):
+        with self._lock:
+            paused = time.monotonic() < self.pause_until or (self.remain is not None and self.remain <= self.floor)
+            self._stats["paused" if paused else "throttled"] += 1
+            self._stats["waited_s"] += seconds
+
+    #sync wait
+    def wait(self):
+        seconds = self.delay()
+        if seconds > 0:
+            self._record_wait(seconds)
+            time.sleep(seconds)
+
+    #async wait
+    async def await_turn(self):
+        seconds = self.delay()
+        if seconds > 0:
+            self._record_wait(seconds)
+            await asyncio.sleep(seconds)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "error_limit_remain": self.remain,
+                "error_limit_reset_in": round(max(self.reset_at - now, 0.0), 1) if self.remain is not None else None,
+                "paused_for": round(max(self.pause_until - now, 0.0), 1),
+                **{k: round(v, 2) if isinstance(v, float) else v for k, v in self._stats.items()},
+            }
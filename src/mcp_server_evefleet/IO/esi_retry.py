@@ -0,0 +1,167 @@
+"""_summary_
+Retry/backoff policies and circuit breaker for ESI calls
+"""
+#import
+import time
+import random
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+#errors that mean "ESI is struggling", counted by the breaker
+BREAKER_STATUSES = (500, 502, 503, 504)
+#request rejected before processing, always safe to resend after the governor pause
+REJECTED_STATUSES = (420, 429)
+
+class ESIUnavailableError(RuntimeError):
+    """Raised without touching the network while the circuit breaker is open"""
+    pass
+
+class RetryPolicy():
+    """How one endpoint is retried.
+
+    Idempotent calls (GETs, moves, MOTD, kicks, name lookups) retry on 5xx, timeouts
+    and dropped connections. Non-idempotent calls (invites, wing/squad creation,
+    waypoints) only retry when ESI certainly did not process the request: connect
+    failures, 503 from the proxy and 420/429 rejections, so a slow 504 never turns
+    into a duplicate squad.
+
+    Args:
+        idempotent (bool): Safe to resend after an ambiguous failure
+        max_attempts (int): Total attempts including the first
+        base_delay (float): First backoff step in seconds
+        max_delay (float): Backoff cap in seconds
+        retry_statuses (tuple): Override the status codes to retry
+    """
+    def __init__(self, idempotent=True, max_attempts=4, base_delay=0.5, max_delay=8.0, retry_statuses=None) -> None:
+        self.idempotent = idempotent
+        self.max_attempts = int(max_attempts)
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        if retry_statuses is None:
+            retry_statuses = BREAKER_STATUSES if idempotent else (503,)
+        self.retry_statuses = tuple(retry_statuses) + REJECTED_STATUSES
+
+    def retry_status(self, status, attempt):
+        return attempt + 1 < self.max_attempts and status in self.retry_statuses
+
+    #safe: request never left the client, ambiguous: it may have been processed
+    def retry_exception(self, exc, attempt, safe_types, ambiguous_types):
+        if attempt + 1 >= self.max_attempts:
+            return False
+        if isinstance(exc, safe_types):
+            return True
+        return self.idempotent and isinstance(exc, ambiguous_types)
+
+    #full-jitter exponential backoff, never shorter than Retry-After
+    def delay(self, attempt, retry_after=None):
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        try:
+            return max(backoff, float(retry_after)) if retry_after else backoff
+        except (TypeError, ValueError):
+            return backoff
+
+class RetryPolicies():
+    """Per-endpoint policy table, keyed by (method, endpoint name from esi_cache.endpoint_name)"""
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=8.0, overrides=None) -> None:
+        idem = RetryPolicy(True, max_attempts, base_delay, max_delay)
+        non_idem = RetryPolicy(False, max_attempts, base_delay, max_delay)
+        self.default_idempotent = idem
+        self.default_non_idempotent = non_idem
+        self.policies = {
+            ('PUT', 'fleets/{id}'): idem,                          # motd / free move
+            ('PUT', 'fleets/{id}/members/{id}'): idem,             # move
+            ('DELETE', 'fleets/{id}/members/{id}'): idem,          # kick
+            ('POST', 'fleets/{id}/members'): non_idem,             # invite
+            ('POST', 'fleets/{id}/wings'): non_idem,               # create wing
+            ('POST', 'fleets/{id}/wings/{id}/squads'): non_idem,   # create squad
+            ('POST', 'ui/autopilot/waypoint'): non_idem,
+            ('POST', 'universe/ids'): idem,                        # read-only lookups
+            ('POST', 'universe/names'): idem,
+        }
+        self.policies.update(overrides or {})
+
+    def policy_for(self, method, endpoint):
+        policy = self.policies.get((method, endpoint))
+        if policy is not None:
+            return policy
+        return self.default_non_idempotent if method == 'POST' else self.default_idempotent
+
+class CircuitBreaker():
+    """Fail fast while ESI is down.
+
+    After `threshold` consecutive 5xx/connection failures the breaker opens and every
+    call raises ESIUnavailableError for `cooldown` seconds. Then one probe request is
+    let through (half-open): success closes the breaker, failure re-opens it. A probe
+    that ends without a verdict (cancelled, unexpected error) is handed back with
+    release_probe, and one older than the cooldown is given up on.
+    """
+    def __init__(self, threshold=10, cooldown=30.0) -> None:
+        self.threshold = int(threshold)
+        self.cooldown = float(cooldown)
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        #id of the probe in flight (0 = none) and when it was let through
+        self._probe = 0
+        self._probe_at = 0.0
+        self._probe_seq = 0
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0, "probes_expired": 0}
+
+    def before_request(self):
+        """Raise ESIUnavailableError while open, returns the probe id when this call is the half-open probe"""
+        with self._lock:
+            if self.state == 'closed':
+                return None
+            now = time.monotonic()
+            if self.state == 'open' and now - self.opened_at >= self.cooldown:
+                self.state = 'half_open'
+                self._probe = 0
+            if self.state == 'half_open' and self._probe and now - self._probe_at >= self.cooldown:
+                self._stats["probes_expired"] += 1
+                self._probe = 0
+            if self.state == 'half_open' and not self._probe:
+                self._probe_seq += 1
+                self._probe, self._probe_at = self._probe_seq, now
+                return self._probe
+            self._stats["rejected"] += 1
+            retry_in = max(self.cooldown - (now - self.opened_at), 0.0)
+        raise ESIUnavailableError(f"ESI circuit breaker open after {self.failures} consecutive failures, retry in {retry_in:.0f}s")
+
+    def release_probe(self, probe):
+        """Let another call probe, when `probe` ended without recording a success or failure"""
+        if not probe:
+            return
+        with self._lock:
+            if self._probe == probe:
+                self._probe = 0
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logger.info("ESI circuit breaker closed")
+            self.state = 'closed'
+            self.failures = 0
+            self._probe = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self._probe = 0
+                self._stats["opened"] += 1
+                logger.warning(f"ESI circuit breaker opened after {self.failures} consecutive failures")
+
+    def record_status(self, status):
+        if status in BREAKER_STATUSES:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def stats(self):
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, **self._stats}
@@ -0,0 +1,106 @@
+"""_summary_
+Single-flight coalescing: identical in-flight ESI reads share one request and one parsed result
+"""
+#import
+import copy
+import asyncio
+import threading
+
+class _Call():
+    __slots__ = ('event', 'result', 'error', 'followers')
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+class SingleFlight():
+    """Coalesce concurrent calls with the same key.
+
+    The first caller (leader) runs the fetch, every caller arriving while it is
+    in flight waits for the leader and receives a deep copy of its result (or its
+    exception). Followers copy from a private snapshot taken before they are
+    woken, so the leader's caller may mutate its own result right away. Sync callers (threads) and async callers are tracked separately;
+    async flights are scoped to their event loop.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    #sync
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+            self._stats["leaders" if leader else "coalesced"] += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+        try:
+            result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            #no follower can join once the key is gone, snapshot only for those already waiting
+            with self._lock:
+                del self._calls[key]
+                followers = call.followers
+            if followers and call.error is None:
+                try:
+                    call.result = copy.deepcopy(result)
+                except Exception as e:
+                    call.error = e
+            call.event.set()
+        return result
+
+    #async
+    async def ado(self, key, coro_fn):
+        loop = asyncio.get_running_loop()
+        loop_key = (loop, key)
+        with self._lock:
+            call = self._async_calls.get(loop_key)
+            leader = call is None
+            if leader:
+                call = self._async_calls[loop_key] = [loop.create_future(), 0]
+            else:
+                call[1] += 1
+            self._stats["leaders" if leader else "coalesced"] += 1
+        future = call[0]
+        if not leader:
+            return copy.deepcopy(await asyncio.shield(future))
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            self._end_async(loop_key)
+            future.cancel()
+            raise
+        except BaseException as e:
+            self._end_async(loop_key)
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        #followers get a private snapshot, the leader's caller owns `result`
+        future.set_result(copy.deepcopy(result) if self._end_async(loop_key) else result)
+        return result
+
+    #drop a finished async flight, returns how many followers joined it
+    def _end_async(self, loop_key):
+        with self._lock:
+            return self._async_calls.pop(loop_key)[1]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls) + len(self._async_calls)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls) + len(self._async_calls)}
@@ -2,9 +2,12 @@
 Code for EVE API management fleet
 """
 #import
-import requests
-import time
 import json
+from mcp_server_evefleet.config_load import CONFIG
+from mcp_server_evefleet.IO.esi_client import get_esi_client, on_esi_loop, bounded_gather
+
+#max in-flight fleet writes for the batch_* coroutines
+WRITE_CONCURRENCY = CONFIG.get('ESI_WRITE_CONCURRENCY', 20)
 
 #utils func
 def check_role_position(role,squad_id,wing_id):
@@ -18,19 +21,38 @@ def check_role_position(role,squad_id,wing_id):
     else:
         allow = False
     return allow
-    
+#request bodies, shared by sync and async writes
+def invitation_param(character_id, role="squad_member", squad_id=None, wing_id=None):
+    param = {
+        "character_id": character_id,
+        "role": role,
+        #"squad_id": 0,
+        #"wing_id": 0
+    }
+    check_role_position(role,squad_id,wing_id)
+    if squad_id and wing_id:
+        param['squad_id'] = squad_id
+        param['wing_id'] = wing_id
+    return param
+def move_param(role='squad_member', squad_id=None, wing_id=None):
+    param = {
+        "role": role,
+        #"squad_id": 0,
+        #"wing_id": 0
+    }
+    if squad_id:
+        param['squad_id'] = squad_id
+    if wing_id:
+        param['wing_id'] = wing_id
+    return param
+
 
 #get fleet id
 def get_sso_fleetid(access_token, character_id, character_name = None):
-    sso_path = ("https://esi.evetech.net/latest/characters/{}/fleet/?datasource=tranquility".format(character_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
+    esi = get_esi_client()
+    sso_path = esi.url("characters/{}/fleet/?datasource=tranquility".format(character_id))
 
-    res = requests.get(sso_path, headers=headers)
-    res.raise_for_status()
-
-    data = res.json()
+    data = esi.get_json(sso_path, access_token)
     fleet_id = data['fleet_id']
     return fleet_id
 #get fleet members
@@ -83,80 +105,48 @@ def get_sso_fleetmembers(access_token, fleet_id):
 
         }]
     '''
-    sso_path = ("https://esi.evetech.net/latest/fleets/{}/members/?datasource=tranquility".format(fleet_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
-
-    res = requests.get(sso_path, headers=headers)
-    res.raise_for_status()
+    esi = get_esi_client()
+    sso_path = esi.url("fleets/{}/members/?datasource=tranquility".format(fleet_id))
 
-    data = res.json()
+    data = esi.get_json(sso_path, access_token)
     return data
 #get fleet motd
 def get_sso_fleetmotd(access_token, fleet_id, character_name=None):
-    sso_path = ("https://esi.evetech.net/latest/fleets/{}/?datasource=tranquility".format(fleet_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
+    esi = get_esi_client()
+    sso_path = esi.url("fleets/{}/?datasource=tranquility".format(fleet_id))
 
-    res = requests.get(sso_path, headers=headers)
-    res.raise_for_status()
-
-    data = res.json()
+    data = esi.get_json(sso_path, access_token)
     fleet_motd = data['motd']
     return fleet_motd
 
 #get wings/squads
 def get_sso_fleetwings(access_token, fleet_id):
-    sso_path = ("https://esi.evetech.net/latest/fleets/{}/wings/?datasource=tranquility".format(fleet_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
-
-    res = requests.get(sso_path, headers=headers)
-    #print("\nMade request to {} with headers: "
-    #        "{}".format(sso_path, res.request.headers))
-    res.raise_for_status()
+    esi = get_esi_client()
+    sso_path = esi.url("fleets/{}/wings/?datasource=tranquility".format(fleet_id))
 
-    data = res.json()
+    data = esi.get_json(sso_path, access_token)
     return data
 
 #put fleet motd
 def put_sso_fleet(access_token, fleet_id, fleet_motd, free_move=True):
-    sso_path = ("https://esi.evetech.net/latest/fleets/{}/?datasource=tranquility".format(fleet_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
+    esi = get_esi_client()
+    sso_path = esi.url("fleets/{}/?datasource=tranquility".format(fleet_id))
     param = {
         "is_free_move": free_move,
         "motd": fleet_motd
     }
     payload = json.dumps(param)
-    res = requests.put(sso_path,data=payload, headers=headers)
-    if res.status_code==500:
-        time.sleep(5)
-        res = requests.put(sso_path,data=payload, headers=headers)
+    #transient 5xx are retried with backoff by the ESI client
+    res = esi.put(sso_path, access_token, data=payload)
     res.raise_for_status()
     return
 #put auto inv
 def put_sso_invitation(access_token, fleet_id, character_id,role = "squad_member", squad_id=None, wing_id=None):
-    sso_path = ("https://esi.evetech.net/latest/fleets/{}/members/?datasource=tranquility".format(str(int(fleet_id))))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
-    param = {
-        "character_id": character_id,
-        "role": role,
-        #"squad_id": 0,
-        #"wing_id": 0
-    }
-    check_role_position(role,squad_id,wing_id)
-    if squad_id and wing_id:
-        param['squad_id'] = squad_id
-        param['wing_id'] = wing_id
+    esi = get_esi_client()
+    sso_path = esi.url("fleets/{}/members/?datasource=tranquility".format(str(int(fleet_id))))
+    param = invitation_param(character_id, role, squad_id, wing_id)
     payload = json.dumps(param)
-    res = requests.post(sso_path,data=payload, headers=headers)
+    res = esi.post(sso_path, access_token, data=payload)
     res.raise_for_status()
     return
 #move fleet members
@@ -167,43 +157,29 @@ def put_sso_move(access_token, fleet_id, character_id, role='squad_member', squa
     If a character is moved to the squad_commander role, both wing_id and squad_id should be specified.
     If a character is moved to the squad_member role, both wing_id and squad_id should be specified.
     '''
-    sso_path = ("https://esi.evetech.net/latest/fleets/{}/members/{}/?datasource=tranquility".format(fleet_id,character_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
-    param = {
-        "role": role,
-        #"squad_id": 0,
-        #"wing_id": 0
-    }
-    if squad_id:
-        param['squad_id'] = squad_id
-    if wing_id:
-        param['wing_id'] = wing_id
+    esi = get_esi_client()
+    sso_path = esi.url("fleets/{}/members/{}/?datasource=tranquility".format(fleet_id,character_id))
+    param = move_param(role, squad_id, wing_id)
     payload = json.dumps(param)
-    res = requests.put(sso_path,data=payload, headers=headers)
+    res = esi.put(sso_path, access_token, data=payload)
     res.raise_for_status()
     return
 #post create wing
 def post_create_wing(access_token, fleet_id):
-    sso_path = ("https://esi.evetech.net/latest/fleets/{}/wings/?datasource=tranquility".format(fleet_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
+    esi = get_esi_client()
+    sso_path = esi.url("fleets/{}/wings/?datasource=tranquility".format(fleet_id))
 
-    res = requests.post(sso_path, headers=headers)
+    res = esi.post(sso_path, access_token)
     res.raise_for_status()
 
     data = res.json()
     return data['wing_id']
 #post create squad
 def post_create_squad(access_token, fleet_id, wing_id):
-    sso_path = ("https://esi.evetech.net/latest/fleets/{}/wings/{}/squads/?datasource=tranquility".format(fleet_id,wing_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
+    esi = get_esi_client()
+    sso_path = esi.url("fleets/{}/wings/{}/squads/?datasource=tranquility".format(fleet_id,wing_id))
 
-    res = requests.post(sso_path, headers=headers)
+    res = esi.post(sso_path, access_token)
     res.raise_for_status()
 
     data = res.json()
@@ -211,10 +187,101 @@ def post_create_squad(access_token, fleet_id, wing_id):
 
 #del kick member
 def del_sso_kick(access_token, fleet_id, character_id):
-    sso_path = ("https://esi.evetech.net/latest/fleets/{}/members/{}/?datasource=tranquility".format(fleet_id,character_id))
-    headers = {
-        "Authorization": "Bearer {}".format(access_token)
-    }
-    res = requests.delete(sso_path, headers=headers)
+    esi = get_esi_client()
+    sso_path = esi.url("fleets/{}/members/{}/?datasource=tranquility".format(fleet_id,character_id))
+    res = esi.delete(sso_path, access_token)
     res.raise_for_status()
-    return
\ No newline at end of file
+    return
+
+# =============================================================================
+# ASYNC API FUNCTIONS FOR PARALLEL PROCESSING
+# =============================================================================
+
+async def async_put_sso_fleet(session, access_token, fleet_id, fleet_motd, free_move=True):
+    """Async version of put_sso_fleet"""
+    esi = get_esi_client()
+    url = esi.url(f'fleets/{fleet_id}/?datasource=tranquility')
+    payload = json.dumps({"is_free_move": free_move, "motd": fleet_motd})
+    await esi.arequest_json('PUT', url, access_token, session=session, data=payload)
+
+async def async_put_sso_invitation(session, access_token, fleet_id, character_id, role="squad_member", squad_id=None, wing_id=None):
+    """Async version of put_sso_invitation"""
+    esi = get_esi_client()
+    url = esi.url(f'fleets/{int(fleet_id)}/members/?datasource=tranquility')
+    payload = json.dumps(invitation_param(character_id, role, squad_id, wing_id))
+    await esi.arequest_json('POST', url, access_token, session=session, data=payload)
+
+async def async_put_sso_move(session, access_token, fleet_id, character_id, role='squad_member', squad_id=None, wing_id=None):
+    """Async version of put_sso_move"""
+    esi = get_esi_client()
+    url = esi.url(f'fleets/{fleet_id}/members/{character_id}/?datasource=tranquility')
+    payload = json.dumps(move_param(role, squad_id, wing_id))
+    await esi.arequest_json('PUT', url, access_token, session=session, data=payload)
+
+async def async_post_create_wing(session, access_token, fleet_id):
+    """Async version of post_create_wing"""
+    esi = get_esi_client()
+    url = esi.url(f'fleets/{fleet_id}/wings/?datasource=tranquility')
+    data = await esi.arequest_json('POST', url, access_token, session=session)
+    return data['wing_id']
+
+async def async_post_create_squad(session, access_token, fleet_id, wing_id):
+    """Async version of post_create_squad"""
+    esi = get_esi_client()
+    url = esi.url(f'fleets/{fleet_id}/wings/{wing_id}/squads/?datasource=tranquility')
+    data = await esi.arequest_json('POST', url, access_token, session=session)
+    return data['squad_id']
+
+async def async_del_sso_kick(session, access_token, fleet_id, character_id):
+    """Async version of del_sso_kick"""
+    esi = get_esi_client()
+    url = esi.url(f'fleets/{fleet_id}/members/{character_id}/?datasource=tranquility')
+    await esi.arequest_json('DELETE', url, access_token, session=session)
+
+# =============================================================================
+# BATCH API FUNCTIONS FOR PARALLEL PROCESSING
+# =============================================================================
+
+@on_esi_loop
+async def batch_put_sso_invitation(access_token, fleet_id, charlist_dic, concurrency=None):
+    """Send fleet invitations in parallel.
+
+    Args:
+        charlist_dic: List of {'char_id', 'char_role', 'squad_id', 'wing_id'} dicts (multi_auto_inv format)
+        concurrency: Max in-flight requests (default ESI_WRITE_CONCURRENCY)
+    Returns:
+        list: None per success or the Exception, in input order
+    """
+    async with get_esi_client().shared_session() as session:
+        tasks = [async_put_sso_invitation(session, access_token, fleet_id, e['char_id'], e.get('char_role', 'squad_member'),
+                                          e.get('squad_id', None), e.get('wing_id', None)) for e in charlist_dic]
+        return await bounded_gather(tasks, concurrency or WRITE_CONCURRENCY)
+
+@on_esi_loop
+async def batch_put_sso_move(access_token, fleet_id, move_dictlist, concurrency=None):
+    """Move fleet members in parallel.
+
+    Args:
+        move_dictlist: List of {'character_id', 'role', 'squad_id', 'wing_id'} dicts
+        concurrency: Max in-flight requests (default ESI_WRITE_CONCURRENCY)
+    Returns:
+        list: None per success or the Exception, in input order
+    """
+    async with get_esi_client().shared_session() as session:
+        tasks = [async_put_sso_move(session, access_token, fleet_id, e['character_id'], e.get('role', 'squad_member'),
+                                    e.get('squad_id', None), e.get('wing_id', None)) for e in move_dictlist]
+        return await bounded_gather(tasks, concurrency or WRITE_CONCURRENCY)
+
+@on_esi_loop
+async def batch_del_sso_kick(access_token, fleet_id, character_ids, concurrency=None):
+    """Kick fleet members in parallel, returns None per success or the Exception"""
+    async with get_esi_client().shared_session() as session:
+        tasks = [async_del_sso_kick(session, access_token, fleet_id, char_id) for char_id in character_ids]
+        return await bounded_gather(tasks, concurrency or WRITE_CONCURRENCY)
+
+@on_esi_loop
+async def batch_post_create_squad(access_token, fleet_id, wing_id, count, concurrency=None):
+    """Create `count` squads in one wing in parallel, returns new squad ids or Exceptions"""
+    async with get_esi_client().shared_session() as session:
+        tasks = [async_post_create_squad(session, access_token, fleet_id, wing_id) for _ in range(count)]
+        return await bounded_gather(tasks, concurrency or WRITE_CONCURRENCY)
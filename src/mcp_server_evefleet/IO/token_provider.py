@@ -0,0 +1,148 @@
+"""_summary_
+Access-token lifecycle: refresh before the JWT expires, single-flight, read at request time
+"""
+#import
+import time
+import asyncio
+import logging
+import threading
+from mcp_server_evefleet.config_load import CONFIG
+from mcp_server_evefleet.IO.API_IO import refresh_access_token, save_refresh_token
+
+logger = logging.getLogger(__name__)
+
+#refresh this many seconds before exp (EVE access tokens live ~20 minutes)
+REFRESH_MARGIN = CONFIG.get('SSO_REFRESH_MARGIN', 120)
+#retry delay after a failed background refresh
+RETRY_DELAY = 30
+
+def token_expiry(access_token):
+    """exp claim of an (already validated) EVE access token, 0 if unreadable"""
+    from jose import jwt
+    try:
+        return float(jwt.get_unverified_claims(access_token).get('exp', 0))
+    except Exception:
+        return 0.0
+
+def token_character(access_token):
+    """(character_id, character_name) of an EVE access token, (None, None) if unreadable"""
+    from jose import jwt
+    try:
+        claims = jwt.get_unverified_claims(access_token)
+        return int(claims['sub'].split(':')[2]), claims.get('name')
+    except Exception:
+        return None, None
+
+class TokenProvider():
+    """Hands out a valid access token for one character.
+
+    Pass the provider wherever an `access_token` is expected: ESIClient resolves it
+    on every attempt, so long fleet operations pick up refreshed tokens, and a 401
+    triggers one `refresh(stale)` and a retry. A background thread refreshes
+    `margin` seconds before `exp`; concurrent refreshes collapse into one SSO call.
+
+    Args:
+        refresh_token (str): SSO refresh token
+        access_token (str): Current access token, refreshed on first use if None
+        margin (float): Seconds before exp to refresh
+        token_file (str): Where the rotated refresh token is persisted (see save_refresh_token)
+        on_refresh (callable): Called with the provider after each refresh instead of
+            persisting to token_file (the token vault uses this)
+    """
+    def __init__(self, refresh_token, access_token=None, margin=REFRESH_MARGIN, token_file=None, on_refresh=None) -> None:
+        self.refresh_token = refresh_token
+        self.margin = float(margin)
+        self.token_file = token_file
+        self.on_refresh = on_refresh
+        self.character_id, self.character_name = token_character(access_token) if access_token else (None, None)
+        self._access_token = access_token
+        self.expires_at = token_expiry(access_token) if access_token else 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"refreshes": 0, "failures": 0, "refreshed_on_401": 0, "last_error": None}
+
+    def expires_in(self):
+        return self.expires_at - time.time()
+
+    def _expiring(self):
+        return self._access_token is None or self.expires_in() <= self.margin
+
+    #current token, refreshed synchronously only if the background refresh fell behind
+    def token(self):
+        if self._expiring():
+            self.refresh(self._access_token)
+        return self._access_token
+
+    async def atoken(self):
+        if self._expiring():
+            return await asyncio.get_running_loop().run_in_executor(None, self.token)
+        return self._access_token
+
+    #single-flight: whoever holds the lock refreshes, callers holding a stale token reuse the result
+    def refresh(self, stale=None):
+        with self._lock:
+            if self._access_token != stale and not self._expiring():
+                return self._access_token
+            try:
+                refresh_token, access_token, character_id, character_name = refresh_access_token(self.refresh_token)
+            except Exception as e:
+                self._stats["failures"] += 1
+                self._stats["last_error"] = str(e)
+                raise
+            self.refresh_token = refresh_token
+            self._access_token = access_token
+            self.expires_at = token_expiry(access_token)
+            self.character_id, self.character_name = character_id, character_name
+            self._stats["refreshes"] += 1
+            self._stats["last_error"] = None
+        #persist outside the lock: on_refresh takes the token vault lock, and the vault calls
+        #replace_tokens (this lock) on re-login
+        if self.on_refresh is not None:
+            self.on_refresh(self)
+        else:
+            save_refresh_token(self.refresh_token, self.token_file)
+        logger.info(f"Access token refreshed for {character_name}, expires in {self.expires_in():.0f}s")
+        return access_token
+
+    #new login for the same character
+    def replace_tokens(self, refresh_token, access_token):
+        with self._lock:
+            self.refresh_token = refresh_token
+            self._access_token = access_token
+            self.expires_at = token_expiry(access_token)
+            self.character_id, self.character_name = token_character(access_token)
+
+    #ESI answered 401 to `stale`
+    def refresh_after_401(self, stale):
+        self._stats["refreshed_on_401"] += 1
+        return self.refresh(stale)
+
+    async def arefresh_after_401(self, stale):
+        return await asyncio.get_running_loop().run_in_executor(None, self.refresh_after_401, stale)
+
+    #background refresh
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sso-token-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            wait = max(self.expires_in() - self.margin, 0.0)
+            if self._stop.wait(wait):
+                return
+            try:
+                self.refresh(self._access_token)
+            except Exception as e:
+                logger.warning(f"Background token refresh failed, retrying in {RETRY_DELAY}s: {e}")
+                if self._stop.wait(RETRY_DELAY):
+                    return
+
+    def stats(self):
+        return {"character_id": self.character_id, "expires_in": round(self.expires_in(), 1), **self._stats}
@@ -0,0 +1,245 @@
+"""_summary_
+Multi-character token vault: refresh tokens for FC and alts in one file, refreshed on one schedule
+
+    python -m mcp_server_evefleet.IO.token_vault add       # SSO login, store the character
+    python -m mcp_server_evefleet.IO.token_vault list
+    python -m mcp_server_evefleet.IO.token_vault remove <character_id>
+"""
+#import
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import itertools
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from platformdirs import user_config_dir
+from mcp_server_evefleet.config_load import CONFIG
+from mcp_server_evefleet.IO.API_IO import sso_login, save_refresh_token
+from mcp_server_evefleet.IO.token_provider import TokenProvider, RETRY_DELAY
+
+logger = logging.getLogger(__name__)
+
+#kept next to refresh_token.txt
+APP_NAME = "mcp_server_evefleet"
+APP_AUTHOR = "mcp_server_evefleet"
+#idle wake-up when no token is due
+IDLE_WAIT = 60
+
+def default_vault_path() -> Path:
+    return Path(user_config_dir(APP_NAME, APP_AUTHOR)) / "tokens.json"
+
+class TokenVault():
+    """Refresh tokens for many characters, one TokenProvider each.
+
+    One scheduler thread sleeps until the next token is due and refreshes every due
+    character concurrently (`max_workers` SSO calls at a time); a failed character
+    is retried after RETRY_DELAY without holding up the others. Rotated refresh
+    tokens are written back to the vault file (and to refresh_token.txt for the
+    primary login). `active` is the character driving the fleet; switching it needs
+    no SSO login as long as the character is stored.
+
+    Args:
+        path (str|Path): Vault file, JSON {character_id: {name, refresh_token}}
+        max_workers (int): Concurrent SSO refreshes
+    """
+    def __init__(self, path=None, max_workers=4) -> None:
+        self.path = Path(path) if path else default_vault_path()
+        self.max_workers = max(int(max_workers), 1)
+        self.primary = None
+        self.active = None
+        self._providers = {}
+        self._retry_at = {}
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._rr = None
+        self.load()
+
+    #persistence
+    def load(self):
+        try:
+            with self.path.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self.primary = data.get('primary')
+            self.active = data.get('active')
+            for char_id, entry in (data.get('characters') or {}).items():
+                provider = TokenProvider(entry['refresh_token'], on_refresh=self._on_refresh)
+                provider.character_id, provider.character_name = int(char_id), entry.get('name')
+                self._providers[int(char_id)] = provider
+
+    def save(self):
+        with self._lock:
+            data = {
+                "primary": self.primary,
+                "active": self.active,
+                "characters": {str(c): {"name": p.character_name, "refresh_token": p.refresh_token}
+                               for c, p in self._providers.items()},
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            with tmp.open('w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.chmod(tmp, 0o600)
+            tmp.replace(self.path)
+
+    def _on_refresh(self, provider):
+        self.save()
+        if provider.character_id == self.primary:
+            save_refresh_token(provider.refresh_token)
+
+    #characters
+    def add(self, refresh_token, access_token=None, primary=False):
+        """Store a character, returns its TokenProvider (refreshes once if no access token is given)"""
+        provider = TokenProvider(refresh_token, access_token, on_refresh=self._on_refresh)
+        if provider.character_id is None:
+            provider.refresh()
+        with self._lock:
+            old = self._providers.setdefault(provider.character_id, provider)
+        if old is not provider:
+            #re-login: keep the object callers already hold, swapped outside the vault lock
+            #(replace_tokens takes the provider lock, a refresh holding it calls save())
+            old.replace_tokens(provider.refresh_token, provider.token())
+            provider = old
+        with self._lock:
+            self._retry_at.pop(provider.character_id, None)
+            if primary or self.primary is None:
+                self.primary = provider.character_id
+            if self.active is None:
+                self.active = provider.character_id
+            self.save()
+        self._wake.set()
+        logger.info(f"Token vault: stored {provider.character_name} ({provider.character_id})")
+        return provider
+
+    def login(self, use_browser=True):
+        """SSO login for another character (alt), stored in the vault"""
+        refresh_token, access_token, _, _ = sso_login(use_browser)
+        return self.add(refresh_token, access_token)
+
+    def remove(self, character_id):
+        with self._lock:
+            self._providers.pop(int(character_id), None)
+            if self.active == int(character_id):
+                self.active = self.primary if self.primary in self._providers else next(iter(self._providers), None)
+            self.save()
+
+    def __contains__(self, character_id):
+        return int(character_id) in self._providers
+
+    def provider(self, character_id=None):
+        """TokenProvider for a character, the active one by default"""
+        character_id = self.active if character_id is None else int(character_id)
+        with self._lock:
+            provider = self._providers.get(character_id)
+        if provider is None:
+            raise KeyError(f"Character {character_id} is not in the token vault")
+        return provider
+
+    def token(self, character_id=None):
+        """Valid access token for a character"""
+        return self.provider(character_id).token()
+
+    def set_active(self, character_id):
+        self.provider(character_id)
+        with self._lock:
+            self.active = int(character_id)
+            self.save()
+
+    #round-robin over characters, to spread authed reads over their own budgets
+    def cycle(self, character_ids=None):
+        with self._lock:
+            ids = [int(c) for c in character_ids] if character_ids else sorted(self._providers)
+            if self._rr is None or self._rr[0] != ids:
+                self._rr = (ids, itertools.cycle(ids))
+            return self._providers[next(self._rr[1])]
+
+    def characters(self):
+        with self._lock:
+            return [{"character_id": c, "name": p.character_name, "active": c == self.active,
+                     "expires_in": round(p.expires_in(), 1)} for c, p in self._providers.items()]
+
+    #scheduler
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='token-vault-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _due_in(self, provider, now):
+        due = provider.expires_at - provider.margin - now
+        return max(due, self._retry_at.get(provider.character_id, 0.0) - now)
+
+    def _refresh_one(self, provider):
+        try:
+            provider.refresh()
+            self._retry_at.pop(provider.character_id, None)
+        except Exception as e:
+            self._retry_at[provider.character_id] = time.time() + RETRY_DELAY
+            logger.warning(f"Token refresh failed for {provider.character_name}, retrying in {RETRY_DELAY}s: {e}")
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='token-vault') as pool:
+            while not self._stop.is_set():
+                now = time.time()
+                with self._lock:
+                    providers = list(self._providers.values())
+                due = [p for p in providers if self._due_in(p, now) <= 0]
+                if due:
+                    list(pool.map(self._refresh_one, due))
+                    continue
+                wait = min([self._due_in(p, now) for p in providers] or [IDLE_WAIT])
+                self._wake.wait(min(wait, IDLE_WAIT))
+                self._wake.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"active": self.active, "primary": self.primary,
+                    "characters": {c: p.stats() for c, p in self._providers.items()}}
+
+#shared vault
+_vault = None
+_vault_lock = threading.Lock()
+
+def get_token_vault() -> TokenVault:
+    global _vault
+    if _vault is None:
+        with _vault_lock:
+            if _vault is None:
+                _vault = TokenVault(CONFIG.get('TOKEN_VAULT_PATH') or None, CONFIG.get('TOKEN_VAULT_WORKERS', 4))
+    return _vault
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage stored character tokens')
+    sub = parser.add_subparsers(dest='command', required=True)
+    add = sub.add_parser('add', help='SSO login and store the character')
+    add.add_argument('--no-browser', action='store_true')
+    sub.add_parser('list')
+    remove = sub.add_parser('remove')
+    remove.add_argument('character_id', type=int)
+    args = parser.parse_args()
+    vault = get_token_vault()
+    if args.command == 'add':
+        provider = vault.login(use_browser=not args.no_browser)
+        print(f"Stored {provider.character_name} ({provider.character_id}) in {vault.path}")
+    elif args.command == 'list':
+        for c in vault.characters():
+            print(f"{c['character_id']}\t{c['name']}{' (active)' if c['active'] else ''}")
+    elif args.command == 'remove':
+        vault.remove(args.character_id)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
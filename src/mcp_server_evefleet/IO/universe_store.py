@@ -0,0 +1,156 @@
+"""_summary_
+Persistent SQLite store for near-immutable universe data (systems, stargates, stations, routes)
+"""
+#import
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from platformdirs import user_config_dir
+from mcp_server_evefleet.config_load import CONFIG
+from mcp_server_evefleet.static_store import get_static_store
+
+logger = logging.getLogger(__name__)
+
+#kept next to refresh_token.txt
+APP_NAME = "mcp_server_evefleet"
+APP_AUTHOR = "mcp_server_evefleet"
+#30 days, universe data only changes with expansions
+DEFAULT_TTL = 30 * 24 * 3600
+
+def default_store_path() -> Path:
+    cfg_dir = Path(user_config_dir(APP_NAME, APP_AUTHOR))
+    cfg_dir.mkdir(parents=True, exist_ok=True)
+    return cfg_dir / "universe.sqlite3"
+
+class UniverseStore():
+    """Read-through store keyed by (kind, key), e.g. ('system', 30000142) or ('route', '1:2:shortest').
+
+    Rows carry the `version` they were written under and an expiry; a row from
+    another version or past its expiry counts as a miss and is refetched, so bumping
+    UNIVERSE_STORE_VERSION after an expansion invalidates everything at once.
+
+    Misses are looked up in the packaged static store before they count as a miss,
+    so systems and stargates shipped in setting/static.yaml never reach ESI.
+
+    Args:
+        path (str|Path): SQLite file, ':memory:' for a throwaway store
+        ttl (float): Seconds a row stays valid
+        version (str): Data version stamp
+        static (StaticStore): Read-only fallback, None to disable
+    """
+    def __init__(self, path=None, ttl=DEFAULT_TTL, version='1', static=None) -> None:
+        self.path = str(path or default_store_path())
+        self.ttl = float(ttl)
+        self.version = str(version)
+        self.static = static
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "static": 0, "miss": 0, "stored": 0}
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if self.path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS universe ('
+            ' kind TEXT NOT NULL, key TEXT NOT NULL, data TEXT NOT NULL,'
+            ' version TEXT NOT NULL, fetched_at REAL NOT NULL, expires_at REAL NOT NULL,'
+            ' PRIMARY KEY (kind, key))')
+
+    #lookup, returns data or None
+    def get(self, kind, key):
+        return self.get_many(kind, [key]).get(key)
+
+    #lookup many, returns {key: data} for valid rows only
+    def get_many(self, kind, keys):
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        by_text = {str(k): k for k in keys}
+        texts = list(by_text)
+        found = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(texts), 500):
+                chunk = texts[i:i + 500]
+                rows = self._conn.execute(
+                    f'SELECT key, data FROM universe WHERE kind = ? AND version = ? AND expires_at > ?'
+                    f' AND key IN ({",".join("?" * len(chunk))})', [kind, self.version, now, *chunk]).fetchall()
+                for key, data in rows:
+                    found[by_text[key]] = json.loads(data)
+        hits = len(found)
+        missing = [k for k in keys if k not in found and isinstance(k, int)]
+        if self.static is not None and missing:
+            found.update(self.static.universe_many(kind, missing))
+        with self._lock:
+            self._stats["hit"] += hits
+            self._stats["static"] += len(found) - hits
+            self._stats["miss"] += len(keys) - len(found)
+        return found
+
+    #every valid row of a kind, {key: data} (keys come back as int when numeric)
+    def items(self, kind):
+        with self._lock:
+            rows = self._conn.execute('SELECT key, data FROM universe WHERE kind = ? AND version = ? AND expires_at > ?',
+                                      (kind, self.version, time.time())).fetchall()
+        return {int(key) if key.isdigit() else key: json.loads(data) for key, data in rows}
+
+    def put(self, kind, key, data):
+        self.put_many(kind, {key: data})
+
+    #store many in one transaction
+    def put_many(self, kind, items):
+        if not items:
+            return
+        now = time.time()
+        rows = [(kind, str(k), json.dumps(v), self.version, now, now + self.ttl) for k, v in items.items()]
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany('INSERT OR REPLACE INTO universe VALUES (?, ?, ?, ?, ?, ?)', rows)
+                self._conn.execute('COMMIT')
+            except sqlite3.Error:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._stats["stored"] += len(rows)
+
+    def clear(self, kind=None):
+        with self._lock:
+            if kind is None:
+                self._conn.execute('DELETE FROM universe')
+            else:
+                self._conn.execute('DELETE FROM universe WHERE kind = ?', (kind,))
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT kind, COUNT(*) FROM universe WHERE version = ? GROUP BY kind', (self.version,)).fetchall()
+            return {"path": self.path, "version": self.version, "rows": dict(rows), **self._stats}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+#shared store
+_store = None
+_store_lock = threading.Lock()
+
+def get_universe_store() -> UniverseStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = UniverseStore(
+                    path=CONFIG.get('UNIVERSE_STORE_PATH') or None,
+                    ttl=CONFIG.get('UNIVERSE_STORE_TTL', DEFAULT_TTL),
+                    version=CONFIG.get('UNIVERSE_STORE_VERSION', 1),
+                    static=get_static_store(),
+                )
+    return _store
+
+def set_universe_store(store: UniverseStore) -> UniverseStore:
+    global _store
+    with _store_lock:
+        _store = store
+    return _store
@@ -1,18 +1,76 @@
-import yaml
+import logging
+import threading
 from pathlib import Path
+from collections.abc import Mapping
 from importlib import resources
 
 def set_globals_from_dict(d):
     for key, value in d.items():
         globals()[key] = value
-        
-# Prefer CWD config.yaml if present; otherwise load packaged resource
-config_path = Path('config.yaml')
-if config_path.exists():
-    with open(config_path, 'r', encoding="utf-8") as f:
-        config = yaml.safe_load(f)
-else:
+
+def __getattr__(name):
+    # libyaml parser when available, several times faster than the pure Python one
+    if name == 'SafeLoader':
+        import yaml
+        return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    if name == 'config':
+        return CONFIG.load()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def load_config() -> dict:
+    """Parse config.yaml: the CWD file if present, otherwise the packaged resource"""
+    import yaml
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    config_path = Path('config.yaml')
+    if config_path.exists():
+        with open(config_path, 'r', encoding="utf-8") as f:
+            return yaml.load(f, Loader=loader) or {}
     with resources.files('mcp_server_evefleet').joinpath('config.yaml').open('r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+        return yaml.load(f, Loader=loader) or {}
+
+class LazyConfig(Mapping):
+    """Read-only view of config.yaml, parsed on first access and cached for the process.
+
+    Importing this module costs neither the yaml import nor the parse; modules
+    that only need setup_logging, or read settings inside functions, never pay
+    for it until a setting is actually read.
+    """
+    def __init__(self, loader=load_config) -> None:
+        self._loader = loader
+        self._data = None
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._loader()
+        return self._data
+
+    def get(self, key, default=None):
+        return self.load().get(key, default)
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
+    def __repr__(self) -> str:
+        return f"LazyConfig({self._data!r})" if self._data is not None else "LazyConfig(<not loaded>)"
+
+CONFIG = LazyConfig()
 
-CONFIG = config
+def setup_logging(log_file='fleet_support.log'):
+    """Root logging for the server, the log file is only created on the first record"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, delay=True),
+            logging.StreamHandler()
+        ]
+    )
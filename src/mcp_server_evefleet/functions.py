@@ -8,10 +8,12 @@ import math
 import logging
 import traceback
 from collections import defaultdict
-from multiprocessing.dummy import Pool as ThreadPool
 from typing import Optional, Dict, List, Tuple, Any, Union
 from functools import wraps
+import requests
 from mcp_server_evefleet.IO.API_IO import get_char_info
+from mcp_server_evefleet.IO.esi_client import get_esi_client
+from mcp_server_evefleet.IO.token_provider import TokenProvider
 from mcp_server_evefleet.IO.fleet_api import (put_sso_invitation,
                           put_sso_move,
                           get_sso_fleetmotd,
@@ -21,8 +23,13 @@ from mcp_server_evefleet.IO.fleet_api import (put_sso_invitation,
                           post_create_wing,
                           del_sso_kick,
                           put_sso_fleet,
+                          batch_put_sso_invitation,
+                          batch_put_sso_move,
+                          batch_del_sso_kick,
+                          batch_post_create_squad,
                           )
-from mcp_server_evefleet.static_manage import CharID_Dict,ShipID_Dict,Static_Dict
+from mcp_server_evefleet.static_manage import CharID_Dict,ShipID_Dict,System_Dict
+from mcp_server_evefleet.config_load import setup_logging
 
 class loop_memory:
     def __init__(self, max_size=10):
@@ -59,14 +66,7 @@ class loop_memory:
         return iter(self.data)
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('fleet_support.log'),
-        logging.StreamHandler()
-    ]
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Custom Exception Classes
@@ -143,6 +143,12 @@ def validate_string(value: Any, name: str, min_length: int = 0, max_length: Opti
         raise ValidationError(f"{name} must be at most {max_length} characters long")
     return value
 
+def validate_token(value: Any, name: str = "access_token"):
+    """Validate an access token string, or accept a TokenProvider as is"""
+    if hasattr(value, 'token'):
+        return value
+    return validate_string(value, name, min_length=10)
+
 def validate_list(value: Any, name: str, min_length: int = 0, max_length: Optional[int] = None) -> list:
     """Validate list input"""
     if not isinstance(value, list):
@@ -154,14 +160,14 @@ def validate_list(value: Any, name: str, min_length: int = 0, max_length: Option
     return value
 
 @handle_errors
-def multi_auto_inv(access_token: str, fleet_id: Union[int, str], charlist_dic: Union[Dict, List[Dict]], sleep_time: float = 0.1) -> None:
+def multi_auto_inv(access_token: Union[str, TokenProvider], fleet_id: Union[int, str], charlist_dic: Union[Dict, List[Dict]], sleep_time: float = 0.0) -> None:
     """Send multiple fleet invitations with error handling.
     
     Args:
-        access_token: SSO access token
+        access_token: SSO access token or TokenProvider
         fleet_id: Fleet ID
         charlist_dic: Character dictionary or list of character dictionaries
-        sleep_time: Sleep time between invitations in seconds
+        sleep_time: Extra sleep between invitations in seconds, ESI pacing is done by the shared error-limit governor
         
     Raises:
         FleetManagementError: If invitation process fails
@@ -170,7 +176,7 @@ def multi_auto_inv(access_token: str, fleet_id: Union[int, str], charlist_dic: U
     """
     try:
         # Validate inputs
-        access_token = validate_string(access_token, "access_token", min_length=10)
+        access_token = validate_token(access_token)
         fleet_id = validate_id(fleet_id, "fleet_id", min_val=1)
         sleep_time = validate_numeric(sleep_time, "sleep_time", min_val=0, max_val=10)
         
@@ -178,13 +184,14 @@ def multi_auto_inv(access_token: str, fleet_id: Union[int, str], charlist_dic: U
         if not isinstance(charlist_dic, list):
             charlist_dic = [charlist_dic]
         
-        charlist_dic = validate_list(charlist_dic, "charlist_dic", min_length=1, max_length=100)
+        charlist_dic = validate_list(charlist_dic, "charlist_dic", min_length=1, max_length=256)
         
         logger.info(f'Starting multiple invitations for {charlist_dic}')
         
         successful_invites = 0
         failed_invites = 0
         
+        valid_invites = []
         for i, char_dic in enumerate(charlist_dic):
             try:
                 if not isinstance(char_dic, dict):
@@ -194,24 +201,33 @@ def multi_auto_inv(access_token: str, fleet_id: Union[int, str], charlist_dic: U
                     raise ValidationError(f"Character entry {i} missing 'char_id'")
                 
                 char_id = validate_id(char_dic['char_id'], f"char_id[{i}]", min_val=1)
-                char_role = char_dic.get('char_role', 'squad_member')
-                squad_id = char_dic.get('squad_id', None)
-                wing_id = char_dic.get('wing_id', None)
-                
-                logger.debug(f"Inviting character {char_id} with role {char_role}")
-                
-                put_sso_invitation(access_token, fleet_id, char_id, char_role, squad_id, wing_id)
-                successful_invites += 1
-                
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                    
+                valid_invites.append({**char_dic, 'char_id': char_id})
             except Exception as e:
                 failed_invites += 1
                 logger.error(f"Failed to invite character {i}: {str(e)}")
-                # Continue with other invitations
                 continue
         
+        if sleep_time > 0:
+            # Explicit pacing requested, send one by one
+            results = []
+            for char_dic in valid_invites:
+                try:
+                    put_sso_invitation(access_token, fleet_id, char_dic['char_id'], char_dic.get('char_role', 'squad_member'),
+                                       char_dic.get('squad_id', None), char_dic.get('wing_id', None))
+                    results.append(None)
+                except Exception as e:
+                    results.append(e)
+                time.sleep(sleep_time)
+        else:
+            results = get_esi_client().run(batch_put_sso_invitation(access_token, fleet_id, valid_invites))
+        
+        for char_dic, result in zip(valid_invites, results):
+            if isinstance(result, Exception):
+                failed_invites += 1
+                logger.error(f"Failed to invite character {char_dic['char_id']}: {str(result)}")
+            else:
+                successful_invites += 1
+        
         logger.info(f'Invitation process completed: {successful_invites} successful, {failed_invites} failed')
         
         if failed_invites > 0 and successful_invites == 0:
@@ -224,18 +240,21 @@ def multi_auto_inv(access_token: str, fleet_id: Union[int, str], charlist_dic: U
 
 ###class for checking fleet members:
 class fleet_manager():
-    def __init__(self, access_token: str,
+    def __init__(self, access_token: Union[str, TokenProvider],
                  fleet_id: Union[int, str],
                  main_char_id: Union[int, str],
                  group_ship_ids: List[int] = None,
                  bomb_alt_ids: List[Union[int, str]] = None,
                  auto_update: bool = True,
                  ship_dict: Optional[ShipID_Dict] = None,
-                 system_dict: Optional[Static_Dict] = None
+                 system_dict: Optional[System_Dict] = None,
+                 read_ids: Optional[List[int]] = None
                  ) -> None:
         try:
             # Validate inputs
-            self.access_token = validate_string(access_token, "access_token", min_length=10)
+            self.access_token = validate_token(access_token)
+            # Token-vault characters that may read this fleet, reads rotate over them
+            self.read_ids = [int(c) for c in read_ids] if read_ids else []
             self.fleet_id = validate_id(fleet_id, "fleet_id", min_val=1)
             self.main_char_id = validate_id(main_char_id, "main_char_id", min_val=1)
             
@@ -250,16 +269,17 @@ class fleet_manager():
             self.fleet_struct_old = []
             self.fleet_members_list = []
             self.fleet_members_composition = {}
+            self.fleet_members_locations = {}
             self.main_char_dic = {}
             
             # Initialize dictionaries
             self.ship_dict = ship_dict if ship_dict else ShipID_Dict()
             self.char_dict = CharID_Dict()
-            self.system_dict = system_dict if system_dict else Static_Dict('setting/system_dict.yaml','systems','solar_system')
+            self.system_dict = system_dict if system_dict else System_Dict()
             
             self.fleet_motd = ''
             self.auto_update = auto_update
-            self.thread_pool = ThreadPool(5)
+            self.esi_client = get_esi_client()
             
             logger.info(f"Initializing fleet manager for fleet {self.fleet_id}, main character {self.main_char_id}")
             
@@ -352,7 +372,7 @@ class fleet_manager():
             return self.group_ship_ids
 
     #divide/move member !!need rewrite
-    def fleet_formation(self, members_in_squad=8, location_match=True, number_of_squads=None, ship_type_filter=None):
+    def fleet_formation(self, members_in_squad=8, location_match=True, number_of_squads=None, ship_type_filter=None, max_jumps=None):
         """
         Organize fleet members into squads and wings
         
@@ -363,6 +383,7 @@ class fleet_manager():
                                             overrides members_in_squad calculation
             ship_type_filter (List[int], optional): Specific ship type IDs to filter. If not provided,
                                                   will use most common ship type (>=50%) or default
+            max_jumps (int, optional): With location_match, also include members within this many jumps
         """
         members_in_squad = int(members_in_squad)
         self.renew_members() #get lastest info
@@ -377,8 +398,13 @@ class fleet_manager():
         final_sq_counts = defaultdict(list)
         useful_members = []
         other_members = []
-        for member in self.fleet_members_list:
-            location_same = not location_match or member['solar_system_id']==self.main_char_dic['solar_system_id']
+        if location_match and max_jumps is not None:
+            jumps = self.get_member_jumps(self.main_char_dic['solar_system_id'])
+        else:
+            jumps = [None] * members_count
+        for member, jump in zip(self.fleet_members_list, jumps):
+            location_same = not location_match or member['solar_system_id']==self.main_char_dic['solar_system_id'] \
+                or (jump is not None and jump <= int(max_jumps))
             if member['ship_type_id'] in target_ship_ids and location_same:
                 useful_members.append(member)
                 final_sq_counts[member['squad_id']].append(member)
@@ -404,8 +430,11 @@ class fleet_manager():
         sq_list = first_wing_dic['squads']
         sq_count = len(sq_list)
         if sq_count < req_squads:
-            for i in range(sq_count-1,req_squads):
-                new_sq_id = post_create_squad(self.access_token,self.fleet_id,first_wing_dic['id'])
+            new_sq_ids = self.esi_client.run(batch_post_create_squad(self.access_token,self.fleet_id,first_wing_dic['id'],len(range(sq_count-1,req_squads))))
+            for new_sq_id in new_sq_ids:
+                if isinstance(new_sq_id, Exception):
+                    logger.error(f"Failed to create squad: {str(new_sq_id)}")
+                    continue
                 new_sq_dic = {'id': new_sq_id, 'name': '', 'members':[]}
                 first_wing_dic['squads'].append(new_sq_dic)
         #other wing
@@ -485,44 +514,66 @@ class fleet_manager():
             if mem['wing_id']==first_wing_dic['id']:
                 new_dic = {'character_id': mem['character_id'], 'squad_id': other_wing['squads'][0]['id'], 'wing_id': other_wing['id']}
                 move_dictlist.append(new_dic)
-        #move member
-        move_chars = []
-        for e_dic in move_dictlist:
-            #put_sso_move(self.access_token,self.fleet_id,**e_dic)
-            move_chars.append((self.access_token,self.fleet_id,e_dic['character_id'],e_dic.get('role','squad_member'),e_dic.get('squad_id',None),e_dic.get('wing_id',None)))
-        self.thread_pool.starmap(put_sso_move,move_chars)
+        #move member, all moves in flight at once (bounded by ESI_WRITE_CONCURRENCY)
+        results = self.esi_client.run(batch_put_sso_move(self.access_token,self.fleet_id,move_dictlist))
+        failed = [(e_dic['character_id'], res) for e_dic, res in zip(move_dictlist, results) if isinstance(res, Exception)]
+        for char_id, err in failed:
+            logger.error(f"Failed to move character {char_id}: {str(err)}")
+        logger.info(f"Fleet formation moved {len(move_dictlist) - len(failed)}/{len(move_dictlist)} members")
         
     #invite member
     def fleet_invite(self,char_ids):
         if not isinstance(char_ids,list):
             char_ids = [char_ids]
-        char_dic_list = []
-        fleet_ids, access_tokens = [], []
-        for char_id in char_ids:
-            new_dic = {'char_id':char_id}
-            char_dic_list.append(new_dic)
-            fleet_ids.append(self.fleet_id)
-            access_tokens.append(self.access_token)
-        #multi_auto_inv(self.access_token,self.fleet_id,char_dic_list)
-        self.thread_pool.starmap(multi_auto_inv,zip(access_tokens,fleet_ids,char_dic_list))
+        char_dic_list = [{'char_id':char_id} for char_id in char_ids]
+        multi_auto_inv(self.access_token,self.fleet_id,char_dic_list)
     #kick member
-    def fleet_kick(self,char_ids,sleep_time=0.1):
+    def fleet_kick(self,char_ids,sleep_time=0.0):
         if not isinstance(char_ids,list):
             char_ids = [char_ids]
-        for char_id in char_ids:
-            del_sso_kick(self.access_token,self.fleet_id,char_id)
-            time.sleep(sleep_time)
+        #pacing comes from the ESI error-limit governor, sleep_time is only an extra delay
+        if sleep_time > 0:
+            for char_id in char_ids:
+                del_sso_kick(self.access_token,self.fleet_id,char_id)
+                time.sleep(sleep_time)
+            return
+        results = self.esi_client.run(batch_del_sso_kick(self.access_token,self.fleet_id,char_ids))
+        failed = [(char_id, res) for char_id, res in zip(char_ids, results) if isinstance(res, Exception)]
+        for char_id, err in failed:
+            logger.error(f"Failed to kick character {char_id}: {str(err)}")
+        if failed and len(failed) == len(char_ids):
+            raise FleetManagementError("All kicks failed")
     #output fleet static
     def output_fleet_static(self):
         out_dict = {
             "composition_class": self.fleet_members_composition_class,
             "composition": self.fleet_members_composition,
+            "locations": self.fleet_members_locations,
             "motd": self.fleet_motd,
             "fleet_id": self.fleet_id,
         }
         return out_dict
+    #fleet reads rotate over read_ids through the token vault, spreading polls over their ESI budgets;
+    #a character ESI refuses the fleet to is dropped and the read repeats with the driving token
+    def _fleet_read(self, fetch):
+        if len(self.read_ids) < 2:
+            return fetch(self.access_token, self.fleet_id)
+        from mcp_server_evefleet.IO.token_vault import get_token_vault
+        vault = get_token_vault()
+        self.read_ids = [c for c in self.read_ids if c in vault]
+        if len(self.read_ids) < 2:
+            return fetch(self.access_token, self.fleet_id)
+        reader = vault.cycle(self.read_ids)
+        try:
+            return fetch(reader, self.fleet_id)
+        except requests.HTTPError as e:
+            if reader.character_id == self.main_char_id or e.response is None or e.response.status_code not in (403, 404):
+                raise
+            logger.warning(f"{reader.character_name} cannot read fleet {self.fleet_id}, dropped from fleet readers")
+            self.read_ids = [c for c in self.read_ids if c != reader.character_id]
+            return fetch(self.access_token, self.fleet_id)
     def renew_motd(self):
-        self.fleet_motd = get_sso_fleetmotd(self.access_token,self.fleet_id)
+        self.fleet_motd = self._fleet_read(get_sso_fleetmotd)
         return self.fleet_motd
     #renew fleet members and record in history
     @handle_errors
@@ -537,7 +588,7 @@ class fleet_manager():
             logger.debug(f"Renewing fleet members for fleet {self.fleet_id}")
             
             # Get fleet members from API
-            fleet_members_list = get_sso_fleetmembers(self.access_token, self.fleet_id)
+            fleet_members_list = self._fleet_read(get_sso_fleetmembers)
             
             if not isinstance(fleet_members_list, list):
                 raise FleetManagementError("Invalid fleet members data received from API")
@@ -562,6 +613,7 @@ class fleet_manager():
             self.fleet_members_list = fleet_members_list
             self.fleet_members_composition = self.get_fleet_composition(fleet_members_list)
             self.fleet_members_composition_class = self.get_fleet_composition_class(fleet_members_list)
+            self.fleet_members_locations = self.get_fleet_locations(fleet_members_list)
             
             # Create history entry
             history_each = {
@@ -628,7 +680,7 @@ class fleet_manager():
             }]
         }]
         '''
-        fleet_struct = get_sso_fleetwings(self.access_token,self.fleet_id)
+        fleet_struct = self._fleet_read(get_sso_fleetwings)
         for wing_dic in fleet_struct:
             wing_id = wing_dic['id']
             for squad_dic in wing_dic['squads']:
@@ -655,11 +707,13 @@ class fleet_manager():
             Dict of ship type ID and name with their counts.
         """
         ship_count = {}
+        # new hulls are looked up in the background and counted as Unknown until then
+        self.ship_dict.resolve_unknown(member['ship_type_id'] for member in fleet_members_list)
         for member in fleet_members_list:
             if location_match and main_char_dic['ship_type_id'] != member['ship_type_id']:
                 continue
             ship_type_id = member['ship_type_id']
-            ship_name = self.ship_dict(ship_type_id)
+            ship_name = self.ship_dict.name_of(ship_type_id)
             ship_count[ship_name] = ship_count.get(ship_name, 0) + 1
         return ship_count
     #get fleet composition class
@@ -667,10 +721,23 @@ class fleet_manager():
         class_count = {}
         for member in fleet_members_list:
             ship_type_id = member['ship_type_id']
-            ship_name = self.ship_dict(ship_type_id)
-            class_name = self.ship_dict.type_to_groupname(ship_name)
+            class_name = self.ship_dict.groupname_of(ship_type_id)
             class_count[class_name] = class_count.get(class_name, 0) + 1
         return class_count
+    #get member count per solar system, names from the packaged system index
+    def get_fleet_locations(self, fleet_members_list):
+        location_count = {}
+        for member in fleet_members_list:
+            system_id = member.get('solar_system_id')
+            system_name = self.system_dict.name_of(system_id) or str(system_id)
+            location_count[system_name] = location_count.get(system_name, 0) + 1
+        return location_count
+    #jumps of each fleet member from a system, None when not known
+    def get_member_jumps(self, origin_id, fleet_members_list=None):
+        from mcp_server_evefleet.jump_distance import get_jump_distances
+        if fleet_members_list is None:
+            fleet_members_list = self.fleet_members_list
+        return get_jump_distances().jumps(origin_id, [m.get('solar_system_id') for m in fleet_members_list])
     #estimate fleet loss
     def _estimate_fleet_loss(self, location_match=False):
         if len(self.fleet_history) < 2:
@@ -0,0 +1,113 @@
+"""_summary_
+Jump distances over the packaged stargate graph: batched multi-source BFS with NumPy, rows cached per source system
+"""
+#import
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from mcp_server_evefleet.config_load import CONFIG
+from mcp_server_evefleet.universe_graph import StargateGraph, get_stargate_graph
+
+#distance for systems that cannot be reached inside the packaged data
+UNREACHABLE = -1
+
+class JumpDistances():
+    """Jumps from source systems to every system of a StargateGraph.
+
+    All missing sources of a query are expanded together: the BFS frontier is a
+    list of (source, system) cells, and each step gathers the CSR neighbour
+    slices of every frontier cell at once. A computed row (int16, one entry
+    per system) is kept per source in an LRU of `cache_size` rows, so the
+    per-poll "members vs FC" query is a single fancy-index.
+
+    Distances only count gates in the packaged data; systems outside it, or
+    not connected to the source inside it, come back as None.
+
+    Args:
+        graph (StargateGraph): Graph to measure on
+        cache_size (int): Distance rows kept
+    """
+    def __init__(self, graph: StargateGraph, cache_size=256) -> None:
+        self.graph = graph
+        self.cache_size = max(int(cache_size), 1)
+        self.indptr = np.asarray(graph.offsets, dtype=np.int64)
+        self.indices = np.asarray(graph.neighbours, dtype=np.int64)
+        self.degree = np.diff(self.indptr)
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "computed": 0}
+
+    def _bfs(self, sources):
+        """(len(sources), n) int16 distance matrix for dense source indices"""
+        k, n = len(sources), len(self.graph.system_ids)
+        dist = np.full((k, n), UNREACHABLE, dtype=np.int16)
+        rows = np.arange(k)
+        dist[rows, sources] = 0
+        frontier_rows, frontier_nodes = rows, np.asarray(sources, dtype=np.int64)
+        step = 0
+        while frontier_nodes.size:
+            step += 1
+            counts = self.degree[frontier_nodes]
+            total = int(counts.sum())
+            if not total:
+                break
+            #position of every neighbour of every frontier cell inside `indices`
+            starts = np.repeat(self.indptr[frontier_nodes] - np.cumsum(counts) + counts, counts)
+            nodes = self.indices[starts + np.arange(total)]
+            owners = np.repeat(frontier_rows, counts)
+            new = dist[owners, nodes] == UNREACHABLE
+            owners, nodes = owners[new], nodes[new]
+            dist[owners, nodes] = step
+            #a cell reached from two frontier systems is expanded once
+            flat = np.unique(owners * n + nodes)
+            frontier_rows, frontier_nodes = flat // n, flat % n
+        return dist
+
+    def rows(self, source_ids):
+        """{source_id: distance row} for the sources in the graph, missing rows computed in one batch"""
+        source_ids = [int(s) for s in dict.fromkeys(source_ids) if int(s) in self.graph.index]
+        with self._lock:
+            out = {}
+            for s in source_ids:
+                if s in self._rows:
+                    self._rows.move_to_end(s)
+                    out[s] = self._rows[s]
+            self._stats["hit"] += len(out)
+            missing = [s for s in source_ids if s not in out]
+        if missing:
+            dist = self._bfs([self.graph.index[s] for s in missing])
+            with self._lock:
+                for s, row in zip(missing, dist):
+                    out[s] = self._rows[s] = row
+                while len(self._rows) > self.cache_size:
+                    self._rows.popitem(last=False)
+                self._stats["computed"] += len(missing)
+        return out
+
+    def jumps(self, source_id, system_ids):
+        """Jumps from source_id to each of system_ids, None when unknown"""
+        row = self.rows([source_id]).get(int(source_id))
+        if row is None:
+            return [None] * len(system_ids)
+        index = self.graph.index
+        idx = np.fromiter((index.get(int(s), -1) if s is not None else -1 for s in system_ids), dtype=np.int64, count=len(system_ids))
+        found = np.where(idx >= 0, row[np.maximum(idx, 0)], UNREACHABLE)
+        return [None if d == UNREACHABLE else d for d in found.tolist()]
+
+    def stats(self):
+        with self._lock:
+            return {"cached_rows": len(self._rows), **self._stats}
+
+#shared service
+_distances = None
+_distances_lock = threading.Lock()
+
+def get_jump_distances() -> JumpDistances:
+    global _distances
+    if _distances is None:
+        with _distances_lock:
+            if _distances is None:
+                _distances = JumpDistances(get_stargate_graph(), CONFIG.get('JUMP_CACHE_ROWS', 256))
+    return _distances
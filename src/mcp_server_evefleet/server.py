@@ -2,51 +2,133 @@
 EVE Fleet Manager MCP Server - Auto-authorizes fleet on client connection
 """
 
+import sys
 import time
 import logging
-from typing import Optional, Dict, Any, Union
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional, Dict, Any, Union, TYPE_CHECKING
 from mcp.server.fastmcp import FastMCP
-from mcp_server_evefleet.functions import fleet_manager
-from mcp_server_evefleet.static_manage import ShipID_Dict, Static_Dict
-from mcp_server_evefleet.config_load import CONFIG
-from mcp_server_evefleet.IO.API_IO import get_refresh_token
-from mcp_server_evefleet.IO.fleet_api import get_sso_fleetid
+from mcp_server_evefleet.config_load import CONFIG, setup_logging
+from mcp_server_evefleet.static_manage import ShipID_Dict, System_Dict
+from mcp_server_evefleet.static_store import get_static_store
+# ESI/SSO stack (aiohttp, requests, jose) is imported on first use, the host spawns one server per session
+if TYPE_CHECKING:
+    from mcp_server_evefleet.functions import fleet_manager
 
 # Logger
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Global state
-fleet_mgr: Optional[fleet_manager] = None
+fleet_mgr: Optional["fleet_manager"] = None
 ship_dict: Optional[ShipID_Dict] = None
-system_dict: Optional[Static_Dict] = None
+system_dict: Optional[System_Dict] = None
 fleet_status = {"authorized": False, "error": None, "character": None, "fleet_id": None}
+# Background startup state, phase timings in ms
+startup = {"state": "idle", "started_at": None, "total_ms": None, "phases": {}, "error": None}
+auth_done = threading.Event()
+auth_lock = threading.Lock()
 
 ## functions
-def fleet_authorize_with_retry(max_retries: int = 3, force_refresh: bool = False) -> Dict[str, Any]:
-    """Auto-authorize fleet with retry logic"""
-    global fleet_mgr, fleet_status, ship_dict, system_dict
+# Settings are read when first needed, importing the server does not parse config.yaml
+def ready_timeout() -> float:
+    """Seconds a fleet tool waits for background authorization before answering warming_up"""
+    return CONFIG.get('STARTUP_READY_TIMEOUT', 10)
+
+@contextmanager
+def _phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup["phases"][name] = round((time.perf_counter() - start) * 1000, 1)
+
+# Static dicts are local files, loaded on first use instead of during authorization
+def get_ship_dict() -> ShipID_Dict:
+    global ship_dict
+    if ship_dict is None:
+        ship_dict = ShipID_Dict()
+    return ship_dict
+
+def get_system_dict() -> System_Dict:
+    global system_dict
+    if system_dict is None:
+        system_dict = System_Dict()
+    return system_dict
+
+#system id from an id, exact name or unique name prefix, None if unknown
+def resolve_system(item) -> Optional[int]:
+    return int(item) if str(item).isdigit() else get_system_dict().match(str(item))
+
+#stargate/station of a system by ID or name, stargates also by the system they lead to
+def find_system_object(objects, key) -> Optional[int]:
+    i = objects.find(key)
+    return i if i is not None else objects.find(resolve_system(key))
+
+#driving character plus the stored characters ESI places in the same fleet, fleet reads rotate over them
+def fleet_reader_ids(vault, fleet_id, character_id) -> list:
+    from mcp_server_evefleet.IO.fleet_api import get_sso_fleetid
+    readers = [character_id]
+    for char in vault.characters():
+        other = char["character_id"]
+        if other == character_id:
+            continue
+        try:
+            if get_sso_fleetid(vault.provider(other), other) == fleet_id:
+                readers.append(other)
+        except Exception as e:
+            logger.debug(f"{char['name']} is not in fleet {fleet_id}: {e}")
+    return readers
+
+def fleet_authorize_with_retry(max_retries: int = 3, force_refresh: bool = False, character_id: Optional[int] = None) -> Dict[str, Any]:
+    """Auto-authorize fleet with retry logic, `character_id` switches to a character stored in the token vault"""
+    global fleet_mgr, fleet_status
+    from mcp_server_evefleet.functions import fleet_manager
+    from mcp_server_evefleet.IO.API_IO import get_refresh_token
+    from mcp_server_evefleet.IO.fleet_api import get_sso_fleetid
+    from mcp_server_evefleet.IO.token_vault import get_token_vault
     
     for attempt in range(max_retries):
         try:
             logger.info(f"Fleet authorization attempt {attempt + 1}/{max_retries}")
             
-            system_dict = Static_Dict('setting/system_dict.yaml','systems','solar_system')
-            ship_dict = ShipID_Dict()
-            # Get tokens and initialize (cross-platform path by default)
-            _, access_token, character_id, character_name = get_refresh_token(reset=force_refresh)
+            with _phase("static_dicts"):
+                get_system_dict()
+                get_ship_dict()
+            with _phase("tokens"):
+                vault = get_token_vault()
+                if character_id is not None and character_id in vault and not force_refresh:
+                    # Stored character (FC or alt), no SSO login needed
+                    token_provider = vault.provider(character_id)
+                    token_provider.token()
+                else:
+                    # Get tokens and initialize (cross-platform path by default)
+                    refresh_token, access_token, _, _ = get_refresh_token(reset=force_refresh)
+                    token_provider = vault.add(refresh_token, access_token, primary=True)
+                character_id, character_name = token_provider.character_id, token_provider.character_name
+                # Keep every stored token fresh for ESI calls from here on
+                vault.set_active(character_id)
+                vault.start()
             
             # Create fleet manager
-            fleet_id = get_sso_fleetid(access_token, character_id, character_name)
-            fleet_mgr = fleet_manager(access_token, fleet_id, character_id, 
-                                    bomb_alt_ids=CONFIG.get('ALT_IDS', []), 
-                                    ship_dict=ship_dict,
-                                    system_dict=system_dict)
+            with _phase("fleet_lookup"):
+                fleet_id = get_sso_fleetid(token_provider, character_id, character_name)
+                read_ids = fleet_reader_ids(vault, fleet_id, character_id)
+            with _phase("fleet_manager"):
+                fleet_mgr = fleet_manager(token_provider, fleet_id, character_id, 
+                                        bomb_alt_ids=CONFIG.get('ALT_IDS', []), 
+                                        ship_dict=get_ship_dict(),
+                                        system_dict=get_system_dict(),
+                                        read_ids=read_ids)
             
             # Update status
             fleet_status.update({
                 "authorized": True, "error": None, 
                 "character": character_name, "fleet_id": fleet_id
             })
+            # a manual authorize after a failed or skipped startup makes the server ready too
+            startup.update(state="ready", error=None)
             
             logger.info(f"[SUCCESS] Fleet authorized for {character_name} (Fleet: {fleet_id})")
             return {"success": True, "character": character_name, "fleet_id": fleet_id, 
@@ -64,6 +146,39 @@ def fleet_authorize_with_retry(max_retries: int = 3, force_refresh: bool = False
     
     return {"success": False, "error": "Unexpected error"}
 
+def _background_authorize():
+    """Startup authorization off the MCP thread, so `initialize` is answered immediately"""
+    startup.update({"state": "warming_up", "started_at": time.time(), "error": None})
+    start = time.perf_counter()
+    try:
+        with auth_lock:
+            result = fleet_authorize_with_retry()
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+    startup.update({"state": "ready" if result["success"] else "failed", "error": result.get("error"),
+                    "total_ms": round((time.perf_counter() - start) * 1000, 1)})
+    auth_done.set()
+    if result["success"]:
+        logger.info(f"[READY] Fleet: {result['fleet_id']}, Character: {result['character']}")
+    else:
+        logger.error(f"[ERROR] Started with authorization error: {result['error']}, waiting for Client call to retry...")
+
+def start_background_authorize():
+    auth_done.clear()
+    threading.Thread(target=_background_authorize, name="fleet-authorize", daemon=True).start()
+
+def require_fleet(timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """None when the fleet manager is usable, else the error to return.
+    Waits up to `timeout` (default STARTUP_READY_TIMEOUT) for background authorization."""
+    if fleet_mgr is None and startup["state"] == "warming_up":
+        auth_done.wait(ready_timeout() if timeout is None else timeout)
+    if fleet_mgr is not None:
+        return None
+    if startup["state"] == "warming_up":
+        return {"success": False, "status": "warming_up", "error": "Fleet authorization still in progress, retry shortly",
+                "phases": dict(startup["phases"])}
+    return {"success": False, "error": "Fleet not authorized"}
+
 def get_fleet_status() -> Dict[str, Any]:
     """Get current fleet status and data.
     
@@ -78,15 +193,16 @@ def get_fleet_status() -> Dict[str, Any]:
             return {**fleet_status, "data_error": str(e)}
     return fleet_status
 
-# Create MCP server and auto-authorize
-mcp = FastMCP("EVE Fleet Manager")
-logger.info("Starting EVE Fleet Manager MCP Server...")
-startup_result = fleet_authorize_with_retry()
+@asynccontextmanager
+async def lifespan(server):
+    """Authorize in the background once the server starts, STARTUP_AUTHORIZE: false leaves it to fleet_authorize"""
+    if CONFIG.get('STARTUP_AUTHORIZE', True) and startup["state"] == "idle":
+        start_background_authorize()
+    yield
 
-if startup_result["success"]:
-    logger.info(f"[READY] Fleet: {startup_result['fleet_id']}, Character: {startup_result['character']}")
-else:
-    logger.error(f"[ERROR] Started with authorization error: {startup_result['error']}, waiting for Client call to retry...")
+# Create MCP server, authorize in the background
+mcp = FastMCP("EVE Fleet Manager", lifespan=lifespan)
+logger.info("Starting EVE Fleet Manager MCP Server...")
 
 ## MCP Tools
 # ship dict function
@@ -100,38 +216,201 @@ def ship_type2group(type_name: str) -> str:
     Returns:
         str: Ship group name or None if not found
     """
-    return ship_dict.type_to_groupname(type_name)
+    return get_ship_dict().type_to_groupname(type_name)
+# system dict function
+@mcp.tool()
+def find_system(name: str, limit: int = 10) -> Dict[str, Any]:
+    """Look up EVE solar systems by name or name prefix, case-insensitive (e.g., "0-R5" -> 0-R5TS). No ESI call.
+
+    Args:
+        name (str): System name or the first characters of it
+        limit (int): Max number of prefix matches returned
+
+    Returns:
+        Dict with the resolved system_id (exact or unique prefix match, else None) and the prefix matches
+    """
+    systems = get_system_dict()
+    return {"system_id": systems.match(name),
+            "matches": [{"name": n, "system_id": i} for n, i in systems.prefix(name, limit=limit)]}
+@mcp.tool()
+def plan_route(origin: str, destination: str, flag: str = "shortest", avoid: Optional[list] = None) -> Dict[str, Any]:
+    """Stargate route between two solar systems, same result as ESI's route endpoint. Routes inside the packaged map need no ESI call.
+
+    Args:
+        origin (str): Origin system name, unique name prefix or system ID
+        destination (str): Destination system name, unique name prefix or system ID
+        flag (str): 'shortest', 'secure' (prefer high-sec) or 'insecure' (prefer low/null-sec)
+        avoid (list): System names or IDs to route around
+
+    Returns:
+        Dict with the route as system IDs and names, and the number of jumps
+    """
+    from mcp_server_evefleet.IO.API_IO import get_route
+    systems = get_system_dict()
+    origin_id, destination_id = resolve_system(origin), resolve_system(destination)
+    if origin_id is None or destination_id is None:
+        return {"success": False, "error": f"Unknown system: {origin if origin_id is None else destination}"}
+    if flag not in ('shortest', 'secure', 'insecure'):
+        return {"success": False, "error": f"Invalid flag: {flag}"}
+    try:
+        route = get_route(origin_id, destination_id, flag, [a for a in map(resolve_system, avoid or []) if a is not None])
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "jumps": len(route) - 1,
+            "route": [{"system_id": i, "name": systems.name_of(i)} for i in route]}
+@mcp.tool()
+def jump_range(origin: str, light_years: float, exclude_highsec: bool = True, limit: int = 50) -> Dict[str, Any]:
+    """Solar systems within a capital jump range (light years) of a system, closest first. Computed from system positions, no ESI call.
+
+    Args:
+        origin (str): System name, unique name prefix or system ID
+        light_years (float): Jump range in light years
+        exclude_highsec (bool): Leave out high-sec systems (>= 0.45), which jump drives cannot enter
+        limit (int): Max systems returned
+
+    Returns:
+        Dict with the systems in range (ID, name, light years) and how many there are in total
+    """
+    from mcp_server_evefleet.spatial import get_spatial_index
+    systems, index = get_system_dict(), get_spatial_index()
+    origin_id = resolve_system(origin)
+    if origin_id is None or origin_id not in index:
+        return {"success": False, "error": f"No position known for system: {origin}"}
+    in_range = index.systems_within(origin_id, float(light_years), exclude_highsec=exclude_highsec)
+    return {"success": True, "origin": {"system_id": origin_id, "name": systems.name_of(origin_id)}, "count": len(in_range),
+            "systems": [{"system_id": i, "name": systems.name_of(i), "light_years": round(d, 3)} for i, d in in_range[:limit]]}
+
+@mcp.tool()
+def nearest_stargate(system: str, near: str) -> Dict[str, Any]:
+    """Stargate closest to a stargate or station inside a system, with the in-system distance. No ESI call.
+
+    Args:
+        system (str): System name, unique name prefix or system ID
+        near (str): Stargate/station ID or name, or for stargates the system it leads to
+
+    Returns:
+        Dict with the reference object and the nearest other stargate
+    """
+    from mcp_server_evefleet.spatial import get_spatial_index
+    system_id = resolve_system(system)
+    objects = get_spatial_index().objects(system_id) if system_id is not None else None
+    if objects is None:
+        return {"success": False, "error": f"No stargate/station positions known for system: {system}"}
+    i = find_system_object(objects, near)
+    if i is None:
+        return {"success": False, "error": f"Unknown object in {system}: {near}"}
+    j, distance = objects.nearest_gate(i)
+    if j < 0:
+        return {"success": False, "error": f"No other stargate known in {system}"}
+    return {"success": True, "near": objects.describe(i), "nearest_stargate": objects.describe(j, distance)}
+
+@mcp.tool()
+def warp_estimate(system: str, origin: str, destination: str, ship_types: Optional[list] = None,
+                  warp_speeds: Optional[list] = None) -> Dict[str, Any]:
+    """Warp time between two stargates/stations of a system for many ships at once, and for a fleet warp (slowest ship). Align time not included.
+
+    Args:
+        system (str): System name, unique name prefix or system ID
+        origin (str): Stargate/station ID or name, or for stargates the system it leads to
+        destination (str): Same as origin
+        ship_types (list): Ship type names or IDs, base warp speed by ship group (default: fleet members in the system)
+        warp_speeds (list): Warp speeds in AU/s, overrides ship_types
+
+    Returns:
+        Dict with the distance (AU and km), seconds per ship and the fleet warp time
+    """
+    from mcp_server_evefleet.spatial import AU, get_spatial_index, warp_times, warp_speed_of
+    system_id = resolve_system(system)
+    objects = get_spatial_index().objects(system_id) if system_id is not None else None
+    if objects is None:
+        return {"success": False, "error": f"No stargate/station positions known for system: {system}"}
+    i, j = find_system_object(objects, origin), find_system_object(objects, destination)
+    if i is None or j is None:
+        return {"success": False, "error": f"Unknown object in {system}: {origin if i is None else destination}"}
+    ships = get_ship_dict()
+    if warp_speeds:
+        labels, speeds = [f"{float(v)} AU/s" for v in warp_speeds], [float(v) for v in warp_speeds]
+    else:
+        if not ship_types:
+            if fleet_mgr is None:
+                return {"success": False, "error": "Give ship_types or warp_speeds, or authorize the fleet"}
+            ship_types = [m['ship_type_id'] for m in fleet_mgr.fleet_members_list if m.get('solar_system_id') == system_id]
+            if not ship_types:
+                return {"success": False, "error": f"No fleet members in {system}"}
+        labels, speeds, unknown = [], [], []
+        for t in ship_types:
+            ship = ships.ship_of(t)
+            if ship is None:
+                unknown.append(t)
+                continue
+            labels.append(ship[0])
+            speeds.append(warp_speed_of(ship[1]))
+        if unknown:
+            return {"success": False, "error": f"Unknown ship types: {unknown}"}
+    distance = objects.distance_m(i, j)
+    try:
+        seconds = warp_times(distance, speeds)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    per_ship = {label: {"warp_speed": speed, "seconds": round(t, 1)} for label, speed, t in zip(labels, speeds, seconds.tolist())}
+    return {"success": True, "origin": objects.describe(i), "destination": objects.describe(j),
+            "distance_au": round(distance / AU, 3), "distance_km": round(distance / 1000), "ships": per_ship, "fleet_warp_seconds": round(float(seconds.max()), 1)}
+
 # fleet function
 @mcp.tool()
-def fleet_authorize(force_refresh: bool = False) -> Dict[str, Any]:
+def fleet_authorize(force_refresh: bool = False, character_id: Optional[int] = None) -> Dict[str, Any]:
     """Authorize EVE fleet access via SSO tokens. fleet manager connection, validates FC permissions. Use when seeing "Fleet not authorized" errors.
     
     Args:
         force_refresh: Force token refresh even if tokens appear valid
+        character_id: Drive the fleet with this stored character (see list_characters), no new SSO login
     Returns:
         Success status, character name, fleet ID, fleet data, or error details
     """
-    return fleet_authorize_with_retry(force_refresh=force_refresh)
+    if startup["state"] == "warming_up" and not force_refresh and character_id is None:
+        # startup authorization already running, report its outcome
+        auth_done.wait(ready_timeout())
+        if fleet_mgr is not None:
+            return {"success": True, "character": fleet_status["character"], "fleet_id": fleet_status["fleet_id"],
+                    "fleet_data": fleet_mgr.output_fleet_static()}
+        if startup["state"] == "warming_up":
+            return require_fleet(timeout=0)
+    with auth_lock:
+        return fleet_authorize_with_retry(force_refresh=force_refresh, character_id=character_id)
 
 @mcp.tool()
-def organize_fleet_formation(members_per_squad: Optional[int] = 8, location_match: bool = True, number_of_squads: Optional[int] = None) -> Dict[str, Any]:
+def list_characters() -> Dict[str, Any]:
+    """List characters stored in the token vault (FC and alts) that fleet_authorize can switch to.
+    
+    Returns:
+        Characters with ID, name, whether active, and seconds until their access token expires
+    """
+    from mcp_server_evefleet.IO.token_vault import get_token_vault
+    return {"characters": get_token_vault().characters()}
+
+@mcp.tool()
+def organize_fleet_formation(members_per_squad: Optional[int] = 8, location_match: bool = True, number_of_squads: Optional[int] = None,
+                             max_jumps: Optional[int] = None) -> Dict[str, Any]:
     """Organize fleet into tactical formations. Places combat ships in first wing, non-combat in separate wings.
     
     Args:
         members_per_squad: Max members per squad (default 8)
         location_match: Only organize members in same system as FC
         number_of_squads: Create exactly this many squads (overrides members_per_squad)
+        max_jumps: With location_match, also organize members within this many jumps of the FC
     Returns:
         Success status, organization message, updated fleet data, member count
     """
-    if not fleet_mgr:
-        return {"success": False, "error": "Fleet not authorized"}
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
     
     try:
         fleet_mgr.fleet_formation(
             members_in_squad=members_per_squad,
             location_match=location_match,
-            number_of_squads=number_of_squads
+            number_of_squads=number_of_squads,
+            max_jumps=max_jumps
         )
         return {
             "success": True, 
@@ -142,6 +421,76 @@ def organize_fleet_formation(members_per_squad: Optional[int] = 8, location_matc
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@mcp.tool()
+def fleet_jumps(origin: Optional[str] = None) -> Dict[str, Any]:
+    """Stargate jumps of every fleet member from the FC's system or a staging system, counted on the packaged map without ESI calls.
+    
+    Args:
+        origin: Staging system name, unique name prefix or system ID (default: FC's current system)
+    Returns:
+        Success status, origin system, jumps per member (None when not on the packaged map), members per jump count
+    """
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
+    
+    systems = get_system_dict()
+    if origin is None:
+        origin_id = fleet_mgr.main_char_dic['solar_system_id']
+    else:
+        origin_id = resolve_system(origin)
+        if origin_id is None:
+            return {"success": False, "error": f"Unknown system: {origin}"}
+    try:
+        members = list(fleet_mgr.fleet_members_list)
+        jumps = fleet_mgr.get_member_jumps(origin_id, members)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    counts = {}
+    for jump in jumps:
+        counts[jump] = counts.get(jump, 0) + 1
+    histogram = {str(k): counts[k] for k in sorted(k for k in counts if k is not None)}
+    if None in counts:
+        histogram["unknown"] = counts[None]
+    return {
+        "success": True,
+        "origin": {"system_id": origin_id, "name": systems.name_of(origin_id)},
+        "members": [{"character_id": m['character_id'], "solar_system_id": m.get('solar_system_id'), "jumps": j}
+                    for m, j in zip(members, jumps)],
+        "jumps_histogram": histogram
+    }
+
+@mcp.tool()
+def fleet_jump_range(target: str, light_years: float) -> Dict[str, Any]:
+    """Which fleet members are within jump range (light years) of a target system, e.g. capitals that can reach a cyno. No ESI call.
+    
+    Args:
+        target: Target system name, unique name prefix or system ID
+        light_years: Jump range in light years
+    Returns:
+        Success status, target system, light years per member (None when the position is unknown), members in range count
+    """
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
+    
+    from mcp_server_evefleet.spatial import get_spatial_index
+    systems, index = get_system_dict(), get_spatial_index()
+    target_id = resolve_system(target)
+    if target_id is None or target_id not in index:
+        return {"success": False, "error": f"No position known for system: {target}"}
+    members = list(fleet_mgr.fleet_members_list)
+    distances = index.distances_ly(target_id, [m.get('solar_system_id') for m in members])
+    rows = [{"character_id": m['character_id'], "solar_system_id": m.get('solar_system_id'),
+             "light_years": None if d != d else round(d, 3), "in_range": bool(d <= float(light_years))}
+            for m, d in zip(members, distances.tolist())]
+    return {
+        "success": True,
+        "target": {"system_id": target_id, "name": systems.name_of(target_id)},
+        "members": rows,
+        "in_range_count": sum(r["in_range"] for r in rows)
+    }
+
 @mcp.tool()
 def invite_to_fleet(ids_or_names: list) -> Dict[str, Any]:
     """Invite characters to fleet. Accepts character IDs, names, or ['alt'/'account'] for all configured alts.
@@ -149,62 +498,64 @@ def invite_to_fleet(ids_or_names: list) -> Dict[str, Any]:
     Args:
         ids_or_names: List of character IDs, names, or ['alt'/'account'] for all alts
     Returns:
-        Success status, invitation count message, list of invited characters
+        Success status, invitation count message, list of invited characters, names that could not be resolved
     """
-    if not fleet_mgr:
-        return {"success": False, "error": "Fleet not authorized"}
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
     
     if ids_or_names and (ids_or_names[0].lower() == 'alt' or ids_or_names[0].lower() == 'account'):
         ids_or_names = fleet_mgr.alts
 
-    char_id_list = []
-    for e_item in ids_or_names:
-        if str(e_item).isdigit():
-            char_id_list.append(int(e_item))
-        else:
-            char_ids = fleet_mgr.char_dict.update_names([str(e_item)])
-            char_id_list.extend(char_ids)
-    logger.info(f"Preparing to invite characters: {char_id_list}")
+    char_id_list = [int(e_item) for e_item in ids_or_names if str(e_item).isdigit()]
+    names = [str(e_item) for e_item in ids_or_names if not str(e_item).isdigit()]
     try:
+        # one bulk lookup for every unknown name, names ESI does not know are remembered for a while
+        resolved = fleet_mgr.char_dict.get_many(names)
+        char_id_list.extend(i for i in resolved if i is not None)
+        not_found = [n for n, i in zip(names, resolved) if i is None]
+        logger.info(f"Preparing to invite characters: {char_id_list}")
         fleet_mgr.fleet_invite(char_id_list)
         return {
             "success": True,
             "message": f"Invited {len(char_id_list)} characters to fleet",
-            "invited_characters": char_id_list
+            "invited_characters": char_id_list,
+            "not_found": not_found
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 @mcp.tool()
-def kick_from_fleet(ids_or_names: list, sleep_time: float = 0.1) -> Dict[str, Any]:
+def kick_from_fleet(ids_or_names: list, sleep_time: float = 0.0) -> Dict[str, Any]:
     """Remove characters from fleet. Accepts character IDs, names, or ['alt'/'account'] for all alts.
     
     Args:
         ids_or_names: List of character IDs, names, or ['alt'/'account'] for all alts
-        sleep_time: Delay between kicks in seconds (default 0.1s)
+        sleep_time: Extra delay between kicks in seconds (default 0, ESI error-limit pacing is automatic)
     Returns:
-        Success status, removal count message, list of kicked characters
+        Success status, removal count message, list of kicked characters, names that could not be resolved
     """
-    if not fleet_mgr:
-        return {"success": False, "error": "Fleet not authorized"}
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
     
     if ids_or_names and (ids_or_names[0].lower() == 'alt' or ids_or_names[0].lower() == 'account'):
         ids_or_names = fleet_mgr.alts
 
-    char_id_list = []
-    for e_item in ids_or_names:
-        if str(e_item).isdigit():
-            char_id_list.append(int(e_item))
-        else:
-            char_ids = fleet_mgr.char_dict.update_names([str(e_item)])
-            char_id_list.extend(char_ids)
-    logger.info(f"Preparing to kick characters: {char_id_list}")
+    char_id_list = [int(e_item) for e_item in ids_or_names if str(e_item).isdigit()]
+    names = [str(e_item) for e_item in ids_or_names if not str(e_item).isdigit()]
     try:
+        # one bulk lookup for every unknown name, names ESI does not know are remembered for a while
+        resolved = fleet_mgr.char_dict.get_many(names)
+        char_id_list.extend(i for i in resolved if i is not None)
+        not_found = [n for n, i in zip(names, resolved) if i is None]
+        logger.info(f"Preparing to kick characters: {char_id_list}")
         fleet_mgr.fleet_kick(char_id_list, sleep_time)
         return {
             "success": True,
             "message": f"Kicked {len(char_id_list)} characters from fleet",
-            "kicked_characters": char_id_list
+            "kicked_characters": char_id_list,
+            "not_found": not_found
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -219,8 +570,9 @@ def update_fleet_motd(text: str, append: bool = True) -> Dict[str, Any]:
     Returns:
         Success status, confirmation message, complete updated MOTD
     """
-    if not fleet_mgr:
-        return {"success": False, "error": "Fleet not authorized"}
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
     
     try:
         fleet_mgr.update_motd(text, append)
@@ -242,8 +594,9 @@ def get_fleet_history(limit: int = 5) -> Dict[str, Any]:
     Returns:
         Success status, fleet history entries, record count
     """
-    if not fleet_mgr:
-        return {"success": False, "error": "Fleet not authorized"}
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
     
     try:
         history_data = fleet_mgr.fleet_history.get_data()[-limit:] if limit > 0 else fleet_mgr.fleet_history.get_data()
@@ -264,8 +617,9 @@ def get_fleet_losses(limit: int = 5) -> Dict[str, Any]:
     Returns:
         Success status, loss history data, record count
     """
-    if not fleet_mgr:
-        return {"success": False, "error": "Fleet not authorized"}
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
     
     try:
         loss_history = fleet_mgr.fleet_loss_history.get_data()[-limit:] if limit > 0 else fleet_mgr.fleet_loss_history.get_data()
@@ -295,8 +649,9 @@ def fleet_status_resource() -> str:
 def fleet_composition_resource() -> Dict[str, Any]:
     """Return fleet composition with ship type breakdown. Shows ship distribution, specific hull counts, role categorization.
     """
-    if not fleet_mgr:
-        return {"success": False, "error": "Fleet not authorized"}
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
     
     try:
         composition = fleet_mgr.fleet_members_composition
@@ -313,8 +668,9 @@ def fleet_composition_resource() -> Dict[str, Any]:
 def fleet_structure_resource() -> Dict[str, Any]:
     """Get hierarchical fleet structure (Fleet > Wings > Squads > Members). Shows IDs, names, member assignments, roles, ship types, locations.
     """
-    if not fleet_mgr:
-        return {"success": False, "error": "Fleet not authorized"}
+    not_ready = require_fleet()
+    if not_ready:
+        return not_ready
     
     try:
         return {
@@ -329,27 +685,17 @@ def fleet_structure_resource() -> Dict[str, Any]:
 @mcp.resource("ship://types")
 def ship_types_resource() -> str:
     """Return EVE ship types resource. Provides ship type names."""
-    if ship_dict != None:
-        return f"Ship Types: {ship_dict.ship_names}"
-    else:
-        return "[ERROR] Character not authorized"
+    return get_ship_dict().payload('types')
     
 @mcp.resource("ship://groups")
 def ship_groups_resource() -> str:
     """Return EVE ship groups resource. Provides ship group names."""
-    if ship_dict != None:
-        return f"Ship Groups: {ship_dict.class_names}"
-    else:
-        return "[ERROR] Character not authorized"
+    return get_ship_dict().payload('groups')
 
 @mcp.resource("ship://types2groups")
 def ship_types_to_groups_resource() -> str:
     """Return EVE ship types to groups resource. Provides dictionary from ship types to group names."""
-    gp_dict = {name: group for name, group in zip(ship_dict.ship_names, ship_dict.type_to_groupnames(ship_dict.ship_names))}
-    if ship_dict != None:
-        return f"Ship Types to Groups Dict: {gp_dict}"
-    else:
-        return "[ERROR] Character not authorized"
+    return get_ship_dict().payload('types2groups')
 
 # Prompts
 @mcp.prompt()
@@ -378,8 +724,16 @@ def fleet_prompt(action: str = "status") -> str:
 
 @mcp.tool()
 def ping() -> dict:
-    """Health check"""
-    return {"ok": True}
+    """Health check: startup state with phase timings, ESI connection pool reuse counters, universe and static store hits"""
+    result = {"ok": True, "startup": {**startup, "phases": dict(startup["phases"])}, "static_store": get_static_store().stats()}
+    # stats only once the ESI stack is loaded, ping itself must not pay for the imports
+    if 'mcp_server_evefleet.IO.token_vault' in sys.modules:
+        from mcp_server_evefleet.IO.esi_client import get_esi_client
+        from mcp_server_evefleet.IO.universe_store import get_universe_store
+        from mcp_server_evefleet.IO.token_vault import get_token_vault
+        result.update({"esi": get_esi_client().stats(), "universe_store": get_universe_store().stats(),
+                       "tokens": get_token_vault().stats()})
+    return result
 
 if __name__ == "__main__":
     mcp.run(transport="stdio")
\ No newline at end of file
@@ -0,0 +1,285 @@
+"""_summary_
+Spatial queries over the universe data: light-year distances between systems, in-system positions and warp times
+"""
+#import
+import threading
+
+import numpy as np
+
+from mcp_server_evefleet.static_store import get_static_store
+
+LIGHT_YEAR = 9460730472580800.0
+AU = 149597870700.0
+#capital jump drives cannot enter high-sec
+HIGHSEC = 0.45
+#ships leave warp below this speed (m/s), or half their subwarp speed if lower
+WARP_DROPOUT = 100.0
+#base warp speed (AU/s) by ship group, no skills, rigs or implants
+BASE_WARP_SPEED = {
+    'Capsule': 8.0, 'Shuttle': 8.0, 'Interceptor': 8.0, 'Corvette': 5.0,
+    'Frigate': 5.0, 'Assault Frigate': 5.0, 'Covert Ops': 5.0, 'Stealth Bomber': 5.0, 'Electronic Attack Ship': 5.0,
+    'Logistics Frigate': 5.0, 'Expedition Frigate': 5.0, 'Prototype Exploration Ship': 5.0,
+    'Destroyer': 4.5, 'Command Destroyer': 4.5, 'Tactical Destroyer': 4.5, 'Interdictor': 4.5,
+    'Hauler': 4.5, 'Deep Space Transport': 4.5, 'Blockade Runner': 4.5,
+    'Cruiser': 3.0, 'Heavy Assault Cruiser': 3.0, 'Heavy Interdiction Cruiser': 3.0, 'Logistics': 3.0,
+    'Force Recon Ship': 3.0, 'Combat Recon Ship': 3.0, 'Strategic Cruiser': 3.0, 'Flag Cruiser': 3.0,
+    'Mining Barge': 3.0, 'Exhumer': 3.0,
+    'Combat Battlecruiser': 2.7, 'Attack Battlecruiser': 2.7, 'Command Ship': 2.7,
+    'Battleship': 2.0, 'Marauder': 2.0, 'Black Ops': 2.2, 'Industrial Command Ship': 2.0,
+    'Carrier': 1.5, 'Dreadnought': 1.5, 'Lancer Dreadnought': 1.5, 'Force Auxiliary': 1.5, 'Capital Industrial Ship': 1.5,
+    'Supercarrier': 1.37, 'Titan': 1.37, 'Freighter': 1.37, 'Jump Freighter': 1.37,
+}
+DEFAULT_WARP_SPEED = 3.0
+
+def position_of(data):
+    """(x, y, z) of an ESI universe object, None without a position"""
+    position = (data or {}).get('position')
+    return (position['x'], position['y'], position['z']) if position else None
+
+class KDTree():
+    """Static k-d tree over an (n, dims) point array.
+
+    Nodes are flat arrays: node i covers `order[start[i]:end[i]]` inside the
+    bounding box `low[i]`..`high[i]`; leaves (left == -1) hold up to
+    `leaf_size` points whose distances are computed in one vectorized step.
+
+    Args:
+        points: (n, dims) coordinates
+        leaf_size (int): Max points per leaf
+    """
+    def __init__(self, points, leaf_size=16) -> None:
+        self.points = np.asarray(points, dtype=np.float64)
+        if self.points.ndim != 2:
+            self.points = self.points.reshape(-1, 3)
+        n = len(self.points)
+        self.order = np.arange(n)
+        start, end, left, right, low, high = [], [], [], [], [], []
+        stack = [(0, n, -1, False)]
+        while stack:
+            s, e, parent, is_right = stack.pop()
+            node = len(start)
+            if parent >= 0:
+                (right if is_right else left)[parent] = node
+            block = self.points[self.order[s:e]]
+            start.append(s)
+            end.append(e)
+            left.append(-1)
+            right.append(-1)
+            low.append(block.min(axis=0) if e > s else np.zeros(self.points.shape[1]))
+            high.append(block.max(axis=0) if e > s else np.zeros(self.points.shape[1]))
+            if e - s <= leaf_size:
+                continue
+            #split the widest dimension at the median
+            dim = int(np.argmax(high[node] - low[node]))
+            mid = (s + e) // 2
+            idx = self.order[s:e]
+            self.order[s:e] = idx[np.argpartition(block[:, dim], mid - s)]
+            stack.append((mid, e, node, True))
+            stack.append((s, mid, node, False))
+        self.start, self.end = np.array(start), np.array(end)
+        self.left, self.right = np.array(left), np.array(right)
+        self.low, self.high = np.array(low), np.array(high)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _gap2(self, node, center):
+        gap = np.maximum(self.low[node] - center, 0) + np.maximum(center - self.high[node], 0)
+        return float(gap @ gap)
+
+    def query_ball(self, center, radius):
+        """(indices, distances) of the points within `radius` of `center`, unsorted"""
+        center = np.asarray(center, dtype=np.float64)
+        r2 = float(radius) ** 2
+        found, dists = [], []
+        stack = [0] if len(self) else []
+        while stack:
+            node = stack.pop()
+            if self._gap2(node, center) > r2:
+                continue
+            if self.left[node] >= 0:
+                stack.append(self.left[node])
+                stack.append(self.right[node])
+                continue
+            idx = self.order[self.start[node]:self.end[node]]
+            d2 = ((self.points[idx] - center) ** 2).sum(axis=1)
+            inside = d2 <= r2
+            found.append(idx[inside])
+            dists.append(d2[inside])
+        if not found:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(found), np.sqrt(np.concatenate(dists))
+
+    def nearest(self, center, exclude=()):
+        """(index, distance) of the closest point to `center`, (-1, inf) if there is none"""
+        center = np.asarray(center, dtype=np.float64)
+        exclude = np.asarray(list(exclude), dtype=np.int64)
+        best, best_d2 = -1, np.inf
+        stack = [0] if len(self) else []
+        while stack:
+            node = stack.pop()
+            if self._gap2(node, center) >= best_d2:
+                continue
+            if self.left[node] >= 0:
+                near, far = self.left[node], self.right[node]
+                if self._gap2(near, center) > self._gap2(far, center):
+                    near, far = far, near
+                stack.append(far)
+                stack.append(near)
+                continue
+            idx = self.order[self.start[node]:self.end[node]]
+            d2 = ((self.points[idx] - center) ** 2).sum(axis=1)
+            d2[np.isin(idx, exclude)] = np.inf
+            i = int(np.argmin(d2))
+            if d2[i] < best_d2:
+                best, best_d2 = int(idx[i]), float(d2[i])
+        return best, float(np.sqrt(best_d2))
+
+class SystemObjects():
+    """Stargates and stations of one solar system, positions in meters"""
+    def __init__(self, kinds, ids, names, positions, destinations) -> None:
+        self.kinds, self.ids, self.names, self.destinations = kinds, ids, names, destinations
+        self.positions = np.asarray(positions, dtype=np.float64)
+        self.tree = KDTree(self.positions, leaf_size=8)
+        self.gates = np.array([k == 'stargate' for k in kinds], dtype=bool)
+
+    def find(self, key):
+        """Index of an object by id, exact name, or (stargates) destination system id"""
+        key = str(key).strip().lower()
+        for i, (item_id, name, destination) in enumerate(zip(self.ids, self.names, self.destinations)):
+            if key in (str(item_id), name.lower(), str(destination)):
+                return i
+        return None
+
+    def distance_m(self, i, j):
+        return float(np.linalg.norm(self.positions[i] - self.positions[j]))
+
+    def nearest_gate(self, i):
+        """(index, meters) of the stargate closest to object i, other than itself"""
+        return self.tree.nearest(self.positions[i], exclude=[i, *np.flatnonzero(~self.gates).tolist()])
+
+    def describe(self, i, distance_m=None):
+        item = {"kind": self.kinds[i], "id": self.ids[i], "name": self.names[i]}
+        if self.destinations[i] is not None:
+            item["destination_system_id"] = self.destinations[i]
+        if distance_m is not None:
+            item["distance_au"] = round(distance_m / AU, 3)
+            item["distance_km"] = round(distance_m / 1000)
+        return item
+
+class SpatialIndex():
+    """Positions of every system in the static data, in light years, under a KDTree.
+
+    `systems_within` answers a jump-range query from the tree; distances from
+    one system to many (fleet members) are a single vectorized norm. Objects
+    inside a system (stargates, stations) are indexed per system on first use.
+
+    Args:
+        systems (dict): {system_id: ESI system data}
+        objects (dict): {kind: {id: ESI data}} for 'stargate' and 'station'
+    """
+    def __init__(self, systems, objects) -> None:
+        placed = sorted((int(k), v) for k, v in systems.items() if position_of(v))
+        self.system_ids = np.array([k for k, _ in placed], dtype=np.int64)
+        self.index = {k: i for i, (k, _) in enumerate(placed)}
+        self.names = [v.get('name') for _, v in placed]
+        self.security = np.array([float(v.get('security_status', 0.0)) for _, v in placed])
+        self.positions = np.array([position_of(v) for _, v in placed], dtype=np.float64).reshape(len(placed), 3) / LIGHT_YEAR
+        self.tree = KDTree(self.positions)
+        self._objects = {}
+        for kind, items in objects.items():
+            for item_id, data in (items or {}).items():
+                if position_of(data) and data.get('system_id'):
+                    self._objects.setdefault(int(data['system_id']), []).append((kind, int(item_id), data))
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, system_id):
+        return int(system_id) in self.index
+
+    def distance_ly(self, a, b):
+        i, j = self.index.get(int(a)), self.index.get(int(b))
+        if i is None or j is None:
+            return None
+        return float(np.linalg.norm(self.positions[i] - self.positions[j]))
+
+    def distances_ly(self, origin_id, system_ids):
+        """Light years from origin to each of system_ids, NaN where a position is missing"""
+        system_ids = list(system_ids)
+        i = self.index.get(int(origin_id))
+        idx = np.fromiter((self.index.get(int(s), -1) if s is not None else -1 for s in system_ids), dtype=np.int64, count=len(system_ids))
+        if i is None:
+            return np.full(len(system_ids), np.nan)
+        dist = np.linalg.norm(self.positions[np.maximum(idx, 0)] - self.positions[i], axis=1)
+        dist[idx < 0] = np.nan
+        return dist
+
+    def systems_within(self, origin_id, light_years, exclude_highsec=False):
+        """(system_id, light years) within range of origin, closest first, origin excluded"""
+        i = self.index.get(int(origin_id))
+        if i is None:
+            return []
+        idx, dist = self.tree.query_ball(self.positions[i], light_years)
+        keep = idx != i
+        if exclude_highsec:
+            keep &= self.security[idx] < HIGHSEC
+        idx, dist = idx[keep], dist[keep]
+        order = np.argsort(dist, kind='stable')
+        return list(zip(self.system_ids[idx[order]].tolist(), dist[order].tolist()))
+
+    def objects(self, system_id):
+        """SystemObjects of a system, None when the data holds no positioned stargate or station for it"""
+        system_id = int(system_id)
+        with self._lock:
+            if system_id not in self._local:
+                items = self._objects.get(system_id)
+                self._local[system_id] = SystemObjects(
+                    [k for k, _, _ in items], [i for _, i, _ in items], [d.get('name', str(i)) for _, i, d in items],
+                    [position_of(d) for _, _, d in items],
+                    [(d.get('destination') or {}).get('system_id') for _, _, d in items]) if items else None
+            return self._local[system_id]
+
+    def stats(self):
+        return {"systems": len(self.system_ids), "systems_with_objects": len(self._objects)}
+
+def warp_times(distance_m, warp_speed_au, subwarp_speed=None):
+    """Seconds spent in warp, broadcast over distances (m) and warp speeds (AU/s).
+
+    Speed grows as e^(k_a t) with k_a = warp speed, and decays with
+    k_d = min(warp speed / 3, 2) down to the dropout speed. Warps too short to
+    reach full speed peak where the two phases meet. Align time is not included.
+    """
+    d = np.asarray(distance_m, dtype=np.float64)
+    v_w = np.asarray(warp_speed_au, dtype=np.float64)
+    if np.any(v_w <= 0):
+        raise ValueError("warp speed must be positive")
+    k_a, k_d = v_w, np.minimum(v_w / 3, 2.0)
+    v_drop = WARP_DROPOUT if subwarp_speed is None else np.minimum(np.asarray(subwarp_speed, dtype=np.float64) / 2, WARP_DROPOUT)
+    v_max = v_w * AU
+    full = v_max / k_a + v_max / k_d
+    v_peak = np.where(d >= full, v_max, d * k_a * k_d / (k_a + k_d))
+    v_peak = np.maximum(v_peak, np.maximum(v_drop, 1.0))
+    t_accel = np.log(v_peak) / k_a
+    t_decel = np.log(v_peak / v_drop) / k_d
+    t_cruise = np.maximum(d - full, 0) / v_max
+    return t_accel + t_cruise + t_decel
+
+_WARP_SPEED_KEYS = {k.lower(): v for k, v in BASE_WARP_SPEED.items()}
+
+def warp_speed_of(group_name):
+    """Base warp speed of a ship group, any capitalization ("Jump freighter" as well as "Jump Freighter")"""
+    return _WARP_SPEED_KEYS.get(str(group_name).lower(), DEFAULT_WARP_SPEED)
+
+#shared index
+_index = None
+_index_lock = threading.Lock()
+
+def get_spatial_index() -> SpatialIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                store = get_static_store()
+                _index = SpatialIndex(store.universe_all('system'),
+                                      {kind: store.universe_all(kind) for kind in ('stargate', 'station')})
+    return _index
@@ -10,17 +10,159 @@ This can be run by doing
 >>> python validate_jwt.py
 
 and passing in a JWT access token that you have retrieved from the EVE SSO.
+
+The SSO metadata and signing keys are cached in memory for JWKS_TTL seconds and
+persisted to jwks.json in the app config dir, so validation is local crypto after
+the first fetch and keeps working offline at startup. Keys are looked up by the
+token's `kid`; an unknown `kid` triggers one re-fetch (key rotation).
 """
 import sys
+import json
+import time
+import logging
+import threading
+from pathlib import Path
 
 import requests
-from jose import jwt
-from jose.exceptions import ExpiredSignatureError, JWTError
+from platformdirs import user_config_dir
+
+logger = logging.getLogger(__name__)
 
 SSO_META_DATA_URL = "https://login.eveonline.com/.well-known/oauth-authorization-server"
 JWK_ALGORITHM = "RS256"
 JWK_ISSUERS = ("login.eveonline.com", "https://login.eveonline.com")
 JWK_AUDIENCE = "EVE Online"
+#signing keys rotate rarely, unknown kids force a re-fetch anyway
+JWKS_TTL = 24 * 3600
+#min seconds between re-fetches triggered by unknown kids (bogus tokens must not hammer SSO)
+JWKS_REFETCH_INTERVAL = 60
+JWKS_TIMEOUT = 10
+
+
+def _default_jwks_path() -> Path:
+    return Path(user_config_dir("mcp_server_evefleet", "mcp_server_evefleet")) / "jwks.json"
+
+
+class JWKSCache:
+    """SSO signing keys by kid, with TTL, persisted copy and stale-on-error fallback."""
+
+    def __init__(self, path=None, ttl=JWKS_TTL, refetch_interval=JWKS_REFETCH_INTERVAL):
+        self.path = Path(path) if path else _default_jwks_path()
+        self.ttl = ttl
+        self.refetch_interval = refetch_interval
+        self.keys = {}
+        self.fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.keys = {k["kid"]: k for k in data["keys"] if "kid" in k}
+            self.fetched_at = float(data.get("fetched_at", 0.0))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump({"fetched_at": self.fetched_at, "keys": list(self.keys.values())}, f)
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist JWKS to {self.path}: {e}")
+
+    def _fetch(self):
+        # fetch JWKs URL from meta data endpoint
+        res = requests.get(SSO_META_DATA_URL, timeout=JWKS_TIMEOUT)
+        res.raise_for_status()
+        data = res.json()
+        try:
+            jwks_uri = data["jwks_uri"]
+        except KeyError:
+            raise RuntimeError(
+                f"Invalid data received from the SSO meta data endpoint: {data}"
+            ) from None
+
+        # fetch JWKs from endpoint
+        res = requests.get(jwks_uri, timeout=JWKS_TIMEOUT)
+        res.raise_for_status()
+        data = res.json()
+        try:
+            jwk_sets = data["keys"]
+        except KeyError:
+            raise RuntimeError(
+                f"Invalid data received from the the jwks endpoint: {data}"
+            ) from None
+        return {k.get("kid", k["alg"]): k for k in jwk_sets}
+
+    def _store(self, keys):
+        self.keys = keys
+        self.fetched_at = time.time()
+        self._save()
+
+    # blocking refresh, only when no usable key is known
+    def _refresh(self):
+        now = time.time()
+        if self.keys and now - self._last_attempt < self.refetch_interval:
+            return
+        self._last_attempt = now
+        try:
+            self._store(self._fetch())
+        except (requests.RequestException, RuntimeError) as e:
+            # offline or SSO down: keep serving the keys we have
+            if not self.keys:
+                raise
+            logger.warning(f"JWKS refresh failed, using cached keys: {e}")
+
+    # TTL expired: keep validating with the current keys, refresh off the hot path
+    def _refresh_in_background(self):
+        if time.time() - self._last_attempt < self.refetch_interval:
+            return
+        self._last_attempt = time.time()
+        threading.Thread(target=self._background_refresh, name="jwks-refresh", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            keys = self._fetch()
+        except (requests.RequestException, RuntimeError) as e:
+            logger.warning(f"JWKS refresh failed, using cached keys: {e}")
+            return
+        with self._lock:
+            self._store(keys)
+
+    def get_key(self, kid=None):
+        """Return the JWK for `kid` (or the RS256 key if the token has no kid)."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if not self.keys:
+                self._refresh()
+            elif time.time() - self.fetched_at >= self.ttl:
+                self._refresh_in_background()
+            key = self._pick(kid)
+            if key is None:
+                # unknown kid: keys were rotated
+                self._refresh()
+                key = self._pick(kid)
+            if key is None:
+                from jose.exceptions import JWTError
+                raise JWTError(f"No SSO signing key with kid {kid!r}")
+            return key
+
+    def _pick(self, kid):
+        if kid is not None:
+            return self.keys.get(kid)
+        # pick the JWK with the requested alogorithm
+        matches = [item for item in self.keys.values() if item.get("alg") == JWK_ALGORITHM]
+        return matches[-1] if matches else None
+
+
+_jwks_cache = JWKSCache()
 
 
 def validate_eve_jwt(token: str) -> dict:
@@ -31,30 +173,11 @@ def validate_eve_jwt(token: str) -> dict:
     Returns:
         The contents of the validated JWT access token if there are no errors
     """
-    # fetch JWKs URL from meta data endpoint
-    res = requests.get(SSO_META_DATA_URL)
-    res.raise_for_status()
-    data = res.json()
-    try:
-        jwks_uri = data["jwks_uri"]
-    except KeyError:
-        raise RuntimeError(
-            f"Invalid data received from the SSO meta data endpoint: {data}"
-        ) from None
-
-    # fetch JWKs from endpoint
-    res = requests.get(jwks_uri)
-    res.raise_for_status()
-    data = res.json()
-    try:
-        jwk_sets = data["keys"]
-    except KeyError:
-        raise RuntimeError(
-            f"Invalid data received from the the jwks endpoint: {data}"
-        ) from None
-
-    # pick the JWK with the requested alogorithm
-    jwk_set = [item for item in jwk_sets if item["alg"] == JWK_ALGORITHM].pop()
+    # jose is imported on first validation, not at import
+    from jose import jwt
+    # cached signing key for the token's kid, network only on first use/rotation
+    kid = jwt.get_unverified_header(token).get("kid")
+    jwk_set = _jwks_cache.get_key(kid)
 
     # try to decode the token and validate it against expected values
     # will raise JWT exceptions if decoding fails or expected values do not match
@@ -69,6 +192,7 @@ def validate_eve_jwt(token: str) -> dict:
 
 
 def main():
+    from jose.exceptions import ExpiredSignatureError, JWTError
     token = input("Enter an access token to validate: ")
 
     try:
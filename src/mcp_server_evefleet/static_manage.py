@@ -2,186 +2,448 @@
 Code for EVE API management char/location/UI
 """
 #import
-from collections import defaultdict
+from array import array
 from pathlib import Path
+from bisect import bisect_left
 import csv
-import yaml
-from importlib import resources
+import sys
+import time
+import logging
+import threading
 
-from mcp_server_evefleet.IO.API_IO import (post_name2id, post_id2name)
+from mcp_server_evefleet.config_load import CONFIG
+from mcp_server_evefleet.static_store import get_static_store
+from mcp_server_evefleet.IO.char_store import get_char_store, default_store_path
+
+logger = logging.getLogger(__name__)
+
+#collects misses from concurrent callers within `window` seconds into one resolve call
+class MissBatcher():
+    def __init__(self, resolve, window=0.02) -> None:
+        self.resolve = resolve
+        self.window = window
+        self._pending = set()
+        self._round = None
+        self._lock = threading.Lock()
+    def wait_for(self, keys):
+        with self._lock:
+            self._pending.update(keys)
+            leader = self._round is None
+            if leader:
+                self._round = threading.Event()
+                self._round.error = None
+            round_done = self._round
+        if not leader:
+            round_done.wait()
+            #the leader's failure is every caller's, not a batch of unknown names
+            if round_done.error is not None:
+                raise round_done.error
+            return
+        try:
+            time.sleep(self.window)
+            with self._lock:
+                batch, self._pending, self._round = list(self._pending), set(), None
+            self.resolve(batch)
+        except BaseException as e:
+            round_done.error = e
+            raise
+        finally:
+            round_done.set()
 
 #manage char name<->char id
 class CharID_Dict():
     def __init__(self,
                  init_file_name='setting/chardict.yaml') -> None:
-        init_file = Path(init_file_name)
+        #names live in the journaled char store, the YAML file only seeds a new store
         self.name2id_key = "characters"
         self.id2name_key = "character"
-        if init_file.exists():
-            with open(init_file) as file:
-                self.char_name2id = yaml.safe_load(file)
-            self.char_id2name = {v:k for k,v in self.char_name2id.items()}
-        else:
-            # Fallback: load defaults from packaged resource if available
-            try:
-                with resources.files('mcp_server_evefleet').joinpath(init_file_name).open('r') as file:
-                    self.char_name2id = yaml.safe_load(file) or {}
-                self.char_id2name = {v:k for k,v in self.char_name2id.items()}
-            except FileNotFoundError:
-                self.char_name2id = {}
-                self.char_id2name = {}
-        self.init_file = init_file
+        self.store = get_char_store(init_file_name)
+        #shared map, only the store writes it (see learn)
+        self.char_name2id = self.store.name2id
+        self.char_id2name = {v:k for k,v in self.store.snapshot().items()}
+        self.init_file = Path(init_file_name)
+        self.setup_misses()
+    #negative cache and miss batching, shared by the subclasses
+    def setup_misses(self):
+        self.negative_ttl = CONFIG.get('CHAR_NEGATIVE_TTL', 600)
+        self.misses = {}
+        self.name_batcher = MissBatcher(self.resolve_names, CONFIG.get('CHAR_MISS_WINDOW', 0.02))
+        self.id_batcher = MissBatcher(self.resolve_ids, CONFIG.get('CHAR_MISS_WINDOW', 0.02))
+    def known_missing(self, key):
+        expires = self.misses.get(key)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            self.misses.pop(key, None)
+            return False
+        return True
     #check
     def check_names(self,names_list):
-        return [n for n in names_list if self.char_name2id.get(n.lower(),None)==None]
+        return [n for n in names_list if self.char_name2id.get(n.lower(),None)==None and not self.known_missing(n.lower())]
     def check_ids(self,ids_list):
-        return [n for n in ids_list if self.char_id2name.get(n,None)==None]
+        return [n for n in ids_list if self.char_id2name.get(n,None)==None and not self.known_missing(n)]
+    #one bulk ESI lookup, names/ids ESI does not know are remembered for negative_ttl
+    def resolve_names(self, names_list):
+        from mcp_server_evefleet.IO.API_IO import bulk_name2id
+        names_list = list(dict.fromkeys(n.lower() for n in names_list))
+        data = bulk_name2id(names_list)
+        self.learn({e['name'].lower():int(e['id']) for e in data.get(self.name2id_key, [])})
+        expires = time.monotonic() + self.negative_ttl
+        self.misses.update({n: expires for n in names_list if n not in self.char_name2id})
+    def resolve_ids(self, ids_list):
+        from mcp_server_evefleet.IO.API_IO import bulk_id2name
+        ids_list = list(dict.fromkeys(ids_list))
+        data = bulk_id2name(ids_list)
+        self.learn({e['name'].lower():int(e['id']) for e in data if e['category']==self.id2name_key})
+        expires = time.monotonic() + self.negative_ttl
+        self.misses.update({i: expires for i in ids_list if i not in self.char_id2name})
+    #names reach char_name2id through save(): the store updates its map under the lock its flusher iterates with
+    def learn(self, new_name2id_dic):
+        if new_name2id_dic:
+            self.char_id2name.update({v:k for k,v in new_name2id_dic.items()})
+            self.save(new_name2id_dic)
+    #ids (int) and names (str) mixed, None where unknown; all misses cost one request per kind
+    def get_many(self, keys):
+        need_names = self.check_names([k for k in keys if isinstance(k, str)])
+        need_ids = self.check_ids([k for k in keys if not isinstance(k, str)])
+        if need_names:
+            self.name_batcher.wait_for([n.lower() for n in need_names])
+        if need_ids:
+            self.id_batcher.wait_for(need_ids)
+        return [self.char_name2id.get(k.lower(),None) if isinstance(k, str) else self.char_id2name.get(k,None) for k in keys]
     #update names
     def update_names(self,names_list):
-        need_list = self.check_names(names_list)
-        if need_list:
-            data = post_name2id(need_list)
-            new_name2id_dic = {e['name'].lower():int(e['id']) for e in data[self.name2id_key]}
-            new_id2name_dic = {v:k for k,v in new_name2id_dic.items()}
-            self.char_name2id.update(new_name2id_dic)
-            self.char_id2name.update(new_id2name_dic)
-            self.save()
-        return [self.char_name2id[name.lower()] for name in names_list]
+        #unknown names (typos, deleted pilots) are skipped instead of failing the whole list
+        return [i for i in self.get_many([str(n) for n in names_list]) if i is not None]
     #update ids
     def update_ids(self,ids_list):
-        need_list = self.check_ids(ids_list)
-        if need_list:
-            data = post_id2name(need_list)
-            new_id2name_dic = {int(e['id']):e['name'].lower() for e in data if e['category']==self.id2name_key}
-            new_name2id_dic = {v:k for k,v in new_id2name_dic.items()}
-            self.char_name2id.update(new_name2id_dic)
-            self.char_id2name.update(new_id2name_dic)
-            self.save()
-        return [self.char_id2name[id] for id in ids_list]
+        return [n for n in self.get_many([int(i) for i in ids_list]) if n is not None]
     #call
     def __call__(self, charidorname: int|str):
-        #api call if not exist in dict, not good
-        if isinstance(charidorname, int):
-            if charidorname not in self.char_id2name:
-                self.update_ids([charidorname])
-            output = self.char_id2name.get(charidorname,None)
-        else:
-            charidorname = charidorname.lower()
-            if charidorname not in self.char_name2id:
-                self.update_names([charidorname])
-            output = self.char_name2id.get(charidorname,None)
-        return output
+        #misses are batched with concurrent callers and remembered, see get_many
+        return self.get_many([charidorname])[0]
     
-    #save to yaml
-    def save(self):
-        with open(self.init_file,'w') as f:
-            yaml.dump(self.char_name2id,f)
+    #queue new names for the store's background flush
+    def save(self, new_name2id=None):
+        self.store.put_many(new_name2id or {})
+
+#dict-like lookup: entries learned at runtime over a read-only static store index
+class StoreBacked():
+    def __init__(self, lookup, learned=None) -> None:
+        self.lookup = lookup
+        self.learned = dict(learned or {})
+    def get(self, key, default=None):
+        if key in self.learned:
+            return self.learned[key]
+        try:
+            value = self.lookup(key)
+        except (TypeError, ValueError):
+            value = None
+        return default if value is None else value
+    def __contains__(self, key):
+        return self.get(key) is not None
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+    def update(self, other):
+        self.learned.update(other)
+    #learned entries only, the static part lives in the store
+    def items(self):
+        return self.learned.items()
+
+#names learned from ESI are kept in the user config dir, next to the char store journal
+def learned_names_path(init_file_name) -> Path:
+    return default_store_path().parent / Path(init_file_name).name
 
 #System Dict static name<->id
 class Static_Dict(CharID_Dict):
     def __init__(self,
                  init_file_name,name2id_key,id2name_key) -> None:
-        init_file = Path(init_file_name)
+        init_file = learned_names_path(init_file_name)
         self.name2id_key = name2id_key
         self.id2name_key = id2name_key
-        if init_file.exists():
-            with open(init_file) as file:
-                self.char_name2id = yaml.safe_load(file)
-            self.char_id2name = {v:k for k,v in self.char_name2id.items()}
-        else:
-            # Fallback: load defaults from packaged resource if available
-            try:
-                with resources.files('mcp_server_evefleet').joinpath(init_file_name).open('r') as file:
-                    self.char_name2id = yaml.safe_load(file) or {}
-                self.char_id2name = {v:k for k,v in self.char_name2id.items()}
-            except FileNotFoundError:
-                self.char_name2id = {}
-                self.char_id2name = {}
+        #init file only holds names learned from ESI, the static names come from the compiled store
+        #an older CWD-relative file is read until the first save moves its names over
+        source = init_file if init_file.exists() else Path(init_file_name)
+        learned = {}
+        if source.exists():
+            import yaml
+            with open(source, encoding='utf-8') as file:
+                learned = yaml.safe_load(file) or {}
+        store = get_static_store()
+        self.char_name2id = StoreBacked(lambda name: store.name2id(id2name_key, name), learned)
+        self.char_id2name = StoreBacked(lambda id: store.id2name(id2name_key, id), {v:k for k,v in learned.items()})
         self.init_file = init_file
+        self.setup_misses()
+    #own name map, updated here before save() writes it out
+    def learn(self, new_name2id_dic):
+        if new_name2id_dic:
+            self.char_name2id.update(new_name2id_dic)
+            super().learn(new_name2id_dic)
+    #save learned names to yaml
+    def save(self, new_name2id=None):
+        self.write_learned(dict(self.char_name2id.items()))
+    def write_learned(self, learned):
+        import yaml
+        self.init_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.init_file,'w', encoding='utf-8') as f:
+            yaml.dump(learned,f)
+
+#Solar system Dict: whole packaged index in memory, exact and prefix lookup without ESI
+class System_Dict(Static_Dict):
+    def __init__(self,
+                 init_file_name='setting/system_dict.yaml') -> None:
+        super().__init__(init_file_name,'systems','solar_system')
+        learned = dict(self.char_name2id.items())
+        self.char_name2id = dict(get_static_store().names(self.id2name_key))
+        self.static_names = set(self.char_name2id)
+        self.char_name2id.update(learned)
+        self.char_id2name = {v:k for k,v in self.char_name2id.items()}
+        self.sorted_names = sorted(self.char_name2id)
+    #names starting with text, case-insensitive, as (name, id)
+    def prefix(self, text: str, limit: int = 10):
+        text = text.strip().lower()
+        out = []
+        i = bisect_left(self.sorted_names, text)
+        while i < len(self.sorted_names) and self.sorted_names[i].startswith(text) and len(out) < limit:
+            out.append((self.sorted_names[i], self.char_name2id[self.sorted_names[i]]))
+            i += 1
+        return out
+    #exact name, else a unique prefix ("0-r5" -> 0-r5ts), else None
+    def match(self, text: str):
+        text = text.strip().lower()
+        if text in self.char_name2id:
+            return self.char_name2id[text]
+        found = self.prefix(text, limit=2)
+        return found[0][1] if len(found) == 1 else None
+    #id to name, None if unknown (no ESI call)
+    def name_of(self, system_id):
+        try:
+            return self.char_id2name.get(int(system_id))
+        except (TypeError, ValueError):
+            return None
+    #only names learned from ESI go to the init file
+    def save(self, new_name2id=None):
+        self.sorted_names = sorted(self.char_name2id)
+        self.write_learned({k:v for k,v in self.char_name2id.items() if k not in self.static_names})
 
 #Ship Dict
 class ShipID_Dict():
+    #composition bucket for type ids that are not resolved yet
+    UNKNOWN = 'Unknown'
     def __init__(self,
                  init_file_name='setting/shipid_list.csv') -> None:
         init_path = Path(init_file_name)
+        #guards the tables: add_rows runs on the resolve thread while lookups are served
+        self._lock = threading.RLock()
+        self._resolving = set()
+        #type ids ESI did not resolve, not asked again until the TTL runs out
+        self.negative_ttl = CONFIG.get('SHIP_NEGATIVE_TTL', 600)
+        self.misses = {}
+        #types learned in earlier runs stay in the universe store until a lookup misses
+        self._learned_loaded = False
+        self._learned_lock = threading.Lock()
         if init_path.exists():
             with open(init_path) as csvfile:
                 rows = csv.reader(csvfile)
                 self.update_ids(rows)
         else:
-            # Fallback: load from packaged resource
-            with resources.files('mcp_server_evefleet').joinpath(init_file_name).open('r') as csvfile:
-                rows = csv.reader(csvfile)
-                self.update_ids(rows)
+            # Default: packaged table from the compiled static store, no CSV parsing
+            self.update_ids([('typeID', 'groupID', 'typeName', 'groupName'), *get_static_store().ship_rows()])
     #update ids
     def update_ids(self,csv_rows):
-        self.ship_id2name, self.ship_name2id, self.ship_id2group, self.ship_name2group, self.group_id2name, self.name2group_id = {},{},{},{},{},{}
-        self.group_id2ship = defaultdict(list)
-        self.group_ids = set()
-        self.type_ids = set()
+        with self._lock:
+            self._load_rows(csv_rows)
+    def _load_rows(self,csv_rows):
+        #types and groups live in parallel arrays, addressed by a dense index
+        self.type_ids, self.type_groups, self.type_names = array('q'), array('l'), []
+        self.group_ids, self.group_names, self.group_labels, self.group_types = array('q'), [], [], []
+        self.type_index, self.type_key_index, self.group_index, self.group_key_index = {}, {}, {}, {}
         col_names = []
+        rows = []
         for row in csv_rows:
             if not col_names:
                 col_names = [n for n in row]
             else:
-                type_id = int(row[0])
-                group_id = int(row[1])
-                type_name = row[2]
-                group_name = row[3]
-                self.ship_id2name[type_id] = type_name
-                self.ship_name2id[type_name.lower()] = type_id
-                
-                self.ship_id2group[type_id] = group_id
-                self.ship_name2group[type_name.lower()] = group_name.lower()
-                self.group_id2ship[group_id].append(type_id)
-
-                self.group_id2name[group_id] = group_name
-                self.name2group_id[group_name.lower()] = group_id
-                self.group_ids.add(group_id)
-                self.type_ids.add(type_id)
+                rows.append(row)
         self.col_names = col_names
-        self.ship_names = [n for n in self.ship_name2id.keys()]
-        self.class_names = [n for n in self.group_id2ship.keys()] 
+        self.add_rows(rows)
+    #add (type_id, group_id, type_name, group_name) rows, known type ids are kept as they are
+    def add_rows(self, rows):
+        with self._lock:
+            self._add_rows(rows)
+    def _add_rows(self, rows):
+        for row in rows:
+            type_id = int(row[0])
+            group_id = int(row[1])
+            if type_id in self.type_index:
+                continue
+            g = self.group_index.get(group_id)
+            if g is None:
+                g = len(self.group_ids)
+                group_name = sys.intern(row[3])
+                self.group_ids.append(group_id)
+                self.group_names.append(group_name)
+                #display name precomputed once, "Assault frigate" style
+                self.group_labels.append(group_name.capitalize())
+                self.group_types.append(array('l'))
+                self.group_index[group_id] = g
+                self.group_key_index[group_name.lower()] = g
+            i = len(self.type_ids)
+            self.type_ids.append(type_id)
+            self.type_groups.append(g)
+            self.type_names.append(sys.intern(row[2]))
+            self.type_index[type_id] = i
+            self.type_key_index[row[2].lower()] = i
+            self.group_types[g].append(i)
+        self.ship_names = list(self.type_key_index)
+        self.class_names = list(self.group_ids)
+        self._payloads = {}
+    #types learned in earlier runs, kept in the universe store
+    def load_learned(self):
+        from mcp_server_evefleet.IO.universe_store import get_universe_store
+        store = get_universe_store()
+        types = store.items('type')
+        groups = store.get_many('group', list({int(t['group_id']) for t in types.values()}))
+        self.add_rows([(i, int(t['group_id']), t['name'], groups[int(t['group_id'])]['name'])
+                       for i, t in types.items() if int(t['group_id']) in groups])
+    #load them once, True when this call loaded (or waited for) them and a miss is worth retrying
+    def ensure_learned(self) -> bool:
+        if self._learned_loaded:
+            return False
+        with self._learned_lock:
+            if not self._learned_loaded:
+                try:
+                    self.load_learned()
+                except Exception as e:
+                    logger.warning(f"Learned ship types not loaded from the universe store: {e}")
+                self._learned_loaded = True
+        return True
+    #queue unknown type ids for one batched background lookup, returns the ids queued
+    def resolve_unknown(self, type_ids):
+        #types learned in an earlier run are not asked again
+        self.ensure_learned()
+        now = time.monotonic()
+        with self._lock:
+            unknown = [t for t in dict.fromkeys(int(i) for i in type_ids if i is not None)
+                       if t not in self.type_index and t not in self._resolving and self.misses.get(t, 0) < now]
+            if not unknown:
+                return []
+            self._resolving.update(unknown)
+        threading.Thread(target=self._resolve, args=(unknown,), name='ship-type-resolve', daemon=True).start()
+        return unknown
+    def _resolve(self, type_ids):
+        from mcp_server_evefleet.IO.API_IO import bulk_ship_types
+        try:
+            rows = bulk_ship_types(type_ids)
+            expires = time.monotonic() + self.negative_ttl
+            with self._lock:
+                self.add_rows(rows.values())
+                for t in type_ids:
+                    self.misses.pop(t, None)
+                self.misses.update({t: expires for t in type_ids if t not in rows})
+            logger.info(f"Learned {len(rows)}/{len(type_ids)} unknown ship types: {[r[2] for r in rows.values()]}")
+        except Exception as e:
+            logger.warning(f"Ship type lookup for {type_ids} failed, retried on next sighting: {e}")
+        finally:
+            with self._lock:
+                self._resolving.difference_update(type_ids)
+    #hot path lookups, UNKNOWN instead of raising
+    #a miss loads the learned types once and looks again
+    def name_of(self, type_id):
+        with self._lock:
+            i = self.type_index.get(int(type_id))
+            if i is not None:
+                return self.type_names[i]
+        return self.name_of(type_id) if self.ensure_learned() else self.UNKNOWN
+    def groupname_of(self, type_id):
+        with self._lock:
+            i = self.type_index.get(int(type_id))
+            if i is not None:
+                return self.group_labels[self.type_groups[i]]
+        return self.groupname_of(type_id) if self.ensure_learned() else self.UNKNOWN
+    #(type name, raw group name) by type id or name, None if unknown
+    def ship_of(self, idorname: int|str):
+        with self._lock:
+            i = self.type_index.get(int(idorname)) if str(idorname).isdigit() else self.type_key_index.get(str(idorname).lower())
+            if i is not None:
+                return (self.type_names[i], self.group_names[self.type_groups[i]])
+        return self.ship_of(idorname) if self.ensure_learned() else None
+    #ship:// resource text, serialized once per table version
+    def payload(self, kind: str):
+        #listings include the learned types
+        self.ensure_learned()
+        with self._lock:
+            return self._payload(kind)
+    def _payload(self, kind: str):
+        payloads = self._payloads
+        if kind not in payloads:
+            if kind == 'types':
+                payloads[kind] = f"Ship Types: {self.ship_names}"
+            elif kind == 'groups':
+                payloads[kind] = f"Ship Groups: {self.class_names}"
+            elif kind == 'types2groups':
+                gp_dict = {name: self.group_labels[self.type_groups[i]] for name, i in self.type_key_index.items()}
+                payloads[kind] = f"Ship Types to Groups Dict: {gp_dict}"
+            else:
+                raise ValueError(f"Unknown ship payload '{kind}'")
+        return payloads[kind]
     #call
     def __call__(self, idorname: int|str):
         #auto transform
         if isinstance(idorname, int) or idorname.isdigit():
             idorname = int(idorname)
-        #api call if not exist in dict, not good
-        if idorname in self.ship_id2name:
-            output = self.ship_id2name.get(idorname,None)
-        elif isinstance(idorname, str) and idorname.lower() in self.ship_name2id:
-            output = self.ship_name2id.get(idorname.lower(),None)
-        elif idorname in self.group_id2name:
-            output = self.group_id2name.get(idorname,None)
-        elif isinstance(idorname, str) and idorname.lower() in self.name2group_id:
-            output = self.name2group_id.get(idorname.lower(),None)
-        else:
+        with self._lock:
+            if idorname in self.type_index:
+                output = self.type_names[self.type_index[idorname]]
+            elif isinstance(idorname, str) and idorname.lower() in self.type_key_index:
+                output = self.type_ids[self.type_key_index[idorname.lower()]]
+            elif idorname in self.group_index:
+                output = self.group_names[self.group_index[idorname]]
+            elif isinstance(idorname, str) and idorname.lower() in self.group_key_index:
+                output = self.group_ids[self.group_key_index[idorname.lower()]]
+            else:
+                output = None
+        if output is None:
+            if self.ensure_learned():
+                return self(idorname)
             raise ValueError(f"Ship id/name '{idorname}' not found in dictionary.")
         return output
     #type to group
     def typeid_to_groupid(self, type_id: int|str):
         if isinstance(type_id, int) or type_id.isdigit():
             type_id = int(type_id)
-        return self.ship_id2group.get(type_id,None)
+        with self._lock:
+            i = self.type_index.get(type_id)
+            if i is not None:
+                return self.group_ids[self.type_groups[i]]
+        return self.typeid_to_groupid(type_id) if self.ensure_learned() else None
     #group to type
     def groupid_to_typeids(self, group_id: int|str):
         if isinstance(group_id, int) or group_id.isdigit():
             group_id = int(group_id)
-        return self.group_id2ship.get(group_id,[])
+        with self._lock:
+            g = self.group_index.get(group_id)
+            return [] if g is None else [self.type_ids[i] for i in self.group_types[g]]
     #type to group name
     def type_to_groupname(self, type_name: str):
-        # Convert to lowercase for lookup, then capitalize first letter of result
-        result = self.ship_name2group.get(type_name.lower(), None)
-        return result.capitalize() if result else None
+        with self._lock:
+            i = self.type_key_index.get(type_name.lower())
+            if i is not None:
+                return self.group_labels[self.type_groups[i]]
+        return self.type_to_groupname(type_name) if self.ensure_learned() else None
     #types to group name
     def type_to_groupnames(self, type_names: list[str]):
-        # Convert to lowercase for lookup, then capitalize first letter of result
-        results = [self.ship_name2group.get(name.lower(), None) for name in type_names]
-        return [result.capitalize() for result in results if result]
+        with self._lock:
+            results = [self.type_key_index.get(name.lower()) for name in type_names]
+            return [self.group_labels[self.type_groups[i]] for i in results if i is not None]
     #group to type name
     def group_to_typenames(self, group_name: str):
-        return [self.ship_id2name[n] for n in self.group_id2ship.get(self.name2group_id.get(group_name.lower(),None),[])]
+        with self._lock:
+            g = self.group_key_index.get(group_name.lower())
+            return [] if g is None else [self.type_names[i] for i in self.group_types[g]]
 
 #test main
 if __name__ == '__main__':
@@ -0,0 +1,273 @@
+"""_summary_
+Compiled static data: setting/shipid_list.csv, system.yaml and static.yaml packed into one indexed SQLite file
+
+    python -m mcp_server_evefleet.static_store build   # rewrite setting/static.sqlite3 from the setting sources
+    python -m mcp_server_evefleet.static_store check   # exit 1 when the artifact is older than its sources
+
+The artifact ships with the wheel and is opened read-only and memory-mapped, so load time and
+process memory do not grow with the dataset: lookups read the pages they touch, nothing is parsed.
+"""
+#import
+import sys
+import csv
+import json
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+from pathlib import Path
+from contextlib import ExitStack
+from importlib import resources
+from platformdirs import user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "mcp_server_evefleet"
+APP_AUTHOR = "mcp_server_evefleet"
+STORE_FILE = 'static.sqlite3'
+#bump when the schema changes, older artifacts are rebuilt
+FORMAT_VERSION = '2'
+SOURCES = ('shipid_list.csv', 'system.yaml', 'static.yaml')
+#upper bound for the read-only mapping, only touched pages are resident
+MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = (
+    'CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID',
+    'CREATE TABLE ship_type ('
+    ' type_id INTEGER PRIMARY KEY, group_id INTEGER NOT NULL, type_name TEXT NOT NULL, group_name TEXT NOT NULL,'
+    ' type_key TEXT NOT NULL, group_key TEXT NOT NULL)',
+    'CREATE INDEX ship_type_by_name ON ship_type (type_key)',
+    'CREATE INDEX ship_type_by_group ON ship_type (group_id)',
+    'CREATE TABLE name_index (kind TEXT NOT NULL, name TEXT NOT NULL, id INTEGER NOT NULL,'
+    ' PRIMARY KEY (kind, name)) WITHOUT ROWID',
+    'CREATE INDEX name_index_by_id ON name_index (kind, id)',
+    'CREATE TABLE universe (kind TEXT NOT NULL, id INTEGER NOT NULL, data TEXT NOT NULL,'
+    ' PRIMARY KEY (kind, id)) WITHOUT ROWID',
+    #stargate graph, complete = every stargate of the system is in the data
+    'CREATE TABLE solar_system (system_id INTEGER PRIMARY KEY, security_status REAL NOT NULL, complete INTEGER NOT NULL)',
+    'CREATE TABLE stargate_edge (stargate_id INTEGER PRIMARY KEY, system_id INTEGER NOT NULL, destination_id INTEGER NOT NULL)',
+)
+
+def setting_dir() -> Path:
+    """setting/ of the source tree, the build step writes next to its inputs"""
+    return Path(__file__).resolve().parent / 'setting'
+
+def source_digests(src_dir) -> dict:
+    digests = {}
+    for name in SOURCES:
+        path = Path(src_dir) / name
+        digests[name] = hashlib.sha256(path.read_bytes()).hexdigest() if path.exists() else ''
+    return digests
+
+def load_ship_rows(src_dir=None):
+    """(type_id, group_id, type_name, group_name) rows of shipid_list.csv"""
+    with open(Path(src_dir or setting_dir()) / 'shipid_list.csv', 'r', encoding='utf-8', newline='') as f:
+        return [(int(row['typeID']), int(row['groupID']), row['typeName'], row['groupName']) for row in csv.DictReader(f)]
+
+def build_static_store(out_path=None, src_dir=None) -> Path:
+    """Compile the setting sources into `out_path` (default setting/static.sqlite3), replaced atomically"""
+    import yaml
+    from mcp_server_evefleet.config_load import SafeLoader
+    src_dir = Path(src_dir or setting_dir())
+
+    def load_yaml(name):
+        path = src_dir / name
+        if not path.exists():
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.load(f, Loader=SafeLoader) or {}
+
+    names = {str(k).lower(): int(v) for k, v in load_yaml('system.yaml').items()}
+    meta = {f'sha256:{k}': v for k, v in source_digests(src_dir).items()}
+    return write_static_store(out_path or src_dir / STORE_FILE, load_ship_rows(src_dir), names, load_yaml('static.yaml'), meta)
+
+def write_static_store(out_path, ships, names, static, meta=None) -> Path:
+    """Write a store from ship rows, {system name: id} and universe data in static.yaml shape ({kind: {id: data}})"""
+    out_path = Path(out_path)
+    tmp_path = out_path.with_suffix('.tmp')
+    tmp_path.unlink(missing_ok=True)
+    names = dict(names)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.executemany('INSERT INTO ship_type VALUES (?, ?, ?, ?, ?, ?)',
+                         [(*row, row[2].lower(), row[3].lower()) for row in ships])
+        #names of systems only present in the universe data
+        for system_id, system in (static.get('system') or {}).items():
+            if system.get('name'):
+                names.setdefault(system['name'].lower(), int(system_id))
+        conn.executemany('INSERT INTO name_index VALUES (?, ?, ?)',
+                         [('solar_system', name, system_id) for name, system_id in names.items()])
+        for kind, items in static.items():
+            conn.executemany('INSERT INTO universe VALUES (?, ?, ?)',
+                             [(kind, int(k), json.dumps(v, separators=(',', ':'))) for k, v in (items or {}).items()])
+        stargates = {int(k): v for k, v in (static.get('stargate') or {}).items()}
+        conn.executemany('INSERT INTO stargate_edge VALUES (?, ?, ?)',
+                         [(k, int(v['system_id']), int(v['destination']['system_id']))
+                          for k, v in stargates.items() if (v.get('destination') or {}).get('system_id')])
+        conn.executemany('INSERT INTO solar_system VALUES (?, ?, ?)',
+                         [(int(k), float(v.get('security_status', 0.0)), all(int(g) in stargates for g in v.get('stargates') or []))
+                          for k, v in (static.get('system') or {}).items()])
+        conn.executemany('INSERT INTO meta VALUES (?, ?)', {**(meta or {}), 'format': FORMAT_VERSION}.items())
+        conn.commit()
+        conn.execute('VACUUM')
+    finally:
+        conn.close()
+    tmp_path.replace(out_path)
+    logger.info(f"static store built: {out_path} ({out_path.stat().st_size} bytes, {len(ships)} ship types, {len(names)} system names)")
+    return out_path
+
+def _read_meta(path) -> dict:
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        return dict(conn.execute('SELECT key, value FROM meta').fetchall())
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+
+def is_stale(path, src_dir=None) -> bool:
+    """True when `path` is missing, from another format version or built from different sources"""
+    path = Path(path)
+    if not path.exists():
+        return True
+    meta = _read_meta(path)
+    if meta.get('format') != FORMAT_VERSION:
+        return True
+    return any(meta.get(f'sha256:{k}') != v for k, v in source_digests(src_dir or setting_dir()).items())
+
+class StaticStore():
+    """Read-only view of the compiled static data.
+
+    The file is opened immutable and memory-mapped; every lookup is an indexed
+    query, so opening costs the same whatever the size of the dataset.
+
+    Args:
+        path (str|Path): Compiled artifact, see build_static_store
+    """
+    def __init__(self, path) -> None:
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "miss": 0}
+        self._conn = sqlite3.connect(f'file:{Path(self.path).as_posix()}?mode=ro&immutable=1', uri=True,
+                                     check_same_thread=False)
+        self._conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+        meta = dict(self._conn.execute('SELECT key, value FROM meta').fetchall())
+        if meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f"static store {self.path} has format {meta.get('format')!r}, expected {FORMAT_VERSION!r}")
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    #ship table, rows in shipid_list.csv column order
+    def ship_rows(self):
+        return self._query('SELECT type_id, group_id, type_name, group_name FROM ship_type ORDER BY rowid')
+
+    #name index
+    def name2id(self, kind, name):
+        rows = self._query('SELECT id FROM name_index WHERE kind = ? AND name = ?', (kind, str(name).lower()))
+        return self._count(rows[0][0] if rows else None)
+
+    def id2name(self, kind, item_id):
+        rows = self._query('SELECT name FROM name_index WHERE kind = ? AND id = ? LIMIT 1', (kind, int(item_id)))
+        return self._count(rows[0][0] if rows else None)
+
+    #every (name, id) of a kind, sorted by name (primary key order)
+    def names(self, kind):
+        return self._query('SELECT name, id FROM name_index WHERE kind = ? ORDER BY name', (kind,))
+
+    def name_count(self, kind):
+        return self._query('SELECT COUNT(*) FROM name_index WHERE kind = ?', (kind,))[0][0]
+
+    #stargate graph
+    def solar_systems(self):
+        return self._query('SELECT system_id, security_status, complete FROM solar_system')
+
+    def stargate_edges(self):
+        return self._query('SELECT system_id, destination_id FROM stargate_edge')
+
+    #universe data in ESI response shape, {id: data} for the ids present
+    def universe_many(self, kind, item_ids):
+        item_ids = list(dict.fromkeys(int(i) for i in item_ids))
+        found = {}
+        for i in range(0, len(item_ids), 500):
+            chunk = item_ids[i:i + 500]
+            rows = self._query(f'SELECT id, data FROM universe WHERE kind = ? AND id IN ({",".join("?" * len(chunk))})',
+                               (kind, *chunk))
+            found.update((item_id, json.loads(data)) for item_id, data in rows)
+        with self._lock:
+            self._stats["hit"] += len(found)
+            self._stats["miss"] += len(item_ids) - len(found)
+        return found
+
+    #every row of a kind, {id: data}
+    def universe_all(self, kind):
+        return {item_id: json.loads(data) for item_id, data in self._query('SELECT id, data FROM universe WHERE kind = ?', (kind,))}
+
+    def _count(self, value):
+        with self._lock:
+            self._stats["hit" if value is not None else "miss"] += 1
+        return value
+
+    def stats(self):
+        return {"path": self.path, **self._stats}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+#shared store
+_store = None
+_store_lock = threading.Lock()
+_resources = ExitStack()
+
+def _open_store() -> StaticStore:
+    from mcp_server_evefleet.config_load import CONFIG
+    #a crawled store (see universe_crawler) replaces the packaged one
+    override = CONFIG.get('STATIC_STORE_PATH')
+    if override and Path(override).exists():
+        try:
+            return StaticStore(override)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"static store {override} unusable ({e}), using the packaged one")
+    path = _resources.enter_context(resources.as_file(resources.files('mcp_server_evefleet').joinpath('setting', STORE_FILE)))
+    try:
+        return StaticStore(path)
+    except (sqlite3.Error, ValueError) as e:
+        #artifact missing or from an older build: compile the packaged sources into the user cache
+        cache_path = Path(user_cache_dir(APP_NAME, APP_AUTHOR)) / STORE_FILE
+        logger.warning(f"packaged static store unusable ({e}), using {cache_path}")
+        if is_stale(cache_path, path.parent):
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            build_static_store(cache_path, path.parent)
+        return StaticStore(cache_path)
+
+def get_static_store() -> StaticStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _open_store()
+    return _store
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile setting/* into the packaged static store')
+    parser.add_argument('command', choices=['build', 'check'])
+    parser.add_argument('--out', default=None, help='artifact path (default setting/static.sqlite3)')
+    args = parser.parse_args()
+    out_path = Path(args.out) if args.out else setting_dir() / STORE_FILE
+    if args.command == 'build':
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+        build_static_store(out_path)
+        return 0
+    if is_stale(out_path):
+        print(f"{out_path} is out of date, run: python -m mcp_server_evefleet.static_store build")
+        return 1
+    print(f"{out_path} is up to date")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
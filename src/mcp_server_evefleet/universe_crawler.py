@@ -0,0 +1,237 @@
+"""_summary_
+Universe crawler: every solar system, stargate and station from ESI into a compiled static store
+
+    python -m mcp_server_evefleet.universe_crawler              # crawl (or resume an interrupted crawl) and write the store
+    python -m mcp_server_evefleet.universe_crawler --restart    # start a new pass even if the last one did not finish
+
+Progress is checkpointed in SQLite with the ETag of every item, so an interrupted crawl resumes where it
+stopped and a later pass sends If-None-Match for everything: unchanged items cost a 304 and no body.
+Point STATIC_STORE_PATH at the output to serve the crawled data instead of the packaged slice.
+"""
+#import
+import sys
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from platformdirs import user_cache_dir
+
+from mcp_server_evefleet.config_load import CONFIG
+from mcp_server_evefleet.static_store import load_ship_rows, write_static_store
+from mcp_server_evefleet.IO.esi_client import get_esi_client
+from mcp_server_evefleet.IO.API_IO import UNIVERSE_PATHS
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "mcp_server_evefleet"
+APP_AUTHOR = "mcp_server_evefleet"
+SYSTEM_LIST_PATH = 'universe/systems/?datasource=tranquility'
+#results written to the checkpoint per transaction, at most this many lookups repeat after a kill
+CHECKPOINT_EVERY = 200
+CRAWL_KINDS = ('system', 'stargate', 'station')
+#data of an item ESI answered 404 for, kept so later runs do not ask again
+TOMBSTONE = 'null'
+
+def default_checkpoint_path() -> Path:
+    return Path(user_cache_dir(APP_NAME, APP_AUTHOR)) / 'universe_crawl.sqlite3'
+
+def default_output_path() -> Path:
+    return Path(CONFIG.get('STATIC_STORE_PATH') or Path(user_cache_dir(APP_NAME, APP_AUTHOR)) / 'universe_static.sqlite3')
+
+class CrawlCheckpoint():
+    """Crawled items with their ETag and the pass that last confirmed them.
+
+    A pass is `running` until every item was fetched or revalidated; starting
+    the crawler again while a pass is running continues it, skipping items
+    already confirmed in that pass. Items ESI answered 404 for are kept as
+    tombstones and never looked up again while something still references them.
+
+    Args:
+        path (str|Path): SQLite file
+    """
+    def __init__(self, path=None) -> None:
+        self.path = Path(path or default_checkpoint_path())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS item (kind TEXT NOT NULL, id INTEGER NOT NULL, etag TEXT,'
+                           ' data TEXT NOT NULL, pass INTEGER NOT NULL, PRIMARY KEY (kind, id)) WITHOUT ROWID')
+        self._conn.commit()
+        self.current = int(self.meta('pass') or 0)
+
+    def meta(self, key):
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, **values):
+        self._conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', [(k, str(v)) for k, v in values.items()])
+        self._conn.commit()
+
+    def begin(self, restart=False) -> int:
+        """Pass to work on: the unfinished one, else (or with restart) a new one"""
+        if restart or self.meta('state') != 'running':
+            self.current += 1
+            self._set_meta(**{'pass': self.current, 'state': 'running', 'started_at': time.time()})
+        return self.current
+
+    def finish(self):
+        self._set_meta(state='complete', finished_at=time.time())
+
+    def pending(self, kind, item_ids):
+        """item_ids not yet confirmed in the current pass nor tombstoned, with their stored ETag (None if never fetched)"""
+        known = dict(self._conn.execute('SELECT id, etag FROM item WHERE kind = ? AND (pass = ? OR data = ?)',
+                                        (kind, self.current, TOMBSTONE)).fetchall())
+        etags = dict(self._conn.execute('SELECT id, etag FROM item WHERE kind = ?', (kind,)).fetchall())
+        return {i: etags.get(i) for i in item_ids if i not in known}
+
+    def record(self, results):
+        """Apply (kind, id, etag, data) results in one transaction, data None = unchanged (304)"""
+        with self._conn:
+            self._conn.executemany('UPDATE item SET pass = ? WHERE kind = ? AND id = ?',
+                                   [(self.current, kind, i) for kind, i, _, data in results if data is None])
+            self._conn.executemany('INSERT OR REPLACE INTO item VALUES (?, ?, ?, ?, ?)',
+                                   [(kind, i, etag, json.dumps(data, separators=(',', ':')), self.current)
+                                    for kind, i, etag, data in results if data is not None])
+
+    def tombstone(self, kind, item_ids):
+        """Mark items ESI answered 404 for, they drop out of items() and pending()"""
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO item VALUES (?, ?, NULL, ?, ?)',
+                                   [(kind, i, TOMBSTONE, self.current) for i in item_ids])
+
+    def prune(self, kind, keep_ids):
+        """Drop items of `kind` that are no longer referenced (removed from the universe)"""
+        keep_ids = set(keep_ids)
+        stale = [(kind, i) for (i,) in self._conn.execute('SELECT id FROM item WHERE kind = ?', (kind,)) if i not in keep_ids]
+        with self._conn:
+            self._conn.executemany('DELETE FROM item WHERE kind = ? AND id = ?', stale)
+        return len(stale)
+
+    def items(self, kind):
+        return {i: json.loads(data) for i, data in self._conn.execute('SELECT id, data FROM item WHERE kind = ? AND data != ?',
+                                                                      (kind, TOMBSTONE))}
+
+    def close(self):
+        self._conn.close()
+
+class UniverseCrawler():
+    """Walks the ESI system list, then the stargates and stations of every system.
+
+    Lookups go through the shared ESI client (error-limit governor, retries,
+    circuit breaker) with at most `concurrency` in flight, each a conditional
+    GET when the checkpoint has an ETag for it. Items ESI answers 404 for are
+    tombstoned; other failures stay pending so the next run retries only them.
+
+    Args:
+        checkpoint (CrawlCheckpoint): Progress and ETags
+        concurrency (int): Max in-flight requests, keep it <= ESI_POOL_SIZE
+    """
+    def __init__(self, checkpoint: CrawlCheckpoint, concurrency=None) -> None:
+        self.checkpoint = checkpoint
+        self.concurrency = max(int(concurrency or CONFIG.get('ESI_READ_CONCURRENCY', 20)), 1)
+        self.stats = {kind: {"fetched": 0, "unchanged": 0, "removed": 0, "failed": 0} for kind in ('list', *CRAWL_KINDS)}
+
+    async def _get(self, session, path, etag):
+        """(status, etag, data) of a conditional GET, data None on 304"""
+        esi = get_esi_client()
+        status, headers, data = await esi.arequest('GET', esi.url(path), headers={'If-None-Match': etag} if etag else None,
+                                                   session=session)
+        return status, headers.get('ETag'), data
+
+    async def _fetch_kind(self, session, kind, item_ids):
+        pending = self.checkpoint.pending(kind, item_ids)
+        stats = self.stats[kind]
+        buffer, gone = [], []
+        todo = iter(pending.items())
+        async def worker():
+            for item_id, etag in todo:
+                try:
+                    status, new_etag, data = await self._get(session, UNIVERSE_PATHS[kind].format(item_id), etag)
+                except Exception as e:
+                    if getattr(e, 'status', None) == 404:
+                        stats["removed"] += 1
+                        gone.append(item_id)
+                    else:
+                        stats["failed"] += 1
+                        logger.warning(f"{kind} {item_id} failed: {e!r}")
+                    continue
+                stats["unchanged" if status == 304 else "fetched"] += 1
+                buffer.append((kind, item_id, new_etag or etag, None if status == 304 else data))
+                if len(buffer) >= CHECKPOINT_EVERY:
+                    self.checkpoint.record(buffer)
+                    buffer.clear()
+        try:
+            await asyncio.gather(*[worker() for _ in range(min(self.concurrency, max(len(pending), 1)))])
+        finally:
+            self.checkpoint.record(buffer)
+            self.checkpoint.tombstone(kind, gone)
+        logger.info(f"{kind}: {len(item_ids)} known, {len(pending)} looked up this run, {stats}")
+
+    async def _system_ids(self, session):
+        """Current ESI system list, the checkpointed one when ESI answers 304"""
+        pending = self.checkpoint.pending('list', [0])
+        if 0 in pending:
+            etag = pending[0]
+            status, new_etag, data = await self._get(session, SYSTEM_LIST_PATH, etag)
+            self.stats['list']["unchanged" if status == 304 else "fetched"] += 1
+            self.checkpoint.record([('list', 0, new_etag or etag, None if status == 304 else data)])
+        return self.checkpoint.items('list')[0]
+
+    async def crawl(self, restart=False) -> bool:
+        """One pass over the universe, True when every item is confirmed"""
+        started = time.monotonic()
+        checkpoint = self.checkpoint
+        crawl_pass = checkpoint.begin(restart)
+        logger.info(f"crawl pass {crawl_pass} into {checkpoint.path}, concurrency {self.concurrency}")
+        session = await get_esi_client().async_session()
+        system_ids = [int(i) for i in await self._system_ids(session)]
+        self.stats['system']["removed"] += checkpoint.prune('system', system_ids)
+        await self._fetch_kind(session, 'system', system_ids)
+        systems = checkpoint.items('system')
+        for kind, field in (('stargate', 'stargates'), ('station', 'stations')):
+            item_ids = list(dict.fromkeys(int(i) for system in systems.values() for i in system.get(field) or []))
+            self.stats[kind]["removed"] += checkpoint.prune(kind, item_ids)
+            await self._fetch_kind(session, kind, item_ids)
+        complete = not any(stats["failed"] for stats in self.stats.values())
+        if complete:
+            checkpoint.finish()
+        logger.info(f"crawl pass {crawl_pass} {'complete' if complete else 'incomplete'} in {time.monotonic() - started:.1f}s")
+        return complete
+
+    def write_store(self, out_path=None) -> Path:
+        """Compile the checkpointed universe with the packaged ship table into `out_path`"""
+        out_path = Path(out_path or default_output_path())
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        static = {kind: self.checkpoint.items(kind) for kind in CRAWL_KINDS}
+        meta = {'source': 'crawl', 'crawl_pass': str(self.checkpoint.current), 'crawled_at': str(time.time())}
+        return write_static_store(out_path, load_ship_rows(), {}, static, meta)
+
+def main():
+    parser = argparse.ArgumentParser(description='Crawl the universe from ESI into a compiled static store')
+    parser.add_argument('--out', default=None, help='store path (default STATIC_STORE_PATH, else the user cache dir)')
+    parser.add_argument('--checkpoint', default=None, help='checkpoint path (default in the user cache dir)')
+    parser.add_argument('--concurrency', type=int, default=None, help='max in-flight requests (default ESI_READ_CONCURRENCY)')
+    parser.add_argument('--restart', action='store_true', help='start a new pass even if the last one did not finish')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    checkpoint = CrawlCheckpoint(args.checkpoint)
+    crawler = UniverseCrawler(checkpoint, args.concurrency)
+    try:
+        complete = get_esi_client().run(crawler.crawl(restart=args.restart))
+    except KeyboardInterrupt:
+        print(f"interrupted, run again to resume pass {checkpoint.current}")
+        return 130
+    if not complete:
+        print(f"some lookups failed, run again to retry them (pass {checkpoint.current})")
+        return 1
+    out_path = crawler.write_store(args.out)
+    if not CONFIG.get('STATIC_STORE_PATH'):
+        print(f"set STATIC_STORE_PATH: \"{out_path.as_posix()}\" in config.yaml to use it")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
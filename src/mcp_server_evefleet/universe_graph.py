@@ -0,0 +1,155 @@
+"""_summary_
+Stargate graph from the compiled static store and an in-process router with ESI's route semantics
+"""
+#import
+import heapq
+import threading
+from array import array
+from collections import deque
+
+from mcp_server_evefleet.static_store import get_static_store
+
+ROUTE_FLAGS = ('shortest', 'secure', 'insecure')
+#same weights as ESI: a jump into a non-preferred system costs this many preferred jumps
+AVOID_PENALTY = 50000
+HIGHSEC = 0.45
+
+class StargateGraph():
+    """Undirected stargate graph in CSR form.
+
+    Systems get a dense index; the gates of system i are
+    `neighbours[offsets[i]:offsets[i + 1]]`. Systems only seen as a gate
+    destination (outside the packaged data) are nodes without known gates.
+
+    A route is only returned when it is provably shortest (same jump
+    count/penalty cost as ESI's route): if the search has to expand a system
+    whose gates are not all known before it reaches the destination, a shorter
+    path might exist outside the data and route() returns None so the caller
+    can ask ESI.
+
+    Args:
+        systems: (system_id, security_status, complete) rows
+        edges: (system_id, destination_id) rows, one per stargate
+    """
+    def __init__(self, systems, edges) -> None:
+        self.index = {}
+        self.system_ids = array('q')
+        security, complete = {}, {}
+        for system_id, security_status, is_complete in systems:
+            security[system_id], complete[system_id] = security_status, bool(is_complete)
+            self._node(system_id)
+        links = set()
+        for a, b in edges:
+            i, j = self._node(a), self._node(b)
+            if i != j:
+                links.add((i, j))
+                links.add((j, i))
+        n = len(self.system_ids)
+        #systems without data count as low security and incomplete
+        self.security = array('d', (security.get(s, -1.0) for s in self.system_ids))
+        self.complete = bytearray(complete.get(s, False) for s in self.system_ids)
+        self.offsets = array('l', [0] * (n + 1))
+        for i, _ in links:
+            self.offsets[i + 1] += 1
+        for i in range(n):
+            self.offsets[i + 1] += self.offsets[i]
+        self.neighbours = array('l', [0] * len(links))
+        fill = array('l', self.offsets[:n])
+        for i, j in sorted(links):
+            self.neighbours[fill[i]] = j
+            fill[i] += 1
+        self._costs = {
+            'secure': array('l', (1 if s >= HIGHSEC else AVOID_PENALTY for s in self.security)),
+            'insecure': array('l', (AVOID_PENALTY if s >= HIGHSEC else 1 for s in self.security)),
+        }
+        self._stats = {"local": 0, "unresolved": 0}
+
+    def _node(self, system_id):
+        system_id = int(system_id)
+        i = self.index.get(system_id)
+        if i is None:
+            i = self.index[system_id] = len(self.system_ids)
+            self.system_ids.append(system_id)
+        return i
+
+    def __contains__(self, system_id):
+        return system_id in self.index
+
+    def gates(self, system_id):
+        """System ids one jump from `system_id`"""
+        i = self.index[int(system_id)]
+        return [self.system_ids[j] for j in self.neighbours[self.offsets[i]:self.offsets[i + 1]]]
+
+    def route(self, origin_id, destination_id, flag='shortest', avoid=()):
+        """System ids from origin to destination inclusive, like ESI's GET /route/, None if not decidable locally"""
+        assert flag in ROUTE_FLAGS
+        src, dst = self.index.get(int(origin_id)), self.index.get(int(destination_id))
+        if src is None or dst is None:
+            self._stats["unresolved"] += 1
+            return None
+        blocked = {self.index[int(a)] for a in avoid if int(a) in self.index} - {dst}
+        prev = self._bfs(src, dst, blocked) if flag == 'shortest' else self._dijkstra(src, dst, blocked, self._costs[flag])
+        if prev is None:
+            self._stats["unresolved"] += 1
+            return None
+        path = [dst]
+        while path[-1] != src:
+            path.append(prev[path[-1]])
+        self._stats["local"] += 1
+        return [self.system_ids[i] for i in reversed(path)]
+
+    def _bfs(self, src, dst, blocked):
+        prev = {src: src}
+        if src == dst:
+            return prev
+        frontier = deque([src])
+        while frontier:
+            node = frontier.popleft()
+            if not self.complete[node]:
+                return None
+            for j in self.neighbours[self.offsets[node]:self.offsets[node + 1]]:
+                if j not in prev and j not in blocked:
+                    prev[j] = node
+                    #found from the closest layer, unexpanded systems of that layer cannot make it shorter
+                    if j == dst:
+                        return prev
+                    frontier.append(j)
+        return None
+
+    def _dijkstra(self, src, dst, blocked, cost):
+        best = {src: 0}
+        prev = {src: src}
+        heap = [(0, src)]
+        while heap:
+            dist, node = heapq.heappop(heap)
+            if node == dst:
+                return prev
+            if dist > best[node]:
+                continue
+            if not self.complete[node]:
+                return None
+            for j in self.neighbours[self.offsets[node]:self.offsets[node + 1]]:
+                if j in blocked:
+                    continue
+                new_dist = dist + cost[j]
+                if new_dist < best.get(j, new_dist + 1):
+                    best[j] = new_dist
+                    prev[j] = node
+                    heapq.heappush(heap, (new_dist, j))
+        return None
+
+    def stats(self):
+        return {"systems": len(self.system_ids), "gates": len(self.neighbours) // 2, **self._stats}
+
+#shared graph
+_graph = None
+_graph_lock = threading.Lock()
+
+def get_stargate_graph() -> StargateGraph:
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                store = get_static_store()
+                _graph = StargateGraph(store.solar_systems(), store.stargate_edges())
+    return _graph
@@ -0,0 +1,27 @@
+"""_summary_
+Shared fixtures: an in-process ESI emulator and a fresh ESIClient pointed at it
+"""
+#import
+import pytest
+
+from mcp_server_evefleet.IO.esi_emulator import ESIEmulator
+from mcp_server_evefleet.IO.esi_client import ESIClient
+from mcp_server_evefleet.IO.esi_retry import RetryPolicies, CircuitBreaker
+
+#retries fast enough for a test run, breaker trips after a few failures
+TEST_RETRY = dict(max_attempts=4, base_delay=0.01, max_delay=0.02)
+TEST_BREAKER = dict(threshold=3, cooldown=0.2)
+
+@pytest.fixture
+def emulator():
+    emu = ESIEmulator(members=10, seed=1)
+    emu.base_url = emu.start_in_thread()
+    yield emu
+    emu.stop()
+
+@pytest.fixture
+def client(emulator):
+    esi = ESIClient(base_url=emulator.base_url, pool_size=8, timeout=5,
+                    retry_policies=RetryPolicies(**TEST_RETRY), breaker=CircuitBreaker(**TEST_BREAKER))
+    yield esi
+    esi.close()
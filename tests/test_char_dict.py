@@ -0,0 +1,106 @@
+"""_summary_
+CharID_Dict misses: concurrent lookups share one bulk request, unknown names are remembered, failures reach every caller; learned system names persist
+"""
+#import
+import time
+import threading
+
+import pytest
+
+from mcp_server_evefleet import static_manage
+from mcp_server_evefleet.IO import API_IO
+from mcp_server_evefleet.IO.char_store import CharStore
+from mcp_server_evefleet.static_manage import CharID_Dict, MissBatcher
+
+KNOWN = {"fc one": 1001, "logi two": 1002, "dps three": 1003}
+
+class FakeNames():
+    """Stands in for bulk_name2id, slow enough for callers to overlap"""
+    def __init__(self, delay=0.05) -> None:
+        self.delay = delay
+        self.calls = []
+        self.error = None
+    def __call__(self, names_list):
+        self.calls.append(sorted(names_list))
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"characters": [{"name": n.title(), "id": KNOWN[n]} for n in names_list if n in KNOWN]}
+
+@pytest.fixture
+def fake_names(monkeypatch):
+    fake = FakeNames()
+    monkeypatch.setattr(API_IO, 'bulk_name2id', fake)
+    return fake
+
+@pytest.fixture
+def chars(tmp_path, monkeypatch, fake_names):
+    store = CharStore(tmp_path / "chardict.jsonl", flush_interval=60)
+    monkeypatch.setattr(static_manage, 'get_char_store', lambda init_file_name: store)
+    yield CharID_Dict()
+    store.close()
+
+def lookup_concurrently(chars, names):
+    results = {}
+    def lookup(name):
+        try:
+            results[name] = chars(name)
+        except Exception as e:
+            results[name] = e
+    threads = [threading.Thread(target=lookup, args=(n,)) for n in names]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def test_concurrent_misses_share_one_request(chars, fake_names):
+    names = ["FC One", "Logi Two", "DPS Three", "Nobody Here"]
+    results = lookup_concurrently(chars, names)
+    assert len(fake_names.calls) == 1
+    assert fake_names.calls[0] == sorted(n.lower() for n in names)
+    assert results == {"FC One": 1001, "Logi Two": 1002, "DPS Three": 1003, "Nobody Here": None}
+
+def test_unknown_names_are_remembered_for_negative_ttl(chars, fake_names):
+    assert chars.get_many(["Nobody Here", "FC One"]) == [None, 1001]
+    assert chars("nobody here") is None
+    assert chars("FC One") == 1001
+    assert len(fake_names.calls) == 1
+    #once the entry expires ESI is asked again
+    chars.misses["nobody here"] = time.monotonic() - 1
+    assert chars("Nobody Here") is None
+    assert len(fake_names.calls) == 2
+
+def test_resolve_failure_reaches_every_waiting_caller(chars, fake_names):
+    fake_names.error = RuntimeError("ESI unavailable")
+    results = lookup_concurrently(chars, ["FC One", "Logi Two", "DPS Three"])
+    assert len(fake_names.calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results.values()), results
+    #a failed lookup is not remembered as unknown
+    assert not chars.misses
+    fake_names.error = None
+    assert chars("FC One") == 1001
+
+def test_batcher_starts_a_new_round_after_a_failure():
+    calls = []
+    def resolve(batch):
+        calls.append(sorted(batch))
+        if len(calls) == 1:
+            raise RuntimeError("first round fails")
+    batcher = MissBatcher(resolve, window=0.01)
+    with pytest.raises(RuntimeError):
+        batcher.wait_for(["a"])
+    batcher.wait_for(["b"])
+    assert calls == [["a"], ["b"]]
+
+#learned system names
+def test_learned_systems_persist_in_the_config_dir(tmp_path, monkeypatch):
+    #no setting/ dir in the CWD, the learned names go next to the char store journal
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(static_manage, 'default_store_path', lambda: tmp_path / "config" / "chardict.jsonl")
+    systems = static_manage.System_Dict()
+    systems.learn({"new system": 99})
+    assert systems.match("new sys") == 99
+    assert (tmp_path / "config" / "system_dict.yaml").exists()
+    assert not (tmp_path / "setting").exists()
+    assert static_manage.System_Dict().name_of(99) == "new system"
@@ -0,0 +1,55 @@
+"""_summary_
+CharStore journal: torn last line recovery, batched appends and compaction
+"""
+#import
+import json
+
+from mcp_server_evefleet.IO import char_store
+from mcp_server_evefleet.IO.char_store import CharStore
+
+def journal_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+def test_new_store_is_seeded_once(tmp_path):
+    path = tmp_path / "chardict.jsonl"
+    store = CharStore(path, seed=lambda: {"FC One": 1001})
+    assert store.snapshot() == {"fc one": 1001}
+    assert journal_lines(path) == [["fc one", 1001]]
+    store.close()
+    #an existing journal is never reseeded
+    assert CharStore(path, seed=lambda: {"Other": 1}).snapshot() == {"fc one": 1001}
+
+def test_torn_last_line_is_dropped_and_compacted(tmp_path):
+    path = tmp_path / "chardict.jsonl"
+    path.write_text('["fc one", 1001]\n["logi two", 1002]\n["dps thr', encoding='utf-8')
+    store = CharStore(path)
+    assert store.snapshot() == {"fc one": 1001, "logi two": 1002}
+    assert store.stats()["compactions"] == 1
+    assert journal_lines(path) == [["fc one", 1001], ["logi two", 1002]]
+    assert not path.with_suffix('.tmp').exists()
+    store.close()
+
+def test_put_many_is_flushed_as_one_append(tmp_path):
+    path = tmp_path / "chardict.jsonl"
+    store = CharStore(path, flush_interval=60)
+    store.put_many({"FC One": 1001})
+    store.put_many({"Logi Two": 1002, "fc one": 1001})
+    #visible right away, on disk after the flush
+    assert store.name2id == {"fc one": 1001, "logi two": 1002}
+    store.flush()
+    assert journal_lines(path) == [["fc one", 1001], ["logi two", 1002], ["fc one", 1001]]
+    assert store.stats()["flushes"] == 1
+    store.close()
+    assert CharStore(path).snapshot() == {"fc one": 1001, "logi two": 1002}
+
+def test_journal_is_compacted_when_it_outgrows_the_map(tmp_path, monkeypatch):
+    monkeypatch.setattr(char_store, 'COMPACT_MIN_LINES', 4)
+    path = tmp_path / "chardict.jsonl"
+    store = CharStore(path, flush_interval=60)
+    for _ in range(3):
+        store.put_many({"fc one": 1001, "logi two": 1002})
+        store.flush()
+    #6 lines for 2 names went over COMPACT_RATIO, the journal holds one line per name again
+    assert store.stats()["compactions"] == 1
+    assert sorted(map(tuple, journal_lines(path))) == [("fc one", 1001), ("logi two", 1002)]
+    store.close()
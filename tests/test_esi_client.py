@@ -0,0 +1,111 @@
+"""_summary_
+ESIClient against the emulator: retries, circuit breaker, ETag/Expires cache and single-flight
+"""
+#import
+import time
+import threading
+
+import pytest
+import requests
+
+from mcp_server_evefleet.IO.esi_retry import ESIUnavailableError
+
+def system_url(client, system_id):
+    return client.url(f"universe/systems/{system_id}/?datasource=tranquility")
+
+#retry / breaker
+def test_retries_absorb_injected_failures(emulator, client):
+    emulator.error_rate = 0.3
+    system_ids = sorted(emulator.universe.systems)[:30]
+    for system_id in system_ids:
+        assert client.get_json(system_url(client, system_id), cache=False)["system_id"] == system_id
+    assert emulator.stats["injected"] > 0
+    assert client.stats()["retry"]["retries"] >= emulator.stats["injected"]
+    assert client.breaker.state == 'closed'
+
+def test_non_idempotent_post_is_not_resent_after_504(emulator, client):
+    emulator.error_rate = 1.0
+    emulator.rng.choice = lambda statuses: 504
+    wings_before = len(emulator.fleet.wings)
+    res = client.post(client.url(f"fleets/{emulator.fleet.fleet_id}/wings/"), 'token')
+    assert res.status_code == 504
+    #ESI applied the write before timing out, a resend would have created a second wing
+    assert len(emulator.fleet.wings) == wings_before + 1
+    assert emulator.stats["requests"] == 1
+
+def test_breaker_opens_then_probe_closes_it(emulator, client):
+    emulator.error_rate = 1.0
+    url = system_url(client, next(iter(emulator.universe.systems)))
+    with pytest.raises(ESIUnavailableError):
+        client.get_json(url)
+    assert client.breaker.state == 'open'
+    sent = emulator.stats["requests"]
+    with pytest.raises(ESIUnavailableError):
+        client.get_json(url)
+    assert emulator.stats["requests"] == sent, "open breaker must fail fast without calling ESI"
+    emulator.error_rate = 0.0
+    time.sleep(client.breaker.cooldown)
+    assert client.get_json(url)["system_id"] > 0
+    assert client.breaker.state == 'closed'
+
+def test_gives_up_after_max_attempts(emulator, client):
+    client.breaker.threshold = 100
+    emulator.error_rate = 1.0
+    with pytest.raises(requests.HTTPError):
+        client.get_json(system_url(client, next(iter(emulator.universe.systems))), cache=False)
+    assert emulator.stats["requests"] == client.retry_policies.default_idempotent.max_attempts
+    assert client.stats()["retry"]["gave_up"] == 1
+
+#cache
+def test_fresh_get_is_served_from_cache(emulator, client):
+    url = system_url(client, next(iter(emulator.universe.systems)))
+    first = client.get_json(url)
+    first["name"] = "mutated by caller"
+    second = client.get_json(url)
+    assert emulator.stats["requests"] == 1
+    assert second["name"] != "mutated by caller"
+    assert client.cache.stats()["endpoints"]["universe/systems/{id}"]["hit"] == 1
+
+def test_stale_get_is_revalidated_with_etag(emulator, client):
+    emulator.expires = 0
+    url = system_url(client, next(iter(emulator.universe.systems)))
+    first = client.get_json(url)
+    assert client.get_json(url) == first
+    assert emulator.stats["requests"] == 2
+    assert emulator.stats["not_modified"] == 1
+    assert client.cache.stats()["endpoints"]["universe/systems/{id}"]["revalidated"] == 1
+
+def test_write_invalidates_cached_fleet_reads(emulator, client):
+    fleet_url = client.url(f"fleets/{emulator.fleet.fleet_id}/?datasource=tranquility")
+    assert client.get_json(fleet_url, 'token')["motd"] == ""
+    client.put(client.url(f"fleets/{emulator.fleet.fleet_id}/"), 'token', json={"motd": "x up"}).raise_for_status()
+    assert client.get_json(fleet_url, 'token')["motd"] == "x up"
+
+#single-flight
+def test_concurrent_identical_gets_share_one_request(emulator, client):
+    emulator.latency = 0.2
+    url = system_url(client, next(iter(emulator.universe.systems)))
+    results = [None] * 8
+    def fetch(i):
+        results[i] = client.get_json(url, cache=False)
+        results[i]["name"] = f"caller {i}"
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(len(results))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert emulator.stats["requests"] == 1
+    assert client.flights.stats()["coalesced"] == len(results) - 1
+    #every caller got its own copy
+    assert sorted(r["name"] for r in results) == sorted(f"caller {i}" for i in range(len(results)))
+
+def test_concurrent_identical_async_gets_share_one_request(emulator, client):
+    import asyncio
+    emulator.latency = 0.2
+    url = system_url(client, next(iter(emulator.universe.systems)))
+    async def burst():
+        return await asyncio.gather(*[client.aget_json(url, cache=False) for _ in range(6)])
+    results = client.run(burst())
+    assert emulator.stats["requests"] == 1
+    assert all(r == results[0] for r in results)
+    assert len({id(r) for r in results}) == len(results)
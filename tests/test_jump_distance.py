@@ -0,0 +1,53 @@
+"""_summary_
+JumpDistances: batched BFS rows against a plain BFS, unknown systems and the row LRU
+"""
+#import
+import random
+from collections import deque
+
+from mcp_server_evefleet.jump_distance import JumpDistances, UNREACHABLE
+from mcp_server_evefleet.universe_graph import StargateGraph, get_stargate_graph
+
+def plain_bfs(graph, source):
+    dist = {source: 0}
+    queue = deque([source])
+    while queue:
+        system = queue.popleft()
+        for gate in graph.gates(system):
+            if gate not in dist:
+                dist[gate] = dist[system] + 1
+                queue.append(gate)
+    return dist
+
+def small_graph():
+    #1-2-3-4 with a shortcut 1-3, 5-6 on their own
+    systems = [(s, 0.5, True) for s in range(1, 7)]
+    return StargateGraph(systems, [(1, 2), (2, 3), (3, 4), (1, 3), (5, 6)])
+
+def test_rows_match_a_plain_bfs():
+    graph = get_stargate_graph()
+    sources = random.Random(3).sample(list(graph.system_ids), 12)
+    rows = JumpDistances(graph).rows(sources)
+    assert sorted(rows) == sorted(sources)
+    for source in sources:
+        expected = plain_bfs(graph, source)
+        row = rows[source]
+        for system_id, i in graph.index.items():
+            assert row[i] == expected.get(system_id, UNREACHABLE), (source, system_id)
+
+def test_jumps_with_unknown_and_unreachable_systems():
+    distances = JumpDistances(small_graph())
+    assert distances.jumps(1, [1, 2, 3, 4]) == [0, 1, 1, 2]
+    assert distances.jumps(1, [5, 999, None]) == [None, None, None]
+    assert distances.jumps(999, [1, 2]) == [None, None]
+
+def test_rows_are_cached_and_evicted_least_recently_used():
+    distances = JumpDistances(small_graph(), cache_size=2)
+    distances.rows([1, 2])
+    assert distances.stats() == {"cached_rows": 2, "hit": 0, "computed": 2}
+    distances.rows([1])
+    #3 evicts 2, the row used least recently
+    distances.rows([3])
+    distances.rows([1, 2])
+    assert distances.stats() == {"cached_rows": 2, "hit": 2, "computed": 4}
+    assert distances.jumps(2, [4]) == [2]
@@ -0,0 +1,66 @@
+"""_summary_
+Routes from the packaged stargate graph against ESI's GET /route/ served by the emulator
+"""
+#import
+import random
+
+import pytest
+
+from mcp_server_evefleet.universe_graph import get_stargate_graph
+
+def esi_route(client, origin, destination, flag, avoid=()):
+    query = f"datasource=tranquility&flag={flag}" + (f"&avoid={','.join(map(str, avoid))}" if avoid else "")
+    return client.get_json(client.url(f"route/{origin}/{destination}/?{query}"))
+
+def route_cost(emulator, route, flag):
+    """What ESI minimises: jumps, or jumps into the disfavoured security band"""
+    if flag == 'shortest':
+        return len(route)
+    high = [emulator.universe.security(s) >= 0.45 for s in route[1:]]
+    return sum((not h) if flag == 'secure' else h for h in high), len(route)
+
+def sample_pairs(emulator, count=15, seed=7):
+    graph = get_stargate_graph()
+    systems = sorted(s for s in emulator.universe.gates if s in graph)
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < count:
+        origin, destination = rng.sample(systems, 2)
+        if graph.route(origin, destination) is not None:
+            pairs.append((origin, destination))
+    return pairs
+
+@pytest.mark.parametrize('flag', ['shortest', 'secure', 'insecure'])
+def test_local_route_matches_esi(emulator, client, flag):
+    graph = get_stargate_graph()
+    compared = 0
+    for origin, destination in sample_pairs(emulator):
+        local = graph.route(origin, destination, flag)
+        if local is None:
+            #the route may leave the packaged data, that one is ESI's to answer
+            continue
+        compared += 1
+        remote = esi_route(client, origin, destination, flag)
+        assert local[0] == origin and local[-1] == destination
+        #equal-cost routes may differ in the systems picked, never in cost
+        assert route_cost(emulator, local, flag) == route_cost(emulator, remote, flag), (origin, destination)
+        for a, b in zip(local, local[1:]):
+            assert b in emulator.universe.gates[a]
+    assert compared, "no route decided locally"
+
+def test_local_route_honours_avoid(emulator, client):
+    graph = get_stargate_graph()
+    for origin, destination in sample_pairs(emulator):
+        shortest = graph.route(origin, destination)
+        if len(shortest) < 3:
+            continue
+        avoid = [shortest[1]]
+        local = graph.route(origin, destination, 'shortest', avoid)
+        if local is None:
+            continue
+        assert shortest[1] not in local
+        assert len(local) == len(esi_route(client, origin, destination, 'shortest', avoid))
+
+def test_route_outside_packaged_data_is_left_to_esi():
+    graph = get_stargate_graph()
+    assert graph.route(1, 2) is None
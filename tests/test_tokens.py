@@ -0,0 +1,101 @@
+"""_summary_
+TokenProvider single-flight refresh and TokenVault persistence, re-login and refresh without a lock cycle
+"""
+#import
+import json
+import time
+import threading
+
+import pytest
+from jose import jwt
+
+from mcp_server_evefleet.IO import token_provider, token_vault
+from mcp_server_evefleet.IO.token_provider import TokenProvider
+from mcp_server_evefleet.IO.token_vault import TokenVault
+
+FC_ID = 42
+
+def access_token(character_id=FC_ID, expires_in=1200):
+    return jwt.encode({'sub': f'CHARACTER:EVE:{character_id}', 'name': f'Pilot {character_id}',
+                       'exp': time.time() + expires_in}, 'test-key')
+
+class FakeSSO():
+    """Stands in for refresh_access_token, slow enough for refreshes to overlap"""
+    def __init__(self, delay=0.05) -> None:
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+    def __call__(self, refresh_token):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        character_id = int(refresh_token.split('-')[0])
+        return f"{refresh_token}+", access_token(character_id), character_id, f"Pilot {character_id}"
+
+@pytest.fixture
+def sso(monkeypatch):
+    fake = FakeSSO()
+    saved = []
+    monkeypatch.setattr(token_provider, 'refresh_access_token', fake)
+    monkeypatch.setattr(token_provider, 'save_refresh_token', lambda token, token_file=None: saved.append(token))
+    monkeypatch.setattr(token_vault, 'save_refresh_token', lambda token, token_file=None: saved.append(token))
+    fake.saved = saved
+    return fake
+
+def run_threads(*targets):
+    threads = [threading.Thread(target=target, daemon=True) for target in targets]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return threads
+
+#provider
+def test_concurrent_refreshes_of_a_stale_token_share_one_sso_call(sso):
+    stale = access_token()
+    provider = TokenProvider(f"{FC_ID}-refresh", stale)
+    run_threads(*[lambda: provider.refresh_after_401(stale)] * 8)
+    assert sso.calls == 1
+    assert provider.stats()["refreshes"] == 1 and provider.stats()["refreshed_on_401"] == 8
+    assert provider.token() != stale
+    #the rotated refresh token is persisted once
+    assert sso.saved == [f"{FC_ID}-refresh+"]
+
+def test_expiring_token_is_refreshed_on_read(sso):
+    provider = TokenProvider(f"{FC_ID}-refresh", access_token(expires_in=60), margin=120)
+    fresh = provider.token()
+    assert sso.calls == 1
+    assert provider.expires_in() > 1000
+    assert provider.token() == fresh and sso.calls == 1
+
+#vault
+def test_vault_persists_rotated_tokens(sso, tmp_path):
+    vault = TokenVault(tmp_path / "tokens.json")
+    provider = vault.add(f"{FC_ID}-refresh", access_token())
+    alt = vault.add("7-refresh")
+    assert sso.calls == 1, "an alt without an access token is refreshed once when stored"
+    provider.refresh(provider.token())
+    data = json.loads((tmp_path / "tokens.json").read_text(encoding='utf-8'))
+    assert data["primary"] == data["active"] == FC_ID
+    assert data["characters"][str(FC_ID)]["refresh_token"] == f"{FC_ID}-refresh+"
+    assert data["characters"]["7"]["refresh_token"] == "7-refresh+"
+    #only the primary login is mirrored to refresh_token.txt
+    assert sso.saved == [f"{FC_ID}-refresh+"]
+    assert [vault.cycle().character_id for _ in range(4)] == [7, FC_ID, 7, FC_ID]
+    assert TokenVault(tmp_path / "tokens.json").provider(7).refresh_token == alt.refresh_token
+
+def test_relogin_during_refreshes_does_not_deadlock(sso, tmp_path):
+    sso.delay = 0.001
+    vault = TokenVault(tmp_path / "tokens.json")
+    provider = vault.add(f"{FC_ID}-refresh", access_token())
+    stop = time.monotonic() + 1.0
+    def relogin():
+        while time.monotonic() < stop:
+            #same character: swaps tokens on the provider callers already hold
+            assert vault.add(f"{FC_ID}-relogin", access_token()) is provider
+    def refresh():
+        while time.monotonic() < stop:
+            provider.refresh(provider.token())
+    threads = run_threads(relogin, refresh, relogin, refresh)
+    assert not any(t.is_alive() for t in threads), "vault lock and provider lock taken in opposite orders"
+    assert sso.calls > 0
@@ -0,0 +1,87 @@
+"""_summary_
+UniverseCrawler against the emulator: full pass, ETag revalidation, resume after failures, tombstones and pruning
+"""
+#import
+import pytest
+
+from mcp_server_evefleet import universe_crawler
+from mcp_server_evefleet.universe_crawler import CrawlCheckpoint, UniverseCrawler
+from mcp_server_evefleet.IO.API_IO import UNIVERSE_PATHS
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    cp = CrawlCheckpoint(tmp_path / "crawl.sqlite3")
+    yield cp
+    cp.close()
+
+@pytest.fixture
+def crawler(emulator, client, checkpoint, monkeypatch):
+    #only the systems with full data, the name-only ones would make every pass thousands of requests
+    universe = emulator.universe
+    universe.system_names = {i: n for i, n in universe.system_names.items() if i in universe.systems}
+    monkeypatch.setattr(universe_crawler, 'get_esi_client', lambda: client)
+    return UniverseCrawler(checkpoint, concurrency=8)
+
+def crawl(client, checkpoint, restart=False, crawler=None):
+    crawler = crawler or UniverseCrawler(checkpoint, concurrency=8)
+    return client.run(crawler.crawl(restart)), crawler.stats
+
+def test_first_pass_fetches_everything_then_revalidates(emulator, client, checkpoint, crawler):
+    universe = emulator.universe
+    complete, stats = crawl(client, checkpoint, crawler=crawler)
+    assert complete
+    assert stats["system"]["fetched"] == len(universe.systems)
+    assert stats["stargate"]["fetched"] == len(universe.stargates)
+    assert checkpoint.items('system') == universe.systems
+    assert set(checkpoint.items('stargate')) == set(universe.stargates)
+    #a finished pass starts a new one, every item is a 304
+    complete, stats = crawl(client, checkpoint)
+    assert complete and checkpoint.current == 2
+    assert stats["system"] == {"fetched": 0, "unchanged": len(universe.systems), "removed": 0, "failed": 0}
+    assert stats["stargate"]["unchanged"] == len(universe.stargates)
+
+def test_interrupted_pass_resumes_with_the_failed_items(emulator, client, checkpoint, crawler, monkeypatch):
+    failing = sorted(emulator.universe.stargates)[:5]
+    failing_paths = {UNIVERSE_PATHS['stargate'].format(i) for i in failing}
+    real_get = UniverseCrawler._get
+    async def flaky_get(self, session, path, etag):
+        if path in failing_paths:
+            raise ConnectionError("connection reset")
+        return await real_get(self, session, path, etag)
+    monkeypatch.setattr(UniverseCrawler, '_get', flaky_get)
+    complete, stats = crawl(client, checkpoint, crawler=crawler)
+    assert not complete
+    assert stats["stargate"]["failed"] == len(failing)
+    assert checkpoint.meta('state') == 'running'
+    monkeypatch.setattr(UniverseCrawler, '_get', real_get)
+    sent = emulator.stats["requests"]
+    complete, stats = crawl(client, checkpoint)
+    #same pass, everything confirmed before the failures is skipped
+    assert complete and checkpoint.current == 1
+    assert stats["stargate"]["fetched"] == len(failing)
+    assert stats["system"] == {"fetched": 0, "unchanged": 0, "removed": 0, "failed": 0}
+    assert emulator.stats["requests"] - sent == len(failing)
+
+def test_missing_items_are_tombstoned_and_removed_ones_pruned(emulator, client, checkpoint, crawler):
+    universe = emulator.universe
+    crawl(client, checkpoint, crawler=crawler)
+    #a stargate that 404s while its system still lists it
+    gone_gate = next(iter(universe.stargates))
+    del universe.stargates[gone_gate]
+    complete, stats = crawl(client, checkpoint, restart=True)
+    assert complete
+    assert stats["stargate"]["removed"] == 1
+    assert gone_gate not in checkpoint.items('stargate')
+    assert gone_gate not in checkpoint.pending('stargate', [gone_gate])
+    sent = emulator.stats["requests"]
+    complete, stats = crawl(client, checkpoint, restart=True)
+    assert stats["stargate"]["removed"] == 0
+    assert emulator.stats["requests"] - sent == 1 + len(universe.systems) + len(universe.stargates), "tombstone asked again"
+    #a system dropped from the list takes its stargates with it
+    system_id, system = next((i, s) for i, s in universe.systems.items() if s.get('stargates'))
+    del universe.systems[system_id]
+    del universe.system_names[system_id]
+    complete, stats = crawl(client, checkpoint, restart=True)
+    assert stats["system"]["removed"] == 1
+    assert system_id not in checkpoint.items('system')
+    assert not set(system['stargates']) & set(checkpoint.items('stargate'))
@@ -0,0 +1,66 @@
+"""_summary_
+Base warp speed lookup by ship group and the warp time model
+"""
+#import
+import numpy as np
+import pytest
+
+from mcp_server_evefleet.spatial import warp_speed_of, warp_times, BASE_WARP_SPEED, DEFAULT_WARP_SPEED, AU
+from mcp_server_evefleet.static_manage import ShipID_Dict
+
+@pytest.fixture
+def ships(monkeypatch):
+    #packaged ship table only, a miss must not open the universe store in the user's config dir
+    monkeypatch.setattr(ShipID_Dict, 'load_learned', lambda self: None)
+    return ShipID_Dict('does-not-exist.csv')
+
+@pytest.mark.parametrize('group_name', ['Jump Freighter', 'Jump freighter', 'jump freighter', 'JUMP FREIGHTER'])
+def test_group_lookup_ignores_capitalization(group_name):
+    assert warp_speed_of(group_name) == 1.37
+
+def test_unknown_group_uses_default():
+    assert warp_speed_of('Not A Ship Group') == DEFAULT_WARP_SPEED
+    assert warp_speed_of(None) == DEFAULT_WARP_SPEED
+
+@pytest.mark.parametrize('ship, speed', [('Rifter', 5.0), ('Hound', 5.0), ('Sleipnir', 2.7), ('Apostle', 1.5), ('Rhea', 1.37)])
+def test_ship_types_resolve_to_their_group_speed(ships, ship, speed):
+    type_name, group_name = ships.ship_of(ship)
+    assert type_name == ship
+    assert warp_speed_of(group_name) == speed
+    #display labels are capitalized differently, the lookup must not depend on it
+    assert warp_speed_of(ships.type_to_groupname(ship)) == speed
+
+def test_ship_of_by_type_id(ships):
+    type_id = ships('Rifter')
+    assert ships.ship_of(type_id) == ships.ship_of(str(type_id)) == ships.ship_of('rifter')
+    assert ships.ship_of(1) is None
+
+def test_learned_types_load_on_first_miss(monkeypatch):
+    loads = []
+    def load_learned(self):
+        loads.append(1)
+        self.add_rows([(999001, 25, 'Learned Frigate', 'Frigate')])
+    monkeypatch.setattr(ShipID_Dict, 'load_learned', load_learned)
+    ships = ShipID_Dict('does-not-exist.csv')
+    assert ships.name_of(ships('Rifter')) == 'Rifter'
+    assert not loads, "known types must not open the universe store"
+    assert ships.name_of(999001) == 'Learned Frigate'
+    assert ships.ship_of(424242) is None
+    assert ships.resolve_unknown([]) == []
+    assert loads == [1]
+
+def test_packaged_groups_with_a_table_speed_resolve(ships):
+    known = {g.lower() for g in BASE_WARP_SPEED}
+    for group_name in ships.group_names:
+        if group_name.lower() in known:
+            assert warp_speed_of(group_name) != DEFAULT_WARP_SPEED or BASE_WARP_SPEED.get(group_name) == DEFAULT_WARP_SPEED
+
+def test_warp_time_grows_with_distance_and_shrinks_with_speed():
+    distances = np.array([0.1, 1, 10, 50]) * AU
+    slow, fast = warp_times(distances, 1.37), warp_times(distances, 8.0)
+    assert np.all(np.diff(slow) > 0) and np.all(np.diff(fast) > 0)
+    assert np.all(fast < slow)
+
+def test_warp_time_rejects_non_positive_speed():
+    with pytest.raises(ValueError):
+        warp_times(AU, 0)